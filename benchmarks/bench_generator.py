@@ -0,0 +1,239 @@
+"""Throughput benchmark for the template-driven command generator.
+
+Builds synthetic workbooks from the real templates (file_operations.create_excel_for_resource)
+filled with random rows, then times reading, generating and writing every operation sheet
+separately. Each case runs in a fresh worker process so its peak RSS is its own.
+
+Examples:
+    python benchmarks/bench_generator.py --sizes 1000 10000 --save-baseline
+    python benchmarks/bench_generator.py --sizes 1000 10000 --device "OceanStor Pacific"
+    python benchmarks/bench_generator.py --resource LUN --sizes 100000 1000000
+
+Without --save-baseline the run is compared with the baseline file and the script exits
+with 1 when any phase got slower than the tolerance allows.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+from datetime import datetime
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from command_generator import CommandGenerator
+from command_plans import compile_field
+from file_operations import create_excel_for_resource
+from utils import load_config
+from workbook_session import WorkbookSession
+
+DEVICE_TYPES = ["OceanStor Dorado", "OceanStor Pacific"]
+SIZES = [1000, 10000, 100000, 1000000]
+PHASES = ['read', 'generate', 'write']
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+DEFAULT_WORK_DIR = os.path.join(BENCHMARK_DIR, 'work')
+SIZE_SAMPLES = ['64MB', '1GB', '10GB', '100GB', '1TB', '10TB']
+
+def random_column(field_config, rows, rng, mandatory):
+    """Random cell values for one template column; optional columns are about half empty."""
+    field = compile_field(field_config)
+    field_type = field_config.get('field_type', 'text')
+    positions = np.arange(rows)
+
+    if field_type == 'select':
+        values = rng.choice(np.array(field_config['allowed_values'], dtype=object), rows)
+    elif field_type == 'list':
+        values = pd.Series(positions).map(lambda i: f"{field.name}{i},{field.name}{i + 1}").to_numpy(dtype=object)
+    elif field_type in ('integer', 'number'):
+        low = field.min_bound if field.min_bound is not None else 0
+        high = field.max_bound if field.max_bound is not None else max(low, 0) + 1000
+        values = rng.integers(int(low), int(high), rows, endpoint=True).astype(object)
+    elif field_type == 'size':
+        samples = []
+        for sample in SIZE_SAMPLES:
+            try:
+                field.process(sample)
+                samples.append(sample)
+            except ValueError:
+                pass
+        values = rng.choice(np.array(samples or [field.min_value], dtype=object), rows)
+    else:
+        values = pd.Series(positions).map(lambda i: f"{field.name}_{i}").to_numpy(dtype=object)
+
+    if not mandatory:
+        values[rng.random(rows) < 0.5] = None
+    return values
+
+def build_workbook(device_type, resource_type, rows, work_dir, seed=0):
+    """Template workbook for a resource with every operation sheet filled with random rows.
+
+    Workbooks are kept in work_dir and reused by later runs with the same size and seed.
+    """
+    stem = f"{device_type}_{resource_type}_{rows}_{seed}".replace(' ', '_')
+    workbook_path = os.path.join(work_dir, f"{stem}.xlsx")
+    if os.path.exists(workbook_path):
+        return workbook_path
+
+    template_path = os.path.join(work_dir, f"{device_type}_{resource_type}_template.xlsx".replace(' ', '_'))
+    with redirect_stdout(sys.stderr):
+        create_excel_for_resource(resource_type, template_path, device_type, num_rows=1)
+    template = load_workbook(template_path, read_only=True)
+
+    operations = load_config(device_type)[resource_type]['operations']
+    rng = np.random.default_rng(seed)
+    workbook = Workbook(write_only=True)
+    for sheet_name in template.sheetnames:
+        headers = [cell.value for cell in next(template[sheet_name].iter_rows(max_row=1))]
+        operation = operations[sheet_name]
+        mandatory = {field['name'] for field in operation.get('mandatory', [])}
+        fields = {field['name']: field for field in operation.get('mandatory', []) + operation.get('optional', [])}
+        columns = [random_column(fields[name], rows, rng, name in mandatory) for name in headers]
+
+        sheet = workbook.create_sheet(sheet_name)
+        sheet.append(headers)
+        for row in zip(*columns):
+            sheet.append(row)
+    template.close()
+
+    temp_path = f"{workbook_path}.{os.getpid()}.tmp"
+    workbook.save(temp_path)
+    os.replace(temp_path, workbook_path)
+    return workbook_path
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def run_case(case):
+    """Worker entry point: time one operation sheet of a synthetic workbook."""
+    generator = CommandGenerator()
+    config = load_config(case['device'])
+    output_path = os.path.join(case['work_dir'], f"output_{os.getpid()}.txt")
+    timings = {}
+
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        start = time.perf_counter()
+        with WorkbookSession(case['workbook']) as workbook:
+            data_frame = workbook.frame(case['operation'])
+        timings['read'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        commands = generator.generate_commands(data_frame, case['resource'], case['operation'], config, case['device'])
+        timings['generate'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with open(output_path, 'w') as f:
+            f.write('\n'.join(commands + ['']))
+        timings['write'] = time.perf_counter() - start
+    os.remove(output_path)
+
+    result = {key: case[key] for key in ('device', 'resource', 'operation', 'rows')}
+    result['commands'] = len(commands)
+    for phase in PHASES:
+        result[f"{phase}_seconds"] = round(timings[phase], 4)
+        result[f"{phase}_rows_per_sec"] = round(case['rows'] / timings[phase]) if timings[phase] else None
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+def run_benchmarks(device_types, resource_types=None, sizes=SIZES, work_dir=DEFAULT_WORK_DIR, seed=0):
+    """Run every (device, resource, operation, size) case and return the result dicts."""
+    os.makedirs(work_dir, exist_ok=True)
+    results = []
+    for device_type in device_types:
+        config = load_config(device_type)
+        for resource_type in (resource_types or config.keys()):
+            if resource_type not in config:
+                continue
+            for rows in sizes:
+                workbook_path = build_workbook(device_type, resource_type, rows, work_dir, seed)
+                for operation in config[resource_type]['operations']:
+                    case = {'device': device_type, 'resource': resource_type, 'operation': operation, 'rows': rows,
+                            'workbook': workbook_path, 'work_dir': work_dir}
+                    # A fresh process per case keeps peak RSS from leaking between cases
+                    with ProcessPoolExecutor(max_workers=1) as executor:
+                        result = executor.submit(run_case, case).result()
+                    print_result(result)
+                    results.append(result)
+    return results
+
+def print_result(result):
+    rates = ', '.join(f"{phase} {result[f'{phase}_rows_per_sec'] or 0:,} rows/s" for phase in PHASES)
+    rss = f", peak RSS {result['peak_rss_mb']} MB" if result['peak_rss_mb'] is not None else ''
+    print(f"{result['device']} / {result['resource']} / {result['operation']} x {result['rows']}: {rates}{rss}")
+
+def case_key(result):
+    return (result['device'], result['resource'], result['operation'], result['rows'])
+
+def compare_with_baseline(results, baseline, tolerance):
+    """Return a message for every phase that got slower than baseline by more than tolerance."""
+    expected = {case_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        reference = expected.get(case_key(result))
+        if reference is None:
+            continue
+        for phase in PHASES:
+            rate, reference_rate = result[f"{phase}_rows_per_sec"], reference[f"{phase}_rows_per_sec"]
+            if rate and reference_rate and rate < reference_rate * (1 - tolerance):
+                regressions.append(f"{' / '.join(str(part) for part in case_key(result))} {phase}: "
+                                   f"{rate:,} rows/s vs baseline {reference_rate:,} rows/s")
+    return regressions
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark CommandGenerator read/generate/write throughput.")
+    parser.add_argument('--device', choices=DEVICE_TYPES, help="Only benchmark one device type")
+    parser.add_argument('--resource', action='append', help="Only benchmark these resources (repeatable)")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="Row counts per sheet")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the random workbook data")
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR, help="Where synthetic workbooks are kept")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help="Write this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Allowed throughput drop against the baseline (0.2 = 20%%)")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    devices = [args.device] if args.device else DEVICE_TYPES
+    results = run_benchmarks(devices, args.resource, args.sizes, args.work_dir, args.seed)
+
+    if args.save_baseline:
+        baseline = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'results': results
+        }
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline written to: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --save-baseline first")
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare_with_baseline(results, json.load(f), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    print(f"{len(regressions)} regressions against {args.baseline}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""Headless command line for the OceanStor Script Generator.
+
+Examples:
+    python cli.py generate "Documents/OceanStor Dorado_LUN_commands.xlsx"
+    python cli.py generate lun.xlsx host.xlsx --device "OceanStor Dorado" --resource LUN --jobs 4
+    python cli.py batch --device "OceanStor Dorado" --jobs 8 --format json
+    python cli.py validate "Documents/OceanStor Dorado_FileSystem_commands.xlsx"
+    python cli.py import infograb_a.xlsx infograb_b.xlsx --output-dir out --jobs 2
+    python cli.py import infograb.xlsx --sheet-jobs 0 --zip lzma
+    python cli.py import infograb_june.xlsx --baseline infograb_may.xlsx
+    python cli.py import infograb_csv/ --output-dir out
+
+Nothing in here (or in the modules it imports) loads tkinter, so it runs on headless hosts.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+from command_generator import generation_job, run_generation_jobs, generate_batch, get_output_path
+from import_output import ZIP_COMPRESSION
+from utils import load_config, DEFAULT_CHUNK_SIZE
+from validation import validate_frame
+from workbook_session import open_workbook
+
+DEVICE_TYPES = ["OceanStor Dorado", "OceanStor Pacific"]
+
+def infer_workbook_target(file_path, device_type=None, resource_type=None):
+    """Work out (device, resource) from a '<device>_<resource>_commands.xlsx' file name."""
+    stem = os.path.splitext(os.path.basename(os.path.normpath(file_path)))[0]
+    if stem.endswith('_commands'):
+        stem = stem[:-len('_commands')]
+
+    if device_type is None:
+        device_type = next((device for device in DEVICE_TYPES if stem.startswith(f"{device}_")), None)
+    if device_type is None:
+        raise ValueError(f"Cannot infer the device type of '{file_path}', use --device")
+
+    if resource_type is None:
+        if not stem.startswith(f"{device_type}_"):
+            raise ValueError(f"Cannot infer the resource type of '{file_path}', use --resource")
+        resource_type = stem[len(device_type) + 1:]
+    return device_type, resource_type
+
+def _run_import_job(file_path, results_dir, sheet_jobs=1, compression=None, compresslevel=None, group_vstores=False,
+                    incremental=False, delta=False, baseline_path=None):
+    """Worker entry point for the import command."""
+    from import_operations import process_imported_data
+
+    result = {'input': file_path, 'output': results_dir, 'seconds': 0.0, 'error': None}
+    start = time.perf_counter()
+    try:
+        result['output'] = process_imported_data(file_path, results_dir, sheet_jobs, compression, compresslevel,
+                                                 group_vstores, incremental, delta, baseline_path)
+    except Exception as e:
+        result['error'] = str(e)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def run_generate(args):
+    if args.output and len(args.workbooks) > 1:
+        raise ValueError("--output only applies to a single workbook, use --output-dir")
+
+    jobs = []
+    for workbook in args.workbooks:
+        device_type, resource_type = infer_workbook_target(workbook, args.device, args.resource)
+        output_path = args.output or get_output_path(resource_type, device_type, args.output_dir)
+        jobs.append(generation_job(resource_type, device_type, input_path=workbook, output_path=output_path,
+                                   stream=args.stream, chunk_size=args.chunk_size, validate=args.validate))
+    return run_generation_jobs(jobs, args.jobs)
+
+def run_batch(args):
+    devices = [args.device] if args.device else DEVICE_TYPES
+    return generate_batch(devices, args.resource and [args.resource], args.jobs, args.stream, args.chunk_size,
+                          args.validate)
+
+def run_validate(args):
+    results = []
+    for workbook_path in args.workbooks:
+        start = time.perf_counter()
+        device_type, resource_type = infer_workbook_target(workbook_path, args.device, args.resource)
+        config = load_config(device_type)
+        errors = []
+        with open_workbook(workbook_path) as workbook:
+            for sheet_name, data_frame in workbook.frames(config.get(resource_type, {}).get('operations', {})):
+                report = validate_frame(data_frame, config, resource_type, sheet_name, device_type)
+                report.insert(0, 'sheet', sheet_name)
+                errors.extend(report.astype(object).where(report.notna(), None).to_dict('records'))
+        results.append({
+            'input': workbook_path,
+            'output': None,
+            'seconds': time.perf_counter() - start,
+            'error': f"{len(errors)} constraint violations" if errors else None,
+            'violations': errors
+        })
+    return results
+
+def run_import(args):
+    default_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Imported_Results")
+    output_dir = args.output_dir or default_dir
+
+    jobs = []
+    folder_names = set()
+    for file_path in args.files:
+        # Several exports would overwrite each other's command files, so give each its own folder
+        # (numbered when two exports share a name); their logs are named after the export too
+        results_dir = output_dir
+        if len(args.files) > 1:
+            stem = os.path.splitext(os.path.basename(os.path.normpath(file_path)))[0]
+            folder_name, count = stem, 1
+            while folder_name in folder_names:
+                count += 1
+                folder_name = f"{stem}_{count}"
+            folder_names.add(folder_name)
+            results_dir = os.path.join(output_dir, folder_name)
+        jobs.append((file_path, results_dir, args.sheet_jobs, args.zip, args.zip_level, args.group_vstores,
+                     args.incremental, args.delta, args.baseline))
+
+    if args.jobs == 1 or len(jobs) <= 1:
+        return [_run_import_job(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        return list(executor.map(_run_import_job, *zip(*jobs)))
+
+def print_results(results, output_format):
+    if output_format == 'json':
+        print(json.dumps(results, indent=2))
+        return
+    for result in results:
+        status = "ok" if result['error'] is None else f"FAILED ({result['error']})"
+        print(f"{result['input']} -> {result['output']}: {status} in {result['seconds']:.2f}s")
+        for violation in result.get('violations', []):
+            print(f"  [{violation['sheet']}] row {violation['row']}: {violation['message']} (value: {violation['value']})")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Generate OceanStor CLI scripts without the GUI.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_common(subparser):
+        subparser.add_argument('--jobs', '-j', type=int, default=None,
+                               help="Worker processes (default: one per CPU, 1 runs inline)")
+        subparser.add_argument('--format', choices=['text', 'json'], default='text',
+                               help="Format of the run summary printed on stdout")
+
+    def add_generation(subparser):
+        subparser.add_argument('--device', choices=DEVICE_TYPES, help="Device type (inferred from the file name if omitted)")
+        subparser.add_argument('--resource', help="Resource type, e.g. LUN or FileSystem (inferred from the file name if omitted)")
+        subparser.add_argument('--stream', action='store_true', help="Read sheets in chunks to keep memory flat")
+        subparser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk in --stream mode")
+        subparser.add_argument('--validate', action='store_true', help="Skip rows that break the config's constraints")
+        add_common(subparser)
+
+    generate = subparsers.add_parser('generate', help="Generate commands from filled-in template workbooks")
+    generate.add_argument('workbooks', nargs='+', help="Template workbooks (<device>_<resource>_commands.xlsx)")
+    generate.add_argument('--output', '-o', help="Output file (single workbook only)")
+    generate.add_argument('--output-dir', help="Directory for the generated command files (default: Results/)")
+    add_generation(generate)
+    generate.set_defaults(handler=run_generate)
+
+    batch = subparsers.add_parser('batch', help="Generate every resource that has a workbook in Documents/")
+    add_generation(batch)
+    batch.set_defaults(handler=run_batch)
+
+    validator = subparsers.add_parser('validate', help="Check template workbooks against the config constraints")
+    validator.add_argument('workbooks', nargs='+', help="Template workbooks (<device>_<resource>_commands.xlsx)")
+    validator.add_argument('--device', choices=DEVICE_TYPES, help="Device type (inferred from the file name if omitted)")
+    validator.add_argument('--resource', help="Resource type (inferred from the file name if omitted)")
+    validator.add_argument('--format', choices=['text', 'json'], default='text',
+                           help="Format of the report printed on stdout")
+    validator.set_defaults(handler=run_validate)
+
+    importer = subparsers.add_parser('import', help="Replicate a configuration from InfoGrab exports")
+    importer.add_argument('files', nargs='+', help="InfoGrab Excel exports")
+    importer.add_argument('--output-dir', help="Directory for the command files (default: Imported_Results/)")
+    importer.add_argument('--sheet-jobs', type=int, default=1,
+                          help="Worker processes translating the sheets of each export (0: one per sheet)")
+    importer.add_argument('--zip', choices=list(ZIP_COMPRESSION),
+                          help="Stream the commands and log into a zip archive with this codec")
+    importer.add_argument('--zip-level', type=int, help="Compression level for deflate (0-9) or bzip2 (1-9)")
+    importer.add_argument('--group-vstores', action='store_true',
+                          help="Reorder rows so each vstore is switched to once per command file")
+    importer.add_argument('--baseline',
+                          help="Earlier InfoGrab export of the same array: only create the objects it lacks "
+                               "and list the ones it has but the export lacks in Removed_objects.txt")
+    importer.add_argument('--incremental', action='store_true',
+                          help="Reuse the output of sheets and rows unchanged since the last import into the same directory")
+    importer.add_argument('--delta', action='store_true',
+                          help="Only write commands for rows that are new since the last import (implies --incremental)")
+    add_common(importer)
+    importer.set_defaults(handler=run_import)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        # Progress and warnings go to stderr so stdout only carries the summary
+        with redirect_stdout(sys.stderr):
+            results = args.handler(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    print_results(results, args.format)
+    return 1 if any(result['error'] for result in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
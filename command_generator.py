@@ -1,15 +1,42 @@
 import os
 import sys
+import time
 import pandas as pd
 import re
-from utils import load_config, read_file, get_data_file_path
+from concurrent.futures import ProcessPoolExecutor
+from utils import load_config, get_data_file_path, DEFAULT_CHUNK_SIZE, DEFAULT_MAX_BLANK_ROWS
+from workbook_session import open_workbook
+from command_plans import get_field_plan, get_operation_plan, transform_prefix_slash
+from validation import get_operation_validator, first_error_per_row
+
+def get_base_path():
+    """Folder holding Documents/ and Results/, whether running as a script or an executable."""
+    return sys._MEIPASS if getattr(sys, 'frozen', False) else os.path.abspath(".")
+
+# Inputs looked for in Documents/, in order: the Excel template, then exports of the same sheets
+# as one Parquet or JSON Lines table, or as a directory of per-sheet CSV/Parquet/JSONL files
+INPUT_EXTENSIONS = ['.xlsx', '.parquet', '.jsonl', '.csv', '']
+
+def get_workbook_path(resource_type, device_type):
+    """Path of the input for a resource: the first of INPUT_EXTENSIONS that exists, else the workbook."""
+    stem = os.path.join(get_base_path(), 'Documents', f'{device_type}_{resource_type}_commands')
+    return next((stem + extension for extension in INPUT_EXTENSIONS if os.path.exists(stem + extension)),
+                f'{stem}.xlsx')
+
+def get_output_path(resource_type, device_type, results_dir=None):
+    """Path of the generated commands file for a resource."""
+    results_dir = results_dir or os.path.join(get_base_path(), 'Results')
+    return os.path.join(results_dir, f'{device_type.lower()}_{resource_type.lower()}_commands.txt')
 
 class CommandGenerator:
     def __init__(self):
         self.field_processors = {
             'text': self.process_text_field,
             'select': self.process_select_field,
-            'list': self.process_list_field
+            'list': self.process_list_field,
+            'number': self.process_number_field,
+            'integer': self.process_number_field,
+            'size': self.process_number_field
         }
         self.field_transforms = {
             'prefix_slash': self.transform_prefix_slash
@@ -42,12 +69,15 @@ class CommandGenerator:
         items = [item.strip() for item in re.split(r"[\s,]+", str(value).strip()) if item.strip()]
         return separator.join(items)
 
+    def process_number_field(self, value, field_config):
+        """Process number, integer and size field types with their min/max bounds"""
+        if pd.isna(value) or value == '':
+            return None
+        return get_field_plan(field_config).process(value)
+
     def transform_prefix_slash(self, value):
         """Transform to ensure path starts with slash"""
-        value = str(value).strip()
-        if not value.startswith('/'):
-            return f"/{value.lstrip('/')}"
-        return value
+        return transform_prefix_slash(value)
 
     def process_field_value(self, field_config, value):
         """Process a field value based on its configuration"""
@@ -91,27 +121,43 @@ class CommandGenerator:
         
         return ' '.join(command_parts)
 
-    def generate_commands(self, data_frame, resource_type, command_type, config):
-        """Generate all commands for a given operation"""
-        try:
-            operation_config = config[resource_type]['operations'][command_type]
-        except KeyError:
-            raise ValueError(f"Unsupported operation: {resource_type}/{command_type}")
+    def generate_commands(self, data_frame, resource_type, command_type, config, device_type=None, validate=False):
+        """Generate all commands for a given operation
+
+        With validate=True rows breaking a constraint of the config (pattern, lengths, ranges,
+        conditions, dependencies...) are skipped as well.
+        """
+        plan = get_operation_plan(config, resource_type, command_type, device_type)
         
-        commands = []
-        for index, row in data_frame.iterrows():
-            try:
-                commands.append(self.generate_command(row, operation_config))
-            except ValueError as e:
-                print(f"Warning: Skipping row {index + 1} - {str(e)}")
-                continue
+        commands, rejected, reasons = plan.generate_frame(data_frame)
+        if validate:
+            report = get_operation_validator(plan).validate(data_frame)
+            reasons = reasons.where(rejected, first_error_per_row(report, data_frame.index))
+            rejected = reasons.notna()
+        for index, reason in reasons[rejected].items():
+            print(f"Warning: Skipping row {index + 1} - {reason}")
         
-        return commands
+        return commands[~rejected].tolist()
+
+    def iter_commands(self, data_frames, resource_type, command_type, config, device_type=None, validate=False):
+        """Lazily yield the commands for an operation from an iterable of DataFrame chunks"""
+        for data_frame in data_frames:
+            yield from self.generate_commands(data_frame, resource_type, command_type, config, device_type, validate)
+
+    def main(self, resource_type, device_type, stream=False, chunk_size=DEFAULT_CHUNK_SIZE, input_path=None, output_path=None,
+             validate=False):
+        """Generate the commands file for a resource.
 
-    def main(self, resource_type, device_type):
-        base_path = sys._MEIPASS if getattr(sys, 'frozen', False) else os.path.abspath(".")
-        excel_file_path = os.path.join(base_path, 'Documents', f'{device_type}_{resource_type}_commands.xlsx')
-        results_dir = os.path.join(base_path, 'Results')
+        input_path and output_path default to Documents/<device>_<resource>_commands.xlsx and
+        Results/<device>_<resource>_commands.txt. input_path may also be any format
+        workbook_session.open_workbook reads. The workbook is opened once for all
+        operations. With stream=True every sheet is read in chunks of chunk_size rows and
+        commands are written as they are generated, so memory does not grow with the size
+        of the sheet. validate=True also skips rows that break the config's constraints.
+        """
+        excel_file_path = input_path or get_workbook_path(resource_type, device_type)
+        output_file_path = output_path or get_output_path(resource_type, device_type)
+        results_dir = os.path.dirname(os.path.abspath(output_file_path))
 
         if not os.path.exists(results_dir):
             os.makedirs(results_dir)
@@ -120,34 +166,111 @@ class CommandGenerator:
         resource_config = config.get(resource_type, {})
 
         if not os.path.exists(excel_file_path):
-            print(f"Error: Excel file '{excel_file_path}' does not exist.")
-            sys.exit(1)
+            raise FileNotFoundError(f"Excel file '{excel_file_path}' does not exist.")
 
-        all_commands = []
-        for command_type in resource_config.get('operations', {}).keys():
-            data_frame = read_file(excel_file_path, sheet_name=command_type)
-            if data_frame is None:
-                continue
+        with open_workbook(excel_file_path) as workbook, open(output_file_path, 'w') as f:
+            first_line = True
 
-            commands = self.generate_commands(data_frame, resource_type, command_type, config)
-            all_commands.extend(commands)
-            all_commands.append('')  # Add empty line between command groups
+            def write_line(line):
+                # Lines are separated, not terminated, by newlines
+                nonlocal first_line
+                if not first_line:
+                    f.write('\n')
+                f.write(line)
+                first_line = False
 
-        output_file_path = os.path.join(results_dir, f'{device_type.lower()}_{resource_type.lower()}_commands.txt')
-        with open(output_file_path, 'w') as f:
-            f.write('\n'.join(all_commands))
+            for command_type in resource_config.get('operations', {}).keys():
+                # Only sheets present in the workbook are parsed
+                if not workbook.has_sheet(command_type):
+                    continue
+                # Only the configured columns are read, and reading stops at the template's empty rows
+                operation_config = resource_config['operations'][command_type]
+                columns = [field['name'] for field in operation_config.get('mandatory', []) + operation_config.get('optional', [])]
+                if stream:
+                    data_frames = workbook.iter_chunks(command_type, chunk_size, columns, DEFAULT_MAX_BLANK_ROWS)
+                else:
+                    data_frame = workbook.frame(command_type, columns, DEFAULT_MAX_BLANK_ROWS)
+                    if data_frame is None:
+                        continue
+                    data_frames = [data_frame]
+
+                for command in self.iter_commands(data_frames, resource_type, command_type, config, device_type, validate):
+                    write_line(command)
+                write_line('')  # Add empty line between command groups
+                # Only one sheet is held at a time: its frame is freed once its commands are written
+                data_frames = data_frame = None
+                workbook.release(command_type)
 
         print(f"Commands written to: {output_file_path}")
         return output_file_path
 
-def main(resource_type, device_type):
+def main(resource_type, device_type, stream=False, chunk_size=DEFAULT_CHUNK_SIZE, input_path=None, output_path=None,
+         validate=False):
     generator = CommandGenerator()
-    return generator.main(resource_type, device_type)
+    return generator.main(resource_type, device_type, stream=stream, chunk_size=chunk_size,
+                          input_path=input_path, output_path=output_path, validate=validate)
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python command_generator.py <resource_type>")
-        sys.exit(1)
+def generation_job(resource_type, device_type, input_path=None, output_path=None, stream=False, chunk_size=DEFAULT_CHUNK_SIZE,
+                   validate=False):
+    """Describe one workbook to generate, for run_generation_jobs."""
+    return {
+        'resource': resource_type,
+        'device': device_type,
+        'input': input_path or get_workbook_path(resource_type, device_type),
+        'output': output_path or get_output_path(resource_type, device_type),
+        'stream': stream,
+        'chunk_size': chunk_size,
+        'validate': validate
+    }
+
+def _run_generation_job(job):
+    """Worker entry point for run_generation_jobs; must stay importable at module level."""
+    result = {'device': job['device'], 'resource': job['resource'], 'input': job['input'],
+              'output': None, 'seconds': 0.0, 'error': None}
+    start = time.perf_counter()
+    try:
+        result['output'] = main(job['resource'], job['device'], stream=job['stream'], chunk_size=job['chunk_size'],
+                                input_path=job['input'], output_path=job['output'], validate=job['validate'])
+    except Exception as e:
+        result['error'] = str(e)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def run_generation_jobs(jobs, max_workers=None):
+    """Run generation jobs, one worker process per workbook.
+
+    Returns one result dict (device, resource, input, output, seconds, error) per job, in
+    job order whatever order the workers finish in. max_workers=1 runs the jobs inline.
+    """
+    start = time.perf_counter()
+    if max_workers == 1 or len(jobs) <= 1:
+        results = [_run_generation_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_run_generation_job, jobs))
 
-    resource_type = sys.argv[1]
-    main(resource_type)
\ No newline at end of file
+    for result in results:
+        status = f"{result['seconds']:.2f}s" if result['error'] is None else f"failed: {result['error']}"
+        print(f"{result['device']} / {result['resource']}: {status}")
+    print(f"Batch finished: {len(results)} workbooks in {time.perf_counter() - start:.2f}s")
+    return results
+
+def generate_batch(device_types, resource_types=None, max_workers=None, stream=False, chunk_size=DEFAULT_CHUNK_SIZE,
+                   validate=False):
+    """Generate every resource that has a workbook in Documents/, one worker process per workbook.
+
+    resource_types defaults to every resource of each device config; resources without a
+    workbook are skipped. Results are returned in config order (see run_generation_jobs).
+    """
+    jobs = []
+    for device_type in device_types:
+        config = load_config(device_type)
+        for resource_type in (resource_types or config.keys()):
+            if resource_type in config and os.path.exists(get_workbook_path(resource_type, device_type)):
+                jobs.append(generation_job(resource_type, device_type, stream=stream, chunk_size=chunk_size,
+                                           validate=validate))
+    return run_generation_jobs(jobs, max_workers)
+
+if __name__ == "__main__":
+    from cli import main as cli_main
+    sys.exit(cli_main())
@@ -0,0 +1,452 @@
+import re
+import math
+import numpy as np
+import pandas as pd
+
+LIST_SPLIT_PATTERN = re.compile(r"[\s,]+")
+SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d*)?|\.\d+)\s*([A-Za-z]*)\s*$")
+
+# Size units accepted in the templates: lowered spelling -> (CLI spelling, bytes).
+# Blocks are 512-byte sectors, which the CLI takes as a bare number.
+SIZE_UNITS = {
+    'pb': ('PB', 1024 ** 5),
+    'tb': ('TB', 1024 ** 4),
+    'gb': ('GB', 1024 ** 3),
+    'mb': ('MB', 1024 ** 2),
+    'kb': ('KB', 1024),
+    'blocks': ('', 512),
+    '': ('', 512)
+}
+SIZE_REMAIN = 'remain'
+
+
+def is_empty(value):
+    """Return True for the cell values the generator treats as not filled in."""
+    return pd.isna(value) or value == ''
+
+
+def transform_prefix_slash(value):
+    """Ensure a path value starts with a slash."""
+    value = str(value).strip()
+    if not value.startswith('/'):
+        return f"/{value.lstrip('/')}"
+    return value
+
+
+def transform_prefix_slash_column(values):
+    """Column form of transform_prefix_slash for a Series of strings."""
+    values = values.str.strip()
+    needs_slash = ~values.str.startswith('/')
+    if needs_slash.any():
+        values = values.copy()
+        values[needs_slash] = '/' + values[needs_slash].str.lstrip('/')
+    return values
+
+
+FIELD_TRANSFORMS = {
+    'prefix_slash': transform_prefix_slash
+}
+
+COLUMN_TRANSFORMS = {
+    'prefix_slash': transform_prefix_slash_column
+}
+
+
+def empty_mask(column):
+    """Column form of is_empty."""
+    mask = column.isna()
+    if pd.api.types.is_object_dtype(column) or pd.api.types.is_string_dtype(column):
+        mask |= column == ''
+    return mask
+
+
+def row_aligned_frame(frame):
+    """Cast columns the way DataFrame.iterrows does, so column results match the row-wise path.
+
+    iterrows goes through DataFrame.values, which upcasts e.g. int columns to float when
+    every column is numeric.
+    """
+    row_dtype = frame.iloc[:0].to_numpy().dtype
+    if row_dtype == object:
+        return frame
+    return frame.astype(row_dtype)
+
+
+class FieldPlan:
+    """Compiled form of a text field; base class for the other field types."""
+
+    def __init__(self, field_config):
+        self.name = field_config['name']
+        self.config = field_config
+        transform_name = field_config.get('transform')
+        self.transform = FIELD_TRANSFORMS.get(transform_name)
+        self.column_transform = COLUMN_TRANSFORMS.get(transform_name)
+
+    def process(self, value):
+        return str(value).strip()
+
+    def process_column(self, values):
+        """Process a Series of non-empty strings; returns (processed, errors or None)."""
+        return values.str.strip(), None
+
+    def numeric_column(self, values):
+        """Numeric view of processed values for range checks (NaN where not a number)."""
+        return pd.to_numeric(values, errors='coerce')
+
+    def parse_bound(self, bound):
+        """Numeric value of a min/max bound, or None when this field type cannot compare it."""
+        if isinstance(bound, (int, float)) and not isinstance(bound, bool):
+            return bound
+        return None
+
+    def evaluate(self, value):
+        """Return the formatted value for a cell, or None when the cell is empty."""
+        if is_empty(value):
+            return None
+        if self.transform is not None:
+            value = self.transform(value)
+        return self.process(value)
+
+    def evaluate_column(self, column):
+        """Evaluate a whole column at once.
+
+        Returns (values, errors): values holds None for empty cells and errors holds
+        the message evaluate would have raised for a cell, or None.
+        """
+        values = pd.Series(None, index=column.index, dtype=object)
+        errors = pd.Series(None, index=column.index, dtype=object)
+        present = ~empty_mask(column)
+        if not present.any():
+            return values, errors
+
+        strings = column[present].map(str).astype(object)
+        if self.column_transform is not None:
+            strings = self.column_transform(strings)
+        processed, field_errors = self.process_column(strings)
+        values[present] = processed
+        if field_errors is not None:
+            errors[field_errors.index] = field_errors
+        return values, errors
+
+
+class SelectFieldPlan(FieldPlan):
+    """Select field with its allowed values lowered once into a frozenset."""
+
+    def __init__(self, field_config):
+        super().__init__(field_config)
+        self.allowed_list = [v.lower() for v in field_config['allowed_values']]
+        self.allowed = frozenset(self.allowed_list)
+
+    def process(self, value):
+        value = str(value).strip().lower()
+        if value not in self.allowed:
+            raise ValueError(f"Invalid value '{value}' for field {self.name}. Allowed: {self.allowed_list}")
+        return value
+
+    def process_column(self, values):
+        values = values.str.strip().str.lower()
+        invalid = ~values.isin(self.allowed)
+        errors = None
+        if invalid.any():
+            errors = "Invalid value '" + values[invalid] + f"' for field {self.name}. Allowed: {self.allowed_list}"
+        return values, errors
+
+
+class ListFieldPlan(FieldPlan):
+    """List field split on whitespace/commas and joined with its separator."""
+
+    def __init__(self, field_config):
+        super().__init__(field_config)
+        self.separator = field_config.get('separator', ',')
+
+    def process(self, value):
+        items = [item.strip() for item in LIST_SPLIT_PATTERN.split(str(value).strip()) if item.strip()]
+        return self.separator.join(items)
+
+    def process_column(self, values):
+        separator = self.separator
+        values = values.str.strip().str.replace(r"^[\s,]+|[\s,]+$", "", regex=True)
+        return values.str.replace(LIST_SPLIT_PATTERN, lambda match: separator, regex=True), None
+
+
+def format_number(number):
+    """Render a parsed number without Excel's trailing '.0'."""
+    if float(number).is_integer():
+        return str(int(number))
+    return repr(float(number))
+
+
+def format_size(amount, unit):
+    """Render amount in unit, stepping down to smaller units until the amount is whole."""
+    spelling, factor = SIZE_UNITS[unit]
+    for smaller_spelling, smaller_factor in SIZE_UNITS.values():
+        if smaller_factor > factor:
+            continue
+        scaled = round(amount * factor / smaller_factor, 6)
+        if scaled.is_integer():
+            return f"{int(scaled)}{smaller_spelling}"
+    return None
+
+
+def parse_size(value):
+    """Return (amount, unit) for a size string such as '10 gb', or None when it is not a size."""
+    match = SIZE_PATTERN.match(str(value))
+    if match is None or match.group(2).lower() not in SIZE_UNITS:
+        return None
+    return float(match.group(1)), match.group(2).lower()
+
+
+class NumberFieldPlan(FieldPlan):
+    """Numeric field: Excel floats are normalized and min/max bounds enforced."""
+
+    kind = 'number'
+    keywords = frozenset()  # Accepted values that have no numeric form
+
+    def __init__(self, field_config):
+        super().__init__(field_config)
+        self.min_value = field_config.get('min_value')
+        self.max_value = field_config.get('max_value')
+        self.min_bound = None if self.min_value is None else self.parse_bound(self.min_value)
+        self.max_bound = None if self.max_value is None else self.parse_bound(self.max_value)
+
+    def parse_value(self, value):
+        """Numeric value of a processed cell, or None when it is not valid for this type."""
+        if '_' in value:  # float() takes digit separators, pandas does not
+            return None
+        try:
+            number = float(value)
+        except ValueError:
+            return None
+        return number if math.isfinite(number) else None
+
+    def format_value(self, value, number):
+        return format_number(number)
+
+    def range_error(self, value, number):
+        if self.min_bound is not None and number < self.min_bound:
+            return f"Value '{value}' for field {self.name} is below the minimum {self.min_value}"
+        if self.max_bound is not None and number > self.max_bound:
+            return f"Value '{value}' for field {self.name} is above the maximum {self.max_value}"
+        return None
+
+    def process(self, value):
+        value = str(value).strip()
+        number = self.parse_value(value)
+        if number is None:
+            raise ValueError(f"Invalid {self.kind} '{value}' for field {self.name}")
+        error = self.range_error(value, number)
+        if error is not None:
+            raise ValueError(error)
+        return self.format_value(value, number)
+
+    def process_column(self, values):
+        values = values.str.strip()
+        numbers = self.numeric_column(values)
+        invalid = numbers.isna()
+        errors = pd.Series(None, index=values.index, dtype=object)
+        if invalid.any():
+            errors[invalid] = f"Invalid {self.kind} '" + values[invalid] + f"' for field {self.name}"
+        if self.min_bound is not None:
+            below = ~invalid & (numbers < self.min_bound)
+            if below.any():
+                errors[below] = "Value '" + values[below] + f"' for field {self.name} is below the minimum {self.min_value}"
+        if self.max_bound is not None:
+            above = ~invalid & (numbers > self.max_bound)
+            if above.any():
+                errors[above] = "Value '" + values[above] + f"' for field {self.name} is above the maximum {self.max_value}"
+
+        processed = values.copy()
+        if not invalid.all():
+            processed[~invalid] = self.format_column(values[~invalid], numbers[~invalid])
+        errors = errors[errors.notna()]
+        return processed, errors if len(errors) else None
+
+    def format_column(self, values, numbers):
+        # format_value once per distinct value, so whole numbers stay Python ints of any size
+        codes, distinct = pd.factorize(values)
+        _, first = np.unique(codes, return_index=True)
+        formatted = [self.format_value(value, number) for value, number in zip(distinct, numbers.to_numpy()[first])]
+        return pd.Series(np.array(formatted, dtype=object)[codes], index=values.index)
+
+    def numeric_column(self, values):
+        # parse_value once per distinct value: pandas' own parser rounds differently and
+        # rejects digits float() takes, such as full-width ones
+        codes, distinct = pd.factorize(values)
+        # A trailing NaN for the missing values (code -1)
+        parsed = np.array([self.parse_value(value) for value in distinct] + [None], dtype=float)
+        return pd.Series(parsed[codes], index=values.index)
+
+    def parse_bound(self, bound):
+        if isinstance(bound, bool):
+            return None
+        if isinstance(bound, (int, float)):
+            return bound
+        return self.parse_value(str(bound).strip())
+
+
+class IntegerFieldPlan(NumberFieldPlan):
+    """Number field that only accepts whole values ('10.0' from Excel becomes '10')."""
+
+    kind = 'integer'
+
+    def parse_value(self, value):
+        number = super().parse_value(value)
+        if number is None or not number.is_integer():
+            return None
+        return number
+
+
+class SizeFieldPlan(NumberFieldPlan):
+    """Capacity field such as '10 gb' normalized to the CLI's '10GB'; ranges compare bytes."""
+
+    kind = 'size'
+    keywords = frozenset([SIZE_REMAIN])
+
+    def parse_value(self, value):
+        size = parse_size(value)
+        if size is None or format_size(*size) is None:
+            return None
+        amount, unit = size
+        return amount * SIZE_UNITS[unit][1]
+
+    def format_value(self, value, number):
+        return format_size(*parse_size(value))
+
+    def process(self, value):
+        if str(value).strip().lower() == SIZE_REMAIN:
+            return SIZE_REMAIN
+        return super().process(value)
+
+    def process_column(self, values):
+        remain = values.str.strip().str.lower() == SIZE_REMAIN
+        processed, errors = super().process_column(values.where(~remain, SIZE_REMAIN))
+        if errors is not None:
+            errors = errors[~remain.reindex(errors.index)]
+            errors = errors if len(errors) else None
+        return processed, errors
+
+
+
+FIELD_PLANS = {
+    'text': FieldPlan,
+    'select': SelectFieldPlan,
+    'list': ListFieldPlan,
+    'number': NumberFieldPlan,
+    'integer': IntegerFieldPlan,
+    'size': SizeFieldPlan
+}
+
+
+def compile_field(field_config):
+    """Build the plan object for a single field configuration."""
+    plan_class = FIELD_PLANS.get(field_config.get('field_type', 'text'), FieldPlan)
+    return plan_class(field_config)
+
+
+_field_cache = {}
+
+
+def get_field_plan(field_config):
+    """Return the cached plan of a field configuration, compiling it on first use.
+
+    Plans are kept per config object, like get_operation_plan, so the scalar API compiles
+    each field once however many cells it processes.
+    """
+    plan = _field_cache.get(id(field_config))
+    if plan is None or plan.config is not field_config:
+        plan = compile_field(field_config)
+        _field_cache[id(field_config)] = plan
+    return plan
+
+
+class OperationPlan:
+    """Reusable, pre-compiled form of one operation from the commands JSON."""
+
+    def __init__(self, operation_config):
+        self.source = operation_config
+        self.cli_prefix = operation_config['cli_prefix']
+        self.mandatory = [compile_field(field) for field in operation_config.get('mandatory', [])]
+        self.optional = [compile_field(field) for field in operation_config.get('optional', [])]
+        self.validator = None  # Built on first use by validation.get_operation_validator
+
+    def build_command(self, row):
+        """Generate a single command from a row (pandas Series or dict)."""
+        command_parts = [self.cli_prefix]
+
+        for field in self.mandatory:
+            processed_value = field.evaluate(row.get(field.name))
+            if processed_value is None:
+                raise ValueError(f"Missing mandatory field: {field.name}")
+            command_parts.append(f"{field.name}={processed_value}")
+
+        for field in self.optional:
+            if field.name in row:
+                processed_value = field.evaluate(row[field.name])
+                if processed_value is not None:
+                    command_parts.append(f"{field.name}={processed_value}")
+
+        return ' '.join(command_parts)
+
+    def generate_frame(self, frame):
+        """Column-wise equivalent of build_command for every row of a DataFrame.
+
+        Returns (commands, rejected, reasons): commands is a Series of command strings,
+        rejected a boolean mask of rows build_command would have refused and reasons the
+        matching error message for those rows.
+        """
+        frame = row_aligned_frame(frame)
+        commands = pd.Series(self.cli_prefix, index=frame.index, dtype=object)
+        reasons = pd.Series(None, index=frame.index, dtype=object)
+
+        for field in self.mandatory:
+            if field.name in frame.columns:
+                values, errors = field.evaluate_column(frame[field.name])
+            else:
+                values = pd.Series(None, index=frame.index, dtype=object)
+                errors = pd.Series(None, index=frame.index, dtype=object)
+            errors = errors.where(errors.notna() | values.notna(), f"Missing mandatory field: {field.name}")
+            reasons = reasons.where(reasons.notna(), errors)
+            commands = self._append_fragments(commands, field.name, values)
+
+        for field in self.optional:
+            if field.name not in frame.columns:
+                continue
+            values, errors = field.evaluate_column(frame[field.name])
+            reasons = reasons.where(reasons.notna(), errors)
+            commands = self._append_fragments(commands, field.name, values)
+
+        rejected = reasons.notna()
+        return commands, rejected, reasons
+
+    @staticmethod
+    def _append_fragments(commands, name, values):
+        present = values.notna()
+        if not present.any():
+            return commands
+        fragments = pd.Series('', index=values.index, dtype=object)
+        fragments[present] = f" {name}=" + values[present]
+        return commands + fragments
+
+
+_plan_cache = {}
+
+
+def get_operation_plan(config, resource_type, command_type, device_type=None):
+    """Return the cached plan for (device, resource, operation), compiling it when the config changed."""
+    try:
+        operation_config = config[resource_type]['operations'][command_type]
+    except KeyError:
+        raise ValueError(f"Unsupported operation: {resource_type}/{command_type}")
+
+    key = (device_type, resource_type, command_type)
+    plan = _plan_cache.get(key)
+    if plan is None or plan.source is not operation_config:
+        plan = OperationPlan(operation_config)
+        _plan_cache[key] = plan
+    return plan
+
+
+def clear_plan_cache():
+    """Drop every compiled plan."""
+    _plan_cache.clear()
+    _field_cache.clear()
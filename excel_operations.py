@@ -1,25 +1,18 @@
 import os
 from tkinter import messagebox, filedialog
-from utils import load_config, encapsulate_results, open_directory
-from file_operations import create_excel_for_resource
+from utils import load_config, open_directory
+from file_operations import copy_template, set_active_sheet
 from import_operations import process_imported_data
 from gui_functions import toggle_loading
 
 def open_excel_with_sheet(excel_path, sheet_name):
     try:
-        from openpyxl import load_workbook
-        try:
-            # Attempt to open the workbook
-            workbook = load_workbook(excel_path)
-            if sheet_name in workbook.sheetnames:
-                workbook.active = workbook[sheet_name]
-                workbook.save(excel_path)
-            os.startfile(excel_path)
-        except PermissionError:
-            # If the file is already open, inform the user
-            messagebox.showinfo("Info", f"The Excel file '{excel_path}' is already open. Please close it and try again.")
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred while opening the Excel sheet: {e}")
+        # Only the workbook's view is rewritten, and only when another tab is active
+        set_active_sheet(excel_path, sheet_name)
+        os.startfile(excel_path)
+    except PermissionError:
+        # If the file is already open, inform the user
+        messagebox.showinfo("Info", f"The Excel file '{excel_path}' is already open. Please close it and try again.")
     except Exception as e:
         messagebox.showerror("Error", f"An error occurred while opening the Excel sheet: {e}")
 
@@ -35,7 +28,7 @@ def open_excel(script_type, command_type, device_var):
 
         excel_path = os.path.join(documents_folder, f'{device_var}_{script_type}_commands.xlsx')
         if not os.path.exists(excel_path):
-            create_excel_for_resource(script_type, excel_path, device_var)
+            copy_template(script_type, excel_path, device_var)
 
         if os.path.exists(excel_path):
             open_excel_with_sheet(excel_path, command_type)
@@ -80,14 +73,8 @@ def import_excel(root):
         root.update()  # Force immediate UI refresh (stronger than update_idletasks)
         
         try:
-            # Process the file
-            process_imported_data(file_path)
-            
-            # Update loading message (force UI update)
-            toggle_loading(root, True, "Creating zip archive...")
-            root.update()
-            
-            zip_path = encapsulate_results()
+            # Process the file, streaming the commands straight into the zip archive
+            zip_path = process_imported_data(file_path, compression='deflate')
             
             # Success message
             success_msg = "Excel file processed successfully!"
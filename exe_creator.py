@@ -1,6 +1,8 @@
 import subprocess
 import os
 import shutil
+from utils import load_config, get_config_cache_path
+from file_operations import build_template_cache, TEMPLATE_CACHE_DIR
 
 def create_executable():
     """Create the executable using PyInstaller."""
@@ -10,6 +12,7 @@ def create_executable():
     # Additional files to include in the executable
     add_data = [
         ("command_generator.py", "."),
+        ("command_plans.py", "."),
         ("file_operations.py", "."),
         ("gui_helpers.py", "."),
         ("import_operations.py", "."),
@@ -17,9 +20,26 @@ def create_executable():
         ("oceanstor_dorado_commands.json", "."),
         ("oceanstor_pacific_commands.json", "."),
         ("utils.py", "."),
+        ("workbook_session.py", "."),
+        ("validation.py", "."),
+        ("import_context.py", "."),
+        ("import_output.py", "."),
+        ("import_cache.py", "."),
+        ("import_diff.py", "."),
         ("Documents", "Documents"),  # Include the Documents directory
     ]
 
+    # Ship the pre-parsed config caches so the executable skips JSON parsing on start
+    for device_type in ("OceanStor Dorado", "OceanStor Pacific"):
+        load_config(device_type)
+        cache_path = get_config_cache_path(f"{device_type.lower().replace(' ', '_')}_commands.json")
+        if os.path.exists(cache_path):
+            add_data.append((cache_path, "."))
+
+    # Ship the prebuilt Excel templates so opening one is a file copy from the first launch
+    build_template_cache(["OceanStor Dorado", "OceanStor Pacific"])
+    add_data.append((TEMPLATE_CACHE_DIR, "Templates"))
+
     # Path to the icon file (update this to your actual icon path)
     icon_path = os.path.join("Icons", "exe_icon.ico")
 
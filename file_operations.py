@@ -1,19 +1,39 @@
 import os
+import re
+import copy
+import json
+import glob
+import shutil
+import hashlib
+import threading
+import zipfile
+from xml.sax.saxutils import unescape
 from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Border, Side, Alignment, Font
+from openpyxl.styles import PatternFill, Border, Side, Alignment, Font, NamedStyle
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.worksheet.datavalidation import DataValidation
 from openpyxl.utils import get_column_letter
 from utils import load_config
 
+HEADER_STYLE = "Template Header"
+# Bump when create_excel_for_resource lays templates out differently so cached ones are rebuilt
+TEMPLATE_VERSION = 1
+TEMPLATE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Templates")
+
 def create_excel_for_resource(resource_type, excel_path, device_var, num_rows=1000):
-    """Create an Excel file for a specific resource type with styling and multiple rows for user input."""
+    """Create an Excel file for a specific resource type with styling and multiple rows for user input.
+
+    The workbook is streamed in openpyxl write-only mode. Input cells are styled through
+    their column (fill, border and alignment on the column, which Excel applies to every
+    empty cell) and headers share one named style, so the file only holds the header
+    row. num_rows is the number of rows the dropdowns cover.
+    """
     if not os.path.exists(excel_path):
         config = load_config(device_var)
         resource_config = config.get(resource_type, {}).get('operations', {})
 
         # Create a new workbook
-        workbook = Workbook()
-        workbook.remove(workbook.active)  # Remove the default sheet
+        workbook = Workbook(write_only=True)
 
         # Define styles
         mandatory_fill = PatternFill(start_color="FFD3D3", end_color="FFD3D3", fill_type="solid")  # Light red for mandatory fields
@@ -22,6 +42,8 @@ def create_excel_for_resource(resource_type, excel_path, device_var, num_rows=10
         header_font = Font(color="FFFFFF", bold=True)  # White and bold for headers
         border = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
         alignment = Alignment(horizontal="center", vertical="center")
+        workbook.add_named_style(NamedStyle(name=HEADER_STYLE, fill=header_fill, font=header_font,
+                                            border=border, alignment=alignment))
 
         # Create sheets for each command type (Create, Change, Show, etc.)
         for command_type, command_config in resource_config.items():
@@ -29,22 +51,12 @@ def create_excel_for_resource(resource_type, excel_path, device_var, num_rows=10
             
             # Combine mandatory and optional fields
             all_fields = command_config.get('mandatory', []) + command_config.get('optional', [])
-            
-            # Write headers
             headers = [field["name"] for field in all_fields]
-            sheet.append(headers)
 
-            # Apply header styles
-            for col_idx, header in enumerate(headers, start=1):
-                cell = sheet.cell(row=1, column=col_idx)
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.border = border
-                cell.alignment = alignment
-
-            # Add data validation and apply styles
+            # Add data validation and apply column styles
             for col_idx, field in enumerate(all_fields, start=1):
                 field_type = field.get('field_type', 'text')
+                column_letter = get_column_letter(col_idx)
                 
                 # Add dropdown for select fields
                 if field_type == "select":
@@ -57,23 +69,24 @@ def create_excel_for_resource(resource_type, excel_path, device_var, num_rows=10
                     dv.errorTitle = "Invalid Entry"
                     dv.prompt = "Please select a value from the dropdown."
                     dv.promptTitle = "Select Value"
-                    sheet.add_data_validation(dv)
-                    
-                    column_letter = get_column_letter(col_idx)
+                    sheet.data_validations.append(dv)
                     dv.add(f"{column_letter}2:{column_letter}{num_rows + 1}")
 
-                # Apply cell styles
+                # Style the column instead of every input cell, and adjust its width
                 is_mandatory = field in command_config.get('mandatory', [])
-                for row_idx in range(2, num_rows + 2):
-                    cell = sheet.cell(row=row_idx, column=col_idx)
-                    cell.fill = mandatory_fill if is_mandatory else optional_fill
-                    cell.border = border
-                    cell.alignment = alignment
-
-            # Adjust column widths
-            for col_idx, header in enumerate(headers, start=1):
-                column_letter = get_column_letter(col_idx)
-                sheet.column_dimensions[column_letter].width = max(len(header) + 2, 15)
+                column = sheet.column_dimensions[column_letter]
+                column.fill = mandatory_fill if is_mandatory else optional_fill
+                column.border = border
+                column.alignment = alignment
+                column.width = max(len(field["name"]) + 2, 15)
+
+            # Write headers
+            header_cells = []
+            for header in headers:
+                cell = WriteOnlyCell(sheet, value=header)
+                cell.style = HEADER_STYLE
+                header_cells.append(cell)
+            sheet.append(header_cells)
 
         # Save the workbook
         workbook.save(excel_path)
@@ -81,4 +94,125 @@ def create_excel_for_resource(resource_type, excel_path, device_var, num_rows=10
         return True
     else:
         print(f"Excel file already exists: {excel_path}")
-        return False
\ No newline at end of file
+        return False
+
+def template_key(resource_type, device_var, num_rows=1000):
+    """Hash of everything a resource's template is built from: its operations config, the row count and the builder version."""
+    operations = load_config(device_var).get(resource_type, {}).get('operations', {})
+    payload = json.dumps([TEMPLATE_VERSION, num_rows, operations], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def get_template_path(resource_type, device_var, num_rows=1000, cache_dir=TEMPLATE_CACHE_DIR):
+    """Path of the cached template of a resource, building it first when it is missing.
+
+    Templates are named after the hash of their config (template_key), so editing
+    oceanstor_*_commands.json makes the next call build a new one; the stale ones of the
+    resource are removed then.
+    """
+    stem = f"{device_var}_{resource_type}_"
+    template_path = os.path.join(cache_dir, f"{stem}{template_key(resource_type, device_var, num_rows)[:16]}.xlsx")
+    if os.path.exists(template_path):
+        return template_path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # The prebuild thread and the GUI may build the same template at once
+    temp_path = f"{template_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        create_excel_for_resource(resource_type, temp_path, device_var, num_rows)
+        os.replace(temp_path, template_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    stale_pattern = f"{glob.escape(stem)}{'[0-9a-f]' * 16}.xlsx"
+    for stale_path in glob.glob(os.path.join(glob.escape(cache_dir), stale_pattern)):
+        if stale_path != template_path:
+            os.remove(stale_path)
+    return template_path
+
+def copy_template(resource_type, excel_path, device_var, num_rows=1000, cache_dir=TEMPLATE_CACHE_DIR):
+    """Create the Excel file of a resource by copying its cached template (see get_template_path)."""
+    if os.path.exists(excel_path):
+        print(f"Excel file already exists: {excel_path}")
+        return False
+    shutil.copyfile(get_template_path(resource_type, device_var, num_rows, cache_dir), excel_path)
+    print(f"Excel template copied for {resource_type} to: {excel_path}")
+    return True
+
+def build_template_cache(device_types, num_rows=1000, cache_dir=TEMPLATE_CACHE_DIR):
+    """Build the cached template of every resource of these devices that is not up to date yet."""
+    paths = []
+    for device_var in device_types:
+        for resource_type in load_config(device_var):
+            paths.append(get_template_path(resource_type, device_var, num_rows, cache_dir))
+    return paths
+
+WORKBOOK_PART = "xl/workbook.xml"
+_SHEET_TAG = re.compile(r'<(?:\w+:)?sheet\b[^>]*>')
+_SHEETS_TAG = re.compile(r'<((?:\w+:)?)sheets\b')
+_WORKBOOK_VIEW_TAG = re.compile(r'<((?:\w+:)?)workbookView\b[^>]*>')
+_ACTIVE_TAB = re.compile(r'\sactiveTab="(\d+)"')
+
+def _attribute(tag, name):
+    match = re.search(rf'\s{name}="([^"]*)"', tag)
+    return unescape(match.group(1), {'&quot;': '"', '&apos;': "'"}) if match else None
+
+def set_active_sheet(excel_path, sheet_name):
+    """Make sheet_name the tab Excel opens on by editing activeTab in xl/workbook.xml.
+
+    Only that small part changes; the other members are copied into the new file without
+    openpyxl loading the workbook. Returns False, leaving the file untouched, when the
+    sheet is missing or hidden or is already the active one.
+    """
+    with zipfile.ZipFile(excel_path) as source:
+        workbook_xml = source.read(WORKBOOK_PART).decode('utf-8')
+
+    sheets = _SHEET_TAG.findall(workbook_xml)
+    names = [_attribute(tag, 'name') for tag in sheets]
+    if sheet_name not in names:
+        return False
+    index = names.index(sheet_name)
+    if _attribute(sheets[index], 'state') in ('hidden', 'veryHidden'):
+        return False
+
+    view = _WORKBOOK_VIEW_TAG.search(workbook_xml)
+    if view is None:
+        # No view stored: Excel opens the first sheet, add one naming ours
+        sheets_tag = _SHEETS_TAG.search(workbook_xml)
+        ns = sheets_tag.group(1)
+        new_xml = (f'{workbook_xml[:sheets_tag.start()]}<{ns}bookViews><{ns}workbookView activeTab="{index}"/>'
+                   f'</{ns}bookViews>{workbook_xml[sheets_tag.start():]}')
+    else:
+        tag = view.group(0)
+        active = _ACTIVE_TAB.search(tag)
+        if int(active.group(1) if active else 0) == index:
+            return False
+        if active:
+            new_tag = f'{tag[:active.start()]} activeTab="{index}"{tag[active.end():]}'
+        else:
+            name_end = len(f"<{view.group(1)}workbookView")
+            new_tag = f'{tag[:name_end]} activeTab="{index}"{tag[name_end:]}'
+        new_xml = f'{workbook_xml[:view.start()]}{new_tag}{workbook_xml[view.end():]}'
+
+    _replace_zip_member(excel_path, WORKBOOK_PART, new_xml.encode('utf-8'))
+    return True
+
+def _replace_zip_member(zip_path, member_name, data):
+    """Rewrite a zip with one member replaced and the others copied with their names, dates and codecs.
+
+    Members are streamed through ZipFile.open, so none is held in memory whole.
+    """
+    temp_path = f"{zip_path}.{os.getpid()}.tmp"
+    try:
+        with zipfile.ZipFile(zip_path) as source, zipfile.ZipFile(temp_path, 'w') as target:
+            for info in source.infolist():
+                # A copy, as writing updates the offsets and sizes source reads by
+                moved = copy.copy(info)
+                if info.filename == member_name:
+                    target.writestr(moved, data)
+                    continue
+                with source.open(info) as member, target.open(moved, 'w') as copied:
+                    shutil.copyfileobj(member, copied)
+        os.replace(temp_path, zip_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
@@ -5,14 +5,13 @@ from tkinter import ttk
 from tkinter import messagebox
 from PIL import Image, ImageTk
 
-# Loading indicator state
-_loading_window = None
-_loading_label = None
-_loading_progress = None
-
 def toggle_loading(root, state, message="Processing..."):
-    """Modern styled loading indicator"""
-    global _loading_window, _loading_label, _loading_progress
+    """Modern styled loading indicator.
+
+    The overlay's (window, label, progress bar) are kept on root itself, so every root
+    window has its own and nothing outlives the window it belongs to.
+    """
+    _loading_window, _loading_label, _loading_progress = getattr(root, '_loading_overlay', (None, None, None))
 
     if state:  # Show loading window
         if _loading_window is None:
@@ -78,6 +77,7 @@ def toggle_loading(root, state, message="Processing..."):
             )
             _loading_progress.pack()
             _loading_progress.start(10)
+            root._loading_overlay = (_loading_window, _loading_label, _loading_progress)
             
             # Force immediate display
             _loading_window.update_idletasks()
@@ -90,7 +90,7 @@ def toggle_loading(root, state, message="Processing..."):
     elif _loading_window:  # Hide loading window
         _loading_progress.stop()
         _loading_window.destroy()
-        _loading_window = None
+        root._loading_overlay = None, None, None
         root.update_idletasks()
 
 def create_status_bar(parent):
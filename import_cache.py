@@ -0,0 +1,147 @@
+import os
+import json
+import hashlib
+import pandas as pd
+from import_output import write_outputs
+
+# Bump when the translators change so caches written by older versions are ignored
+CACHE_VERSION = 2
+CACHE_DIR_NAME = '.import_cache'
+
+def row_hashes(df):
+    """64-bit content hash of every row, aligned to df.index.
+
+    Object columns also hash the type of each cell, so 1 and '1' differ like they do for
+    the translators.
+    """
+    keyed = df.copy()
+    for column in df.columns[df.dtypes == object]:
+        keyed[f"{column}\0type"] = df[column].map(lambda value: type(value).__name__)
+    return pd.util.hash_pandas_object(keyed, index=False)
+
+def frame_schema(df):
+    """Column names and dtypes; rows hashed under another schema are not comparable."""
+    return json.dumps([[str(column), str(dtype)] for column, dtype in df.dtypes.items()])
+
+class SheetState:
+    """Content hashes of one sheet against the manifest entry of the previous import.
+
+    unchanged flags the rows whose hash was already imported; previous_rows maps the row
+    hashes of the previous import to their (vstore, commands), commands holding one
+    command (or None) per output of the sheet.
+    """
+
+    def __init__(self, cache, sheet_name, df, context):
+        self.cache = cache
+        self.sheet_name = sheet_name
+        self.hashes = row_hashes(df)
+        self.schema = frame_schema(df)
+        digest = hashlib.sha256()
+        digest.update(json.dumps([CACHE_VERSION, self.schema, context.group_vstores,
+                                  sorted(map(str, context.vstore_names.items()))]).encode('utf-8'))
+        digest.update(self.hashes.to_numpy().tobytes())
+        self.key = digest.hexdigest()
+
+        self.previous = cache.entry(sheet_name)
+        previous_rows = {}
+        if self.previous is not None and self.previous['schema'] == self.schema:
+            previous_rows = {h: (vstore, commands) for h, vstore, commands in self.previous['rows']}
+        self.previous_rows = previous_rows
+        self.unchanged = self.hashes.isin(previous_rows.keys()) if previous_rows else pd.Series(False, index=df.index)
+        self.rows = []
+        self.outputs = []
+
+    def replay(self, sink, context):
+        """Rewrite the outputs of an unchanged sheet from its cached rows. False when it has to be translated."""
+        if self.previous is None or self.previous['key'] != self.key or not self.previous['complete']:
+            return False
+        rows = self.previous['rows']
+        outputs = {output: [commands[position] for _, _, commands in rows]
+                   for position, output in enumerate(self.previous['output_names'])}
+        write_outputs(sink, outputs, [vstore for _, vstore, _ in rows], context)
+        for name, items in self.previous['counters'].items():
+            getattr(context, name).update(counter_from_items(items))
+        context.reused['sheets'] += 1
+        context.reused['rows'] += len(self.hashes)
+        return True
+
+    def translate(self, df, translate):
+        """Commands of df's rows, translating only the rows the previous import has not seen."""
+        hashes = self.hashes.loc[df.index]
+        known = hashes.isin(self.previous_rows.keys())
+        # Looked up one by one so a cached None (a row without a command) stays None, not NaN
+        commands = pd.Series([self.previous_rows[h][1][0] if h in self.previous_rows else None
+                              for h in hashes.tolist()], index=df.index, dtype=object)
+        if not known.all():
+            commands[~known] = translate(df[~known]).tolist()
+        return commands.tolist(), int(known.sum())
+
+    def record(self, df, row_vstores, outputs):
+        """Keep the vstore and commands written for df's rows, in the order they were written."""
+        self.outputs = list(outputs)
+        per_row = zip(*outputs.values())
+        self.rows.extend([h, vstore, list(commands)]
+                         for h, vstore, commands in zip(self.hashes.loc[df.index].tolist(), row_vstores, per_row))
+
+    def store(self, context, complete=True):
+        """Save this sheet's manifest entry. complete is False when the rows written are not the full sheet.
+
+        Unchanged rows that were not written (delta mode) keep their cached commands, so a
+        later import can still reuse them.
+        """
+        recorded = {h for h, _, _ in self.rows}
+        carried = [[h, *self.previous_rows[h]] for h in dict.fromkeys(self.hashes[self.unchanged].tolist())
+                   if h not in recorded]
+        entry = {
+            'version': CACHE_VERSION,
+            'key': self.key,
+            'schema': self.schema,
+            'complete': complete,
+            'output_names': self.outputs,
+            'rows': self.rows + carried,
+            'counters': {name: counter_items(getattr(context, name))
+                         for name in ('commands', 'skipped', 'vstore_switches_saved')}
+        }
+        self.cache.save_entry(self.sheet_name, entry)
+
+def counter_items(counter):
+    """A Counter as JSON: [key, count] pairs, tuple keys as lists."""
+    return [[list(key) if isinstance(key, tuple) else key, count] for key, count in counter.items()]
+
+def counter_from_items(items):
+    return {tuple(key) if isinstance(key, list) else key: count for key, count in items}
+
+class ImportCache:
+    """Per-sheet manifest of an import: row hashes with the vstore and commands of every row.
+
+    Kept as one JSON file per sheet in <results_dir>/.import_cache, so sheets translated
+    in worker processes each write their own entry. The command files of an unchanged
+    sheet are rebuilt from it, no copy of them is kept.
+    """
+
+    def __init__(self, results_dir):
+        self.cache_dir = os.path.join(results_dir, CACHE_DIR_NAME)
+
+    def entry_path(self, sheet_name):
+        return os.path.join(self.cache_dir, f"{sheet_name}.json")
+
+    def entry(self, sheet_name):
+        """The previous import's entry for a sheet, or None."""
+        try:
+            with open(self.entry_path(sheet_name), encoding='utf-8') as f:
+                entry = json.load(f)
+        except Exception:
+            return None  # Missing or unreadable - translate from scratch
+        return entry if isinstance(entry, dict) and entry.get('version') == CACHE_VERSION else None
+
+    def save_entry(self, sheet_name, entry):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry_path = self.entry_path(sheet_name)
+        temp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            # Vstore names read as numbers may be numpy scalars; their text is what gets written
+            json.dump(entry, f, separators=(',', ':'), default=str)
+        os.replace(temp_path, entry_path)
+
+    def sheet(self, sheet_name, df, context):
+        return SheetState(self, sheet_name, df, context)
@@ -1,68 +1,55 @@
-import pandas as pd
-from .import_utils import format_boolean
+from .import_utils import (
+    row_values, column_values, first_present, truthy, as_text, format_boolean_column, append_params,
+    no_commands, keep_commands
+)
 
-def generate_cifs_permission_command(row):
-    """Generate CIFS share permission command with comprehensive parameter handling."""
-    access_name = row.get('Access Name')
-    share_id = row.get('Share ID')
-    share_name = row.get('Share Name')
-    permission_type = row.get('Permission Type', row.get('Access Type'))
-    
-    if not access_name or not (share_id or share_name):
-        return None
-    
-    share_ref = f"share_name={share_name}" if share_name else f"share_id={share_id}"
-    required_params = [
-        f"access_name={access_name}",
-        share_ref
-    ]
-    
-    permission_mapping = {
-        'read only': 'read_only',
-        'read-only': 'read_only',
-        'read write': 'read_write',
-        'read-write': 'read_write',
-        'read and write': 'read_write',
-        'no access': 'no_access',
-        'no-access': 'no_access',
-        'all control': 'all_control',
-        'all-control': 'all_control',
-        'full control': 'all_control',
-        'full-control': 'all_control',
-        '1': 'read_only',
-        '2': 'read_write',
-        '3': 'no_access',
-        '4': 'all_control'
-    }
-    
-    optional_params = []
-    if permission_type and not pd.isna(permission_type):
-        perm_value = str(permission_type).lower().strip()
-        formatted_permission = permission_mapping.get(perm_value, perm_value)
-        optional_params.append(f"permission_type={formatted_permission}")
-    else:
-        return None
-    
-    if 'Domain Type' in row and not pd.isna(row['Domain Type']):
-        domain_type = str(row['Domain Type']).lower()
-        optional_params.append(f"domain_type={domain_type}")
-    
-    additional_params = {
-        'sync_enabled': 'Sync Enabled',
-        'inherit_enabled': 'Inherit Enabled',
-        'inherit_owner': 'Inherit Owner',
-        'inherit_group': 'Inherit Group',
-        'inherit_dacl': 'Inherit DACL',
-        'inherit_sacl': 'Inherit SACL'
-    }
-    
-    for param, excel_col in additional_params.items():
-        if excel_col in row and not pd.isna(row[excel_col]):
-            value = format_boolean(row[excel_col])
-            if value is not None:
-                optional_params.append(f"{param}={value}")
-    
-    all_params = required_params + optional_params
-    param_str = " " + " ".join(all_params) if all_params else ""
-    
-    return f"create share_permission cifs{param_str}"
+CIFS_PERMISSION_TYPES = {
+    'read only': 'read_only',
+    'read-only': 'read_only',
+    'read write': 'read_write',
+    'read-write': 'read_write',
+    'read and write': 'read_write',
+    'no access': 'no_access',
+    'no-access': 'no_access',
+    'all control': 'all_control',
+    'all-control': 'all_control',
+    'full control': 'all_control',
+    'full-control': 'all_control',
+    '1': 'read_only',
+    '2': 'read_write',
+    '3': 'no_access',
+    '4': 'all_control'
+}
+
+CIFS_PERMISSION_FLAGS = {
+    'sync_enabled': 'Sync Enabled',
+    'inherit_enabled': 'Inherit Enabled',
+    'inherit_owner': 'Inherit Owner',
+    'inherit_group': 'Inherit Group',
+    'inherit_dacl': 'Inherit DACL',
+    'inherit_sacl': 'Inherit SACL'
+}
+
+def generate_cifs_permission_commands(df):
+    """CIFS share permission command of every row of the sheet (None where no command is generated)."""
+    frame = row_values(df)
+    access_name = column_values(frame, 'Access Name')
+    share_id = column_values(frame, 'Share ID')
+    share_name = column_values(frame, 'Share Name')
+    permission_type = first_present(column_values(frame, 'Permission Type'), column_values(frame, 'Access Type'))
+    valid = truthy(access_name) & (truthy(share_id) | truthy(share_name)) & truthy(permission_type)
+    if not valid.any():
+        return no_commands(frame.index)
+
+    share_ref = ("share_id=" + as_text(share_id)).where(~truthy(share_name), "share_name=" + as_text(share_name))
+    permissions = as_text(permission_type).str.lower().str.strip()
+    permissions = permissions.map(CIFS_PERMISSION_TYPES).fillna(permissions)
+    commands = ("create share_permission cifs access_name=" + as_text(access_name) + " " + share_ref
+                + " permission_type=" + permissions)
+
+    domain_type = column_values(frame, 'Domain Type')
+    commands = append_params(commands, 'domain_type', as_text(domain_type[domain_type.notna()]).str.lower())
+    for param, excel_col in CIFS_PERMISSION_FLAGS.items():
+        if excel_col in frame.columns:
+            commands = append_params(commands, param, format_boolean_column(frame[excel_col]))
+    return keep_commands(commands, valid)
@@ -1,77 +1,63 @@
 import pandas as pd
-
-def append_y_command_if_browse_enabled(optional_params):
-    """
-    Appends a 'y' command to the result if 'browse_enabled' is 'yes'.
-    This function can be commented out if not needed.
-    """
-    for param in optional_params:
-        if param.startswith('browse_enabled=yes'):
-            return "\n y"
-    return ""
-
-def generate_cifs_share_command(row):
-    """Generate CIFS share creation command with proper yes/no values for enabled parameters."""
-    name = row.get('Share Name', row.get('Name'))
-    local_path = row.get('Local Path')
-    if not name or not local_path:
-        return None
-
-    # Preserve original case for name and local_path
-    required_params = [
-        f"name={str(name)}",  # Removed .lower()
-        f"local_path={str(local_path)}"  # Removed .lower()
-    ]
-
-    param_mapping = {
-        'Share Type': 'share_type',
-        'Oplock Enabled': 'oplock_enabled',
-        'Notify Enabled': 'notify_enabled',
-        'Continue Available Enabled': 'continue_available_enabled',
-        'Offline File Mode': 'offline_file_mode',
-        'Smb2 CA Enabled': 'smb2_ca_enabled',
-        'IP Access Control': 'ip_control_enabled',
-        'ABE Enabled': 'abe_enabled',
-        'Audit Items': 'audit_items',
-        'File Extension Filter': 'file_filter_enable',
-        'Apply Default ACL': 'apply_default_acl',
-        'Show Previous Versions Enabled': 'show_previous_versions_enabled',
-        'Show Snapshot Enabled': 'show_snapshot_enabled',
-        'Browse Enabled': 'browse_enabled',
-        'Readdir Timeout(s)': 'readdir_timeout'
-    }
-
-    yes_no_params = [
-        'oplock_enabled', 'notify_enabled', 'continue_available_enabled',
-        'smb2_ca_enabled', 'ip_control_enabled', 'abe_enabled',
-        'file_filter_enable', 'apply_default_acl',
-        'show_previous_versions_enabled', 'show_snapshot_enabled',
-        'browse_enabled'
-    ]
-
-    optional_params = []
-    for excel_col, param in param_mapping.items():
-        if excel_col in row and pd.notna(row[excel_col]):
-            value = row[excel_col]
-            value = str(value).lower()  # Keep lower() for other parameters
-
-            if param in yes_no_params:
-                if value in ['enable', 'enabled', 'yes', 'true', '1']:
-                    value = 'yes'
-                elif value in ['disable', 'disabled', 'no', 'false', '0']:
-                    value = 'no'
-                else:
-                    continue
-
-            if param == 'offline_file_mode':
-                value = value.replace(' ', '_')
-
-            optional_params.append(f"{param}={value}")
-
-    all_params = required_params + optional_params
-    param_str = " " + " ".join(all_params) if all_params else ""
-
-    # Call the function to append 'y' if browse_enabled is 'yes'
-    y_command = append_y_command_if_browse_enabled(optional_params)
-
-    return f"create share cifs{param_str}{y_command}"
\ No newline at end of file
+from .import_utils import (
+    ENABLE_VALUES, DISABLE_VALUES, row_values, column_values, first_present, truthy, as_text, append_params,
+    no_commands, keep_commands
+)
+
+CIFS_SHARE_PARAMETERS = {
+    'Share Type': 'share_type',
+    'Oplock Enabled': 'oplock_enabled',
+    'Notify Enabled': 'notify_enabled',
+    'Continue Available Enabled': 'continue_available_enabled',
+    'Offline File Mode': 'offline_file_mode',
+    'Smb2 CA Enabled': 'smb2_ca_enabled',
+    'IP Access Control': 'ip_control_enabled',
+    'ABE Enabled': 'abe_enabled',
+    'Audit Items': 'audit_items',
+    'File Extension Filter': 'file_filter_enable',
+    'Apply Default ACL': 'apply_default_acl',
+    'Show Previous Versions Enabled': 'show_previous_versions_enabled',
+    'Show Snapshot Enabled': 'show_snapshot_enabled',
+    'Browse Enabled': 'browse_enabled',
+    'Readdir Timeout(s)': 'readdir_timeout'
+}
+
+YES_NO_PARAMETERS = [
+    'oplock_enabled', 'notify_enabled', 'continue_available_enabled',
+    'smb2_ca_enabled', 'ip_control_enabled', 'abe_enabled',
+    'file_filter_enable', 'apply_default_acl',
+    'show_previous_versions_enabled', 'show_snapshot_enabled',
+    'browse_enabled'
+]
+
+def generate_cifs_share_commands(df):
+    """CIFS share creation command of every row of the sheet (None where no command is generated)."""
+    frame = row_values(df)
+    name = first_present(column_values(frame, 'Share Name'), column_values(frame, 'Name'))
+    local_path = column_values(frame, 'Local Path')
+    valid = truthy(name) & truthy(local_path)
+    if not valid.any():
+        return no_commands(frame.index)
+
+    commands = "create share cifs name=" + as_text(name) + " local_path=" + as_text(local_path)
+    browse_enabled = pd.Series(False, index=frame.index)
+    for excel_col, param in CIFS_SHARE_PARAMETERS.items():
+        if excel_col not in frame.columns:
+            continue
+        values = frame[excel_col]
+        values = as_text(values[values.notna()]).str.lower()
+
+        if param in YES_NO_PARAMETERS:
+            values = values.map(dict.fromkeys(ENABLE_VALUES, 'yes') | dict.fromkeys(DISABLE_VALUES, 'no'))
+            values = values[values.notna()]
+            if param == 'browse_enabled':
+                browse_enabled[values[values == 'yes'].index] = True
+
+        if param == 'offline_file_mode':
+            values = values.str.replace(' ', '_', regex=False)
+
+        commands = append_params(commands, param, values)
+
+    # Shares with browsing enabled ask for a confirmation, answered with y
+    commands = commands.where(~browse_enabled, commands + "\n y")
+    return keep_commands(commands, valid)
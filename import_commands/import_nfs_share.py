@@ -1,57 +1,72 @@
 import pandas as pd
-from .import_utils import format_boolean, fix_description
-
-processed_paths = set()
-def generate_nfs_share_command(row):
-    """Generate NFS share creation command using the provided column names."""
-    local_path = row.get('Local Path')
-    if not local_path:
-        return None
-
-    if local_path.endswith('/'):
-        local_path = local_path[:-1]
-    
-    if local_path in processed_paths:
-        return None
-    
-    processed_paths.add(local_path)
-    
-    required_params = [f"local_path={local_path}"]
-    
-    fs_ref = None
-    if 'Filesystem ID' in row and not pd.isna(row['Filesystem ID']):
-        fs_ref = f"file_system_id={row['Filesystem ID']}"
-    elif 'file_system_name' in row and not pd.isna(row['file_system_name']):
-        fs_ref = f"file_system_name={row['file_system_name']}"
-    
-    if fs_ref:
-        required_params.append(fs_ref)
-    
-    optional_params = []
-    param_mapping = {
-        'CharSet': 'charset',
-        'Lock Type': 'lock_type',
-        'Alias': 'alias',
-        'Audit Items': 'audit_items',
-        'show_snapshot_enabled': 'show_snapshot_enabled',
-        'fh_byte_alignment_switch': 'fh_byte_alignment_switch',
-        'Share Description': 'description'
-    }
-    
-    for excel_col, param in param_mapping.items():
-        if excel_col in row and not pd.isna(row[excel_col]):
-            value = row[excel_col]
-            
-            if param == 'description':
-                value = fix_description(value)
-                
-            if excel_col.endswith('_enabled') or excel_col.endswith('_switch'):
-                value = format_boolean(value)
-                if value is None:
-                    continue
-            optional_params.append(f"{param}={value}")
-    
-    all_params = required_params + optional_params
-    param_str = " " + " ".join(all_params) if all_params else ""
-    
-    return f"create share nfs{param_str}"
\ No newline at end of file
+from .import_utils import (
+    row_values, column_values, as_text, format_boolean_column,
+    fix_description_column, append_params, no_commands
+)
+
+NFS_SHARE_PARAMETERS = {
+    'CharSet': 'charset',
+    'Lock Type': 'lock_type',
+    'Alias': 'alias',
+    'Audit Items': 'audit_items',
+    'show_snapshot_enabled': 'show_snapshot_enabled',
+    'fh_byte_alignment_switch': 'fh_byte_alignment_switch',
+    'Share Description': 'description'
+}
+
+def generate_nfs_share_commands(df, paths=None):
+    """NFS share creation command of every row of the sheet, on rows that still hold their NaN cells.
+
+    paths is the set of local paths already exported in this import (a new set by
+    default); it is updated with the new ones. Returns (commands, duplicate, errors): commands is None
+    where no command is generated, duplicate flags rows whose path was already exported
+    and errors holds the message of rows whose Local Path is not text.
+    """
+    paths = set() if paths is None else paths
+    frame = row_values(df)
+    commands = no_commands(frame.index)
+    duplicate = pd.Series(False, index=frame.index)
+    errors = no_commands(frame.index)
+    if 'Local Path' not in frame.columns:
+        return commands, duplicate, errors
+
+    # Rows keep their NaN cells here, so an empty Local Path is truthy and fails like a number
+    local_path = frame['Local Path']
+    given = local_path.astype(bool)
+    strings = local_path.map(lambda value: isinstance(value, str)).astype(bool)
+    failed = given & ~strings
+    if failed.any():
+        errors[failed] = local_path[failed].map(
+            lambda value: f"'{type(value).__name__}' object has no attribute 'endswith'")
+
+    candidates = local_path[given & strings]
+    candidates = candidates.where(~candidates.str.endswith('/'), candidates.str[:-1])
+    seen = candidates.duplicated() | candidates.isin(paths)
+    duplicate[seen[seen].index] = True
+    new_paths = candidates[~seen]
+    paths.update(new_paths)
+    if new_paths.empty:
+        return commands, duplicate, errors
+
+    rows = frame.loc[new_paths.index]
+    created = "create share nfs local_path=" + new_paths
+    filesystem_id = column_values(rows, 'Filesystem ID')
+    filesystem_name = column_values(rows, 'file_system_name')
+    fs_ref = pd.Series('', index=rows.index, dtype=object)
+    fs_ref = fs_ref.where(filesystem_name.isna(), " file_system_name=" + as_text(filesystem_name))
+    fs_ref = fs_ref.where(filesystem_id.isna(), " file_system_id=" + as_text(filesystem_id))
+    created = created + fs_ref
+
+    for excel_col, param in NFS_SHARE_PARAMETERS.items():
+        if excel_col not in rows.columns:
+            continue
+        values = rows[excel_col]
+        values = values[values.notna()]
+        if param == 'description':
+            values = fix_description_column(values)
+        if excel_col.endswith('_enabled') or excel_col.endswith('_switch'):
+            values = format_boolean_column(values)
+        created = append_params(created, param, values)
+
+    commands[created.index] = created
+    return commands, duplicate, errors
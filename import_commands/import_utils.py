@@ -1,51 +1,104 @@
 import pandas as pd
-import unicodedata
-import re
-
-def format_boolean(value):
-    """Convert various boolean representations to yes/no."""
-    if pd.isna(value):
-        return None
-    value = str(value).lower().strip()
-    if value in ['enable', 'enabled', 'yes', 'true', '1']:
-        return "yes"
-    elif value in ['disable', 'disabled', 'no', 'false', '0']:
-        return "no"
-    return None
-
-def fix_capacity(capacity_value):
-    """Check if capacity is <= 4.000GB and change it to 10.000GB if true"""
-    try:
-        str_value = str(capacity_value).strip().upper()
+import numpy as np
+from command_plans import row_aligned_frame
+
+def fix_block_size(value):
+    """Drop the decimals of a block size string such as '16.000KB' and keep the unit last."""
+    if '.' in value:
+        value = value.split('.')[0] + ''.join([c for c in value[value.find('.'):] if not c.isdigit()])
+        value = value.replace('.', '')
+    units = ['KB', 'MB', 'GB', 'TB']
+    for unit in units:
+        if unit in value and value.endswith(unit):
+            value = value.replace(unit, '') + unit
+    return value
+
+# Helpers of the per-sheet translators. They work on the object columns returned by
+# row_values, so every cell keeps the Python type it has in a row of the sheet.
+
+ENABLE_VALUES = ['enable', 'enabled', 'yes', 'true', '1']
+DISABLE_VALUES = ['disable', 'disabled', 'no', 'false', '0']
+
+def row_values(df):
+    """The sheet as object columns holding the same values DataFrame.iterrows would yield."""
+    return row_aligned_frame(df).astype(object)
 
-        import re
-        match = re.match(r"([0-9.]+)\s*(KB|MB|GB|TB)", str_value)
-        if not match:
-            return capacity_value
+def column_values(frame, column):
+    """Values of a column as an object Series, all NaN when the sheet lacks the column."""
+    if column in frame.columns:
+        return frame[column]
+    return pd.Series(np.nan, index=frame.index, dtype=object)
 
-        value, unit = match.groups()
-        value = float(value)
+def first_present(*columns):
+    """Each row's value from the first column where it is set."""
+    result = columns[-1]
+    for values in reversed(columns[:-1]):
+        result = values.where(values.notna(), result)
+    return result
 
-        if unit == "GB":
-            if value < 4.000:
-                return "10.000GB"
-        elif unit in ("KB", "MB"):
-            return "10.000GB"
+def truthy(values):
+    """Rows whose value is set and truthy (not empty, zero or False)."""
+    return values.notna() & values.astype(bool)
 
-    except (ValueError, TypeError):
-        pass
+def is_string(values):
+    return values.map(lambda value: isinstance(value, str)).astype(bool)
 
-    return capacity_value
+def as_text(values):
+    """Every value as the text f"{value}" gives."""
+    return values.map(str)
+
+def map_unique(values, function):
+    """Apply a scalar function once per distinct value and map the results back."""
+    return values.map({value: function(value) for value in values.unique()})
+
+def format_boolean_column(values):
+    """yes/no for the usual boolean spellings (enabled, true, 1...), None for anything else."""
+    result = pd.Series(None, index=values.index, dtype=object)
+    present = values.notna()
+    if present.any():
+        lowered = as_text(values[present]).str.lower().str.strip()
+        result[lowered[lowered.isin(ENABLE_VALUES)].index] = "yes"
+        result[lowered[lowered.isin(DISABLE_VALUES)].index] = "no"
+    return result
+
+def _to_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
 
-def fix_description(description_value):
-    """Sanitize the description string for command use"""
-    if not isinstance(description_value, str):
-        return description_value
+def fix_capacity_column(values):
+    """Raise capacities below 4GB (any KB or MB value included) to 10.000GB; other values are kept."""
+    parts = as_text(values).str.strip().str.upper().str.extract(r"^([0-9.]+)\s*(KB|MB|GB|TB)")
+    numbers = map_unique(parts[0].dropna(), _to_float).reindex(values.index)
+    small = numbers.notna() & (((parts[1] == "GB") & (numbers < 4.000)) | parts[1].isin(["KB", "MB"]))
+    return values.where(~small, "10.000GB")
 
-    fixed = description_value.replace(' ', '_')
+def fix_description_column(values):
+    """Sanitize description strings for command use: spaces become _, accents and symbols are dropped."""
+    strings = is_string(values)
+    if not strings.any():
+        return values
+    fixed = (values[strings].str.replace(' ', '_', regex=False)
+             .str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+             .str.replace(r'[^a-zA-Z0-9_\-@]', '', regex=True))
+    values = values.copy()
+    values[strings] = fixed
+    return values
 
-    fixed = unicodedata.normalize('NFKD', fixed).encode('ASCII', 'ignore').decode()
+def no_commands(index):
+    """Series of None for a sheet without any command."""
+    return pd.Series([None] * len(index), index=index, dtype=object)
 
-    fixed = re.sub(r'[^a-zA-Z0-9_\-@]', '', fixed)
+def keep_commands(commands, valid):
+    """The commands of the valid rows, None elsewhere."""
+    return commands.astype(object).where(valid, None)
 
-    return fixed
\ No newline at end of file
+def append_params(commands, param, values):
+    """Append ' param=value' to the commands of the rows where values is set."""
+    present = values.reindex(commands.index).notna()
+    if not present.any():
+        return commands
+    fragments = pd.Series('', index=commands.index, dtype=object)
+    fragments[present] = f" {param}=" + as_text(values.reindex(commands.index)[present])
+    return commands + fragments
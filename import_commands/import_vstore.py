@@ -1,14 +1,10 @@
-def generate_vstore_command(row):
-    """Generate vstore creation command."""
-    name = row.get('Vstore', row.get('Name'))
-    if not name:
-        return None
-    
-    params = []
-    if 'nas_capacity_quota' in row:
-        params.append(f"nas_capacity_quota={row['nas_capacity_quota']}")
-    if 'description' in row:
-        params.append(f"description={row['description']}")
-    
-    param_str = " " + " ".join(params) if params else ""
-    return f"create vstore general name={name}{param_str}"
\ No newline at end of file
+from .import_utils import row_values, column_values, first_present, truthy, as_text, append_params, keep_commands
+
+def generate_vstore_commands(df):
+    """Vstore creation command of every row of the sheet (None where no command is generated)."""
+    frame = row_values(df)
+    name = first_present(column_values(frame, 'Vstore'), column_values(frame, 'Name'))
+    commands = "create vstore general name=" + as_text(name)
+    for param in ('nas_capacity_quota', 'description'):
+        commands = append_params(commands, param, column_values(frame, param))
+    return keep_commands(commands, truthy(name))
@@ -0,0 +1,134 @@
+from collections import Counter
+import numpy as np
+import pandas as pd
+
+def normalize_vstore_id(value):
+    """Canonical form of a Vstore ID so 1, 1.0 and '1' compare equal. None when empty."""
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+        try:
+            value = float(value)
+        except ValueError:
+            return value
+    if pd.isna(value):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+class ImportContext:
+    """State shared by every sheet of one InfoGrab import.
+
+    The Vstore sheet is indexed once in both directions: vstore_ids maps a vstore name to
+    its ID and vstore_names maps a normalized ID back to the name.
+
+    It also holds the dedup state of the run (nfs_paths: local paths already exported as
+    NFS shares). Nothing is kept at module level, so imports can run one after another or
+    side by side, and everything is released with the context when the run ends.
+
+    The generators also count what they emit, keyed by output (the sheet name, or
+    NFS_Share_Permission for the permissions split out of NFS_Share): commands written,
+    skipped rows per (output, reason), vstore switches (and those saved by grouping) and
+    bytes written.
+    """
+
+    def __init__(self, vstore_df=None, group_vstores=False, cache=None, delta=False, baseline=None):
+        self.vstore_ids = {}
+        self.vstore_names = {}
+        if vstore_df is not None and 'Vstore' in vstore_df.columns and 'Vstore ID' in vstore_df.columns:
+            self.vstore_ids = dict(zip(vstore_df['Vstore'], vstore_df['Vstore ID']))
+        for name, vstore_id in self.vstore_ids.items():
+            # The first vstore listed with an ID wins, as a linear scan would find it
+            self.vstore_names.setdefault(normalize_vstore_id(vstore_id), name)
+
+        self.nfs_paths = set()
+        # Reorder each sheet's rows so every vstore is switched to once (see group_by_vstore)
+        self.group_vstores = group_vstores
+        # Incremental import: the ImportCache of the results directory, and whether only rows
+        # new since the previous import are emitted. sheet_state is the cached sheet's SheetState.
+        self.cache = cache
+        self.delta = delta
+        self.sheet_state = None
+        # Diff against a baseline export (import_diff.BaselineIndex): only objects it lacks are
+        # created, its shares already exist, and the objects it has but this export lacks
+        # end up in removed (sheet name -> key frame)
+        self.baseline = baseline
+        self.removed = {}
+        if baseline is not None:
+            self.nfs_paths.update(baseline.nfs_paths)
+
+        self.commands = Counter()
+        self.skipped = Counter()
+        self.vstore_switches = Counter()
+        self.bytes_written = Counter()
+        self.vstore_switches_saved = Counter()
+        self.reused = Counter()
+
+    def merge(self, other):
+        """Add the counters of another context, e.g. one filled by a worker process."""
+        self.commands.update(other.commands)
+        self.skipped.update(other.skipped)
+        self.vstore_switches.update(other.vstore_switches)
+        self.bytes_written.update(other.bytes_written)
+        self.vstore_switches_saved.update(other.vstore_switches_saved)
+        self.reused.update(other.reused)
+        self.removed.update(other.removed)
+
+    def sheet_context(self):
+        """A context with this one's indexes, dedup state and options but empty counters."""
+        context = ImportContext(group_vstores=self.group_vstores, cache=self.cache, delta=self.delta)
+        context.baseline = self.baseline
+        context.removed = self.removed
+        context.vstore_ids = self.vstore_ids
+        context.vstore_names = self.vstore_names
+        context.nfs_paths = self.nfs_paths
+        return context
+
+    def record_output(self, output, size):
+        """Record the size in bytes of a finished command file. None (not written yet) is ignored."""
+        if size is not None:
+            self.bytes_written[output] = size
+
+    def skipped_reasons(self, output):
+        """{reason: rows} of the rows skipped for an output."""
+        return {reason: count for (name, reason), count in self.skipped.items() if name == output}
+
+    def vstore_name(self, vstore_id):
+        """Name of the vstore with this ID, or None."""
+        return self.vstore_names.get(normalize_vstore_id(vstore_id))
+
+    def resolve_vstores(self, df):
+        """Vstore name of every row of a sheet (None where it has none).
+
+        The 'Vstore' column wins; otherwise 'Vstore ID' is looked up in the inverse index.
+        IDs are normalized once per distinct value and the whole column mapped in one go.
+        """
+        names = pd.Series(None, index=df.index, dtype=object)
+        if 'Vstore ID' in df.columns:
+            ids = df['Vstore ID']
+            lookup = {value: self.vstore_name(value) for value in ids.dropna().unique()}
+            names = ids.map(lookup).astype(object)
+        if 'Vstore' in df.columns:
+            names = df['Vstore'].astype(object).where(df['Vstore'].notna(), names)
+        return names.where(names.notna(), None)
+
+def count_vstore_switches(row_vstores):
+    """Number of 'change vstore' lines written for rows in this order.
+
+    Rows without a vstore stay in the current one, so only changes between named vstores count.
+    """
+    named = row_vstores.dropna()
+    return int((named != named.shift()).sum())
+
+def group_by_vstore(row_vstores):
+    """Positions that cluster the rows by vstore, so each vstore is switched to only once.
+
+    Vstores keep the order they first appear in and rows keep their order inside each
+    vstore (a stable sort), so a row never moves ahead of one it depends on. Rows without
+    a vstore stay with the vstore they ran in before, leading ones stay first.
+    """
+    effective = row_vstores.astype(object).ffill()
+    codes, _ = pd.factorize(effective)
+    return np.argsort(codes, kind='stable')
@@ -0,0 +1,103 @@
+import pandas as pd
+from import_context import ImportContext
+
+# Natural key of the objects each sheet creates. Every key but the Vstore's own also
+# includes the object's vstore, as names only have to be unique within one vstore.
+DIFF_KEYS = {
+    'Vstore': ['Vstore'],
+    'Filesystem': ['Filesystem Name'],
+    'CIFS_Share': ['Share Name'],
+    'NFS_Share': ['Local Path', 'Access Name'],
+    'CIFS_Share_Permission': ['Share Name', 'Access Name']
+}
+
+REMOVED_FILE_NAME = "Removed_objects.txt"
+
+def text_column(values):
+    """Key values as strings, '' where empty."""
+    return values.astype(object).where(values.notna(), '').astype(str)
+
+def key_frame(sheet_name, df, context):
+    """The natural key columns of a sheet as display strings ('' where empty).
+
+    Local paths drop their trailing '/', as the NFS generators do.
+    """
+    keys = pd.DataFrame(index=df.index)
+    if sheet_name != 'Vstore':
+        keys['Vstore'] = text_column(context.resolve_vstores(df))
+    for column in DIFF_KEYS[sheet_name]:
+        keys[column] = text_column(df[column]) if column in df.columns else ''
+    if 'Local Path' in keys.columns:
+        keys['Local Path'] = keys['Local Path'].str.removesuffix('/')
+    return keys
+
+def key_hashes(keys):
+    """64-bit hash of every key row, what the two exports are joined on."""
+    # Keys are mostly unique, so factorizing before hashing (categorize) only costs time
+    return pd.util.hash_pandas_object(keys, index=False, categorize=False)
+
+class BaselineIndex:
+    """Natural keys of every sheet of the baseline export, hashed once.
+
+    new_rows joins a sheet of the current export against it (a hash isin, no per-row
+    Python) and records the baseline objects missing from it in the context's removed.
+    """
+
+    def __init__(self, keys=None, hashes=None, nfs_paths=None):
+        self.keys = keys or {}
+        self.hashes = hashes or {}
+        self.nfs_paths = nfs_paths or set()
+
+    @classmethod
+    def from_workbook(cls, workbook, sheet_names):
+        """Index the given sheets of an opened baseline export."""
+        vstore_df = workbook.frame('Vstore') if workbook.has_sheet('Vstore') else None
+        context = ImportContext(vstore_df.dropna(how='all') if vstore_df is not None else None)
+        index = cls()
+        for sheet_name, df in workbook.frames(sheet_names):
+            df = df.dropna(how='all')
+            keys = key_frame(sheet_name, df, context)
+            index.keys[sheet_name] = keys
+            index.hashes[sheet_name] = key_hashes(keys)
+            if sheet_name == 'NFS_Share':
+                index.nfs_paths.update(path for path in keys['Local Path'] if path)
+        return index
+
+    def sheet_index(self, sheet_name):
+        """The part of the index one sheet needs, e.g. to send to a worker process.
+
+        Only that sheet's keys and hashes, plus the baseline share paths for NFS_Share.
+        """
+        keys = {sheet_name: self.keys[sheet_name]} if sheet_name in self.keys else {}
+        hashes = {sheet_name: self.hashes[sheet_name]} if sheet_name in self.hashes else {}
+        nfs_paths = self.nfs_paths if sheet_name == 'NFS_Share' else None
+        return BaselineIndex(keys, hashes, nfs_paths)
+
+    def new_rows(self, sheet_name, df, context):
+        """Rows of the current sheet whose object is not in the baseline."""
+        current = key_hashes(key_frame(sheet_name, df, context))
+        baseline = self.hashes.get(sheet_name)
+        if baseline is None:
+            return df
+        gone = ~baseline.isin(current)
+        if gone.any():
+            context.removed[sheet_name] = self.keys[sheet_name][gone]
+        return df[~current.isin(baseline)]
+
+    def remove_missing_sheets(self, sheet_names, context):
+        """Every object of a baseline sheet the current export does not have is removed."""
+        for sheet_name, keys in self.keys.items():
+            if sheet_name not in sheet_names and len(keys):
+                context.removed[sheet_name] = keys
+
+def removed_text(removed):
+    """One line per baseline object missing from the current export."""
+    lines = []
+    for sheet_name in DIFF_KEYS:
+        keys = removed.get(sheet_name)
+        if keys is None:
+            continue
+        for row in keys.itertuples(index=False):
+            fields = ', '.join(f"{column}={value}" for column, value in zip(keys.columns, row) if value)
+            lines.append(f"{sheet_name}: {fields}\n")
+    return ''.join(lines)
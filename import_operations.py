@@ -1,8 +1,13 @@
 import pandas as pd
 import os
 import sys
-from tkinter import messagebox
-from log_operations import create_import_log
+from concurrent.futures import ProcessPoolExecutor
+from log_operations import create_import_log, input_stem, sheet_line_counts
+from import_context import ImportContext, group_by_vstore, count_vstore_switches
+from import_cache import ImportCache
+from import_diff import BaselineIndex, removed_text, REMOVED_FILE_NAME
+from import_output import DirectorySink, ZipSink, MemorySink, write_outputs
+from workbook_session import open_workbook
 from import_commands import (
     import_vstore, 
     import_filesystem, 
@@ -21,132 +26,268 @@ TARGET_SHEETS = [
     'CIFS_Share_Permission'
 ]
 
-def process_imported_data(file_path):
-    """Process the imported Excel data by handling each target sheet separately."""
-    results_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Imported_Results")
+def process_imported_data(file_path, results_dir=None, sheet_jobs=1, compression=None, compresslevel=None,
+                          group_vstores=False, incremental=False, delta=False, baseline_path=None):
+    """Process the imported Excel data by handling each target sheet separately.
+
+    Command files are written to results_dir (Imported_Results/ by default). Errors are
+    re-raised for the caller to report. Only the sheets the import or its log needs are
+    parsed, each exactly once.
+
+    With sheet_jobs other than 1 the sheets after Vstore are parsed and translated
+    concurrently in worker processes (0 or None: one per sheet) and their log counters merged
+    at the end. The command files are the same either way.
+
+    With a compression codec (see import_output.ZIP_COMPRESSION) the commands are streamed
+    straight into an import_commands_<timestamp>_<input>.zip in results_dir, together with the
+    log, instead of being written as .txt files. Returns the archive path, or results_dir.
+
+    group_vstores reorders the rows of each sheet so every vstore is switched to once; the
+    log reports how many switches that saved.
+
+    incremental keeps a content-hash manifest of every sheet and row in
+    results_dir/.import_cache: unchanged sheets reuse their previous output and only new or
+    changed rows are translated again. delta (which implies incremental) writes only the
+    commands of rows that were not in the previous import.
+
+    With baseline_path (an earlier export of the same array) the two exports are joined
+    per sheet on the objects' natural keys (see import_diff): only objects missing from
+    the baseline are created, and the baseline objects missing from this export are
+    listed in Removed_objects.txt.
+
+    file_path (and baseline_path) may also be a directory of per-sheet CSV, Parquet or
+    JSON Lines files, or one such table with a 'sheet' column (see
+    workbook_session.open_workbook).
+    """
+    if baseline_path is not None and (incremental or delta):
+        raise ValueError("A baseline diff cannot be combined with an incremental import")
+    results_dir = results_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), "Imported_Results")
     status = "Success"
+    workbook = None
+    context = None
+    sink = None
+    baseline = None
+    sheet_counts = {}
     
     try:
         if not os.path.exists(results_dir):
             os.makedirs(results_dir)
+        if compression is None:
+            sink = DirectorySink(results_dir)
+        else:
+            sink = ZipSink(results_dir, compression, compresslevel, input_stem(file_path))
 
-        xls = pd.ExcelFile(file_path)
+        # The workbook is opened once; each sheet is parsed at most once and shared with the log
+        workbook = open_workbook(file_path)
         
-        # First process vstores to get their IDs and names
-        vstores = {}
-        if 'Vstore' in xls.sheet_names:
-            vstore_df = xls.parse('Vstore').dropna(how='all')
-            for _, row in vstore_df.iterrows():
-                if 'Vstore ID' in row and 'Vstore' in row:
-                    vstores[row['Vstore']] = row['Vstore ID']
+        # First index the vstores so every sheet can resolve IDs to names
+        vstore_df = workbook.frame('Vstore') if workbook.has_sheet('Vstore') else None
+        vstore_df = vstore_df.dropna(how='all') if vstore_df is not None else None
+        cache = ImportCache(results_dir) if incremental or delta else None
+        sheet_names = [name for name in TARGET_SHEETS if workbook.has_sheet(name)]
+        if baseline_path is not None:
+            with open_workbook(baseline_path) as baseline_workbook:
+                baseline = BaselineIndex.from_workbook(baseline_workbook, TARGET_SHEETS)
+        context = ImportContext(vstore_df, group_vstores, cache, delta, baseline)
         
-        for sheet_name in TARGET_SHEETS:
-            if sheet_name in xls.sheet_names:
-                try:
-                    df = xls.parse(sheet_name).dropna(how='all')
-                    if df.empty:
-                        continue
-                        
-                    process_sheet_rows(sheet_name, df, results_dir, vstores)
-                    
-                except Exception as e:
-                    print(f"Error processing {sheet_name}: {str(e)}")
+        parallel_sheets = [name for name in sheet_names if name != 'Vstore']
+        if sheet_jobs == 1 or len(parallel_sheets) <= 1:
+            for sheet_name in sheet_names:
+                if not process_sheet(workbook, sheet_name, sink, context):
+                    status = "Failed"
+        else:
+            with ProcessPoolExecutor(max_workers=sheet_jobs or len(parallel_sheets)) as executor:
+                # Workers cannot share one archive, so they hand their outputs back to be written here
+                worker_dir = results_dir if isinstance(sink, DirectorySink) else None
+                # Each worker gets only its own sheet: its input (the rows already read, for a
+                # single-file table) and its part of the baseline index
+                futures = [executor.submit(_process_sheet_job, workbook.sheet_input(sheet_name), sheet_name,
+                                           vstore_df, worker_dir, group_vstores, cache, delta,
+                                           baseline.sheet_index(sheet_name) if baseline is not None else None)
+                           for sheet_name in parallel_sheets]
+                # The Vstore sheet is small, translate it here while the workers run
+                if 'Vstore' in sheet_names and not process_sheet(workbook, 'Vstore', sink, context):
                     status = "Failed"
+                for sheet_name, future in zip(parallel_sheets, futures):
+                    line_counts, sheet_context, outputs, ok = future.result()
+                    # The worker counted the sheet's lines for the log, so it is not parsed here
+                    sheet_counts[sheet_name] = line_counts
+                    context.merge(sheet_context)
+                    for output, text in outputs:
+                        context.record_output(output, sink.write(output, text))
+                    if not ok:
+                        status = "Failed"
+        
+        if baseline is not None:
+            baseline.remove_missing_sheets(sheet_names, context)
+            sink.write_file(REMOVED_FILE_NAME, removed_text(context.removed))
         
         # Create log file after processing
-        log_file = create_import_log(file_path, results_dir, status)
+        log_file = create_import_log(file_path, status, workbook, context, sink, sheet_counts)
         if log_file:
             print(f"Log file created: {log_file}")
+        sink.close()
+        return sink.path
             
     except Exception as e:
         status = "Failed"
-        messagebox.showerror("Error", f"Error processing file: {str(e)}")
+        print(f"Error processing file: {str(e)}")
         # Try to create log even if processing failed
-        create_import_log(file_path, results_dir, status)
+        create_import_log(file_path, status, workbook, context, sheet_counts=sheet_counts)
+        if sink is not None:
+            sink.close(success=False)
         raise
+    finally:
+        if workbook is not None:
+            workbook.close()
 
-def process_sheet_rows(sheet_name, df, output_dir, vstores):
-    """Process each row in a sheet and generate commands with vstore context."""
-    if sheet_name == 'NFS_Share':
-        # Create two separate files for NFS shares and permissions
-        share_file = os.path.join(output_dir, "NFS_Share_commands.txt")
-        perm_file = os.path.join(output_dir, "NFS_Share_Permission_commands.txt")
-        
-        current_vstore = None
+def process_sheet(workbook, sheet_name, sink, context):
+    """Parse and translate one sheet of the workbook. Returns False if it failed."""
+    try:
+        df = workbook.frame(sheet_name)
+        if df is None:
+            return False
+        df = df.dropna(how='all')
+        if context.baseline is not None:
+            df = context.baseline.new_rows(sheet_name, df, context)
+            if df.empty:
+                # Nothing new in this sheet: still replace the files of an earlier run
+                for output in sheet_outputs(sheet_name):
+                    context.record_output(output, sink.write(output, ''))
+                return True
+        if df.empty:
+            return True
+            
+        if context.cache is None:
+            process_sheet_rows(sheet_name, df, sink, context)
+        else:
+            process_cached_sheet(sheet_name, df, sink, context)
+        return True
         
-        with open(share_file, 'w') as sf, open(perm_file, 'w') as pf:
-            for index, row in df.iterrows():
-                try:
-                    # Get vstore info for this row
-                    row_vstore = None
-                    if 'Vstore' in row and not pd.isna(row['Vstore']):
-                        row_vstore = row['Vstore']
-                    elif 'Vstore ID' in row and not pd.isna(row['Vstore ID']):
-                        row_vstore = next((name for name, id_ in vstores.items() if id_ == row['Vstore ID']), None)
-                    
-                    # Add vstore change command if needed
-                    if row_vstore and row_vstore != current_vstore:
-                        if current_vstore is not None:
-                            sf.write("\n")
-                            pf.write("\n")
-                        vstore_cmd = f"change vstore view name={row_vstore}\n"
-                        sf.write(vstore_cmd)
-                        pf.write(vstore_cmd)
-                        current_vstore = row_vstore
-                    
-                    # Generate share command
-                    share_cmd = import_nfs_share.generate_nfs_share_command(row)
-                    if share_cmd:
-                        sf.write(f"{share_cmd}\n")
-                    
-                    # Generate permission command if permission data exists
-                    perm_cmd = import_nfs_permission.generate_nfs_permission_command(row)
-                    if perm_cmd:
-                        pf.write(f"{perm_cmd}\n")
-                        
-                except Exception as e:
-                    print(f"Error in row {index} of {sheet_name}: {str(e)}")
+    except Exception as e:
+        print(f"Error processing {sheet_name}: {str(e)}")
+        return False
+
+def process_cached_sheet(sheet_name, df, sink, context):
+    """process_sheet_rows going through the import cache (see import_cache).
+
+    A sheet whose content hash matches the previous import has its outputs rebuilt from
+    the cached commands. Otherwise only rows the previous import has not seen are
+    translated, and in delta mode only those rows are written at all.
+    """
+    state = context.cache.sheet(sheet_name, df, context)
+    if not context.delta and state.replay(sink, context):
+        return
+
+    sheet_context = context.sheet_context()
+    sheet_context.sheet_state = state
+    if context.delta:
+        if sheet_name == 'NFS_Share' and 'Local Path' in df.columns:
+            # Shares of unchanged rows exist already, their changed permissions reuse them
+            paths = df.loc[state.unchanged, 'Local Path']
+            paths = paths[paths.map(lambda value: isinstance(value, str)).astype(bool)]
+            context.nfs_paths.update(paths.str.removesuffix('/'))
+        df = df[~state.unchanged]
+
+    if not df.empty:
+        process_sheet_rows(sheet_name, df, sink, sheet_context)
     else:
-        # Original processing for other sheet types
-        output_file = os.path.join(output_dir, f"{sheet_name}_commands.txt")
-        current_vstore = None
-        
-        with open(output_file, 'w') as f:
-            for index, row in df.iterrows():
-                try:
-                    # Get vstore info for this row
-                    row_vstore = None
-                    if 'Vstore' in row and not pd.isna(row['Vstore']):
-                        row_vstore = row['Vstore']
-                    elif 'Vstore ID' in row and not pd.isna(row['Vstore ID']):
-                        row_vstore = next((name for name, id_ in vstores.items() if id_ == row['Vstore ID']), None)
-                    
-                    # Add vstore change command if needed
-                    if sheet_name != 'Vstore' and row_vstore and row_vstore != current_vstore:
-                        if current_vstore is not None:
-                            f.write("\n")
-                        f.write(f"change vstore view name={row_vstore}\n")
-                        current_vstore = row_vstore
-                    
-                    cmd = generate_command(sheet_name, row)
-                    if cmd:
-                        f.write(f"{cmd}\n")
-                        
-                except Exception as e:
-                    print(f"Error in row {index} of {sheet_name}: {str(e)}")
-
-def generate_command(sheet_name, row):
-    """Generate specific command based on sheet type and row data."""
-    row = row.dropna()  # Remove empty values
-    
-    if sheet_name == 'Vstore':
-        return import_vstore.generate_vstore_command(row)
-    elif sheet_name == 'Filesystem':
-        return import_filesystem.generate_filesystem_command(row)
-    elif sheet_name == 'CIFS_Share':
-        return import_cifs_share.generate_cifs_share_command(row)
-    elif sheet_name == 'NFS_Share':
-        return import_nfs_share.generate_nfs_share_command(row)
-    elif sheet_name == 'CIFS_Share_Permission':
-        return import_cifs_permission.generate_cifs_permission_command(row)
-    return None
\ No newline at end of file
+        # Nothing new in this sheet: still replace the previous run's files
+        for output in sheet_outputs(sheet_name):
+            sheet_context.record_output(output, sink.write(output, ''))
+    state.store(sheet_context, complete=not context.delta)
+    context.merge(sheet_context)
+
+def _process_sheet_job(sheet_input, sheet_name, vstore_df, results_dir=None, group_vstores=False, cache=None,
+                       delta=False, baseline=None):
+    """Worker entry point: translate one sheet with its own ImportContext.
+
+    sheet_input is the input path, or a session already holding the sheet (see
+    SheetSession.sheet_input). Command files are written to results_dir, or kept in memory
+    when it is None. Returns the sheet's line counts for the log (see
+    log_operations.sheet_line_counts), the context holding the sheet's counters, the
+    in-memory (output, text) pairs and whether the sheet succeeded. The parsed frame
+    itself never goes back to the parent.
+    """
+    context = ImportContext(vstore_df, group_vstores, cache, delta, baseline)
+    sink = MemorySink() if results_dir is None else DirectorySink(results_dir)
+    with open_workbook(sheet_input) as workbook:
+        ok = process_sheet(workbook, sheet_name, sink, context)
+        line_counts = sheet_line_counts(sheet_name, workbook.frame(sheet_name))
+        return line_counts, context, getattr(sink, 'outputs', []), ok
+
+def sheet_outputs(sheet_name):
+    """Command files written for a sheet; NFS_Share also yields the NFS permissions."""
+    return ['NFS_Share', 'NFS_Share_Permission'] if sheet_name == 'NFS_Share' else [sheet_name]
+
+# Whole-sheet translators of the sheets written one output each (NFS_Share is split in two)
+SHEET_TRANSLATORS = {
+    'Vstore': import_vstore.generate_vstore_commands,
+    'Filesystem': import_filesystem.generate_filesystem_commands,
+    'CIFS_Share': import_cifs_share.generate_cifs_share_commands,
+    'CIFS_Share_Permission': import_cifs_permission.generate_cifs_permission_commands
+}
+
+def process_sheet_rows(sheet_name, df, sink, context):
+    """Translate a whole sheet into commands and write them with vstore context.
+
+    Each output is streamed into a handle the sink opens for it (see
+    import_output.write_outputs). The vstore of every row is resolved up front through the
+    ImportContext indexes, and the context's counters are updated as the commands are
+    counted and written.
+    """
+    row_vstores = context.resolve_vstores(df)
+    if context.group_vstores and sheet_name != 'Vstore':
+        order = group_by_vstore(row_vstores)
+        switches = count_vstore_switches(row_vstores)
+        df, row_vstores = df.iloc[order], row_vstores.iloc[order]
+        saved = switches - count_vstore_switches(row_vstores)
+        for output in sheet_outputs(sheet_name):
+            context.vstore_switches_saved[output] += saved
+    # The Vstore sheet creates the vstores, its commands never switch to one
+    row_vstores = [None] * len(df) if sheet_name == 'Vstore' else row_vstores.tolist()
+
+    if sheet_name == 'NFS_Share':
+        # Two separate files for NFS shares and permissions
+        share_cmds, duplicates, errors = import_nfs_share.generate_nfs_share_commands(df, context.nfs_paths)
+        share_cmds = share_cmds.tolist()
+        perm_cmds = import_nfs_permission.generate_nfs_permission_commands(df).tolist()
+        rows = enumerate(zip(df.index, duplicates.tolist(), errors.tolist()))
+        for position, (index, duplicate, error) in rows:
+            if error is not None:
+                # The share failed, so the row's permission is not generated either
+                print(f"Error in row {index} of {sheet_name}: {error}")
+                context.skipped['NFS_Share', 'error'] += 1
+                context.skipped['NFS_Share_Permission', 'error'] += 1
+                share_cmds[position] = perm_cmds[position] = None
+                continue
+            if share_cmds[position]:
+                context.commands['NFS_Share'] += 1
+            else:
+                context.skipped['NFS_Share', 'duplicate' if duplicate else 'incomplete'] += 1
+            # Permission command if permission data exists
+            if perm_cmds[position]:
+                context.commands['NFS_Share_Permission'] += 1
+            else:
+                context.skipped['NFS_Share_Permission', 'incomplete'] += 1
+        outputs = {'NFS_Share': share_cmds, 'NFS_Share_Permission': perm_cmds}
+    else:
+        commands = translate_sheet(sheet_name, df, context)
+        created = sum(1 for cmd in commands if cmd)
+        context.commands[sheet_name] += created
+        if created < len(commands):
+            context.skipped[sheet_name, 'incomplete'] += len(commands) - created
+        outputs = {sheet_name: commands}
+
+    if context.sheet_state is not None:
+        context.sheet_state.record(df, row_vstores, outputs)
+    write_outputs(sink, outputs, row_vstores, context)
+
+def translate_sheet(sheet_name, df, context):
+    """Commands of every row of a sheet (None where a row makes none), reusing cached rows."""
+    translate = SHEET_TRANSLATORS[sheet_name]
+    if context.sheet_state is None:
+        return translate(df).tolist()
+    commands, reused = context.sheet_state.translate(df, translate)
+    context.reused['rows'] += reused
+    return commands
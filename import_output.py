@@ -0,0 +1,176 @@
+import io
+import os
+import time
+import zipfile
+from datetime import datetime
+from utils import reserve_path
+
+# Codecs accepted for the results archive
+ZIP_COMPRESSION = {
+    'stored': zipfile.ZIP_STORED,
+    'deflate': zipfile.ZIP_DEFLATED,
+    'bzip2': zipfile.ZIP_BZIP2,
+    'lzma': zipfile.ZIP_LZMA
+}
+
+def output_file_name(output):
+    return f"{output}_commands.txt"
+
+def write_outputs(sink, outputs, row_vstores, context):
+    """Write each output's commands, one per row, switching vstore before the rows of each vstore.
+
+    outputs maps an output to the command of every row (None where the row has none);
+    row_vstores holds every row's vstore (None: stay in the current one). Switches and
+    sizes are recorded in the context. An archive takes one member at a time, so the
+    outputs are written one after the other.
+    """
+    for output, commands in outputs.items():
+        with sink.open(output) as f:
+            current_vstore = None
+            for row_vstore, command in zip(row_vstores, commands):
+                if row_vstore and row_vstore != current_vstore:
+                    if current_vstore is not None:
+                        f.write("\n")
+                    f.write(f"change vstore view name={row_vstore}\n")
+                    context.vstore_switches[output] += 1
+                    current_vstore = row_vstore
+                if command:
+                    f.write(f"{command}\n")
+        context.record_output(output, sink.size(output))
+
+class DirectorySink:
+    """Writes each output as <output>_commands.txt in a directory.
+
+    open returns a text handle the commands are written to as they are generated; size
+    gives the output's size in bytes once that handle is closed.
+    """
+
+    def __init__(self, results_dir):
+        self.results_dir = results_dir
+        self.path = results_dir
+
+    def open(self, output):
+        return self.open_file(output_file_name(output))
+
+    def open_file(self, file_name):
+        return open(os.path.join(self.results_dir, file_name), 'w')
+
+    def size(self, output):
+        return self.file_size(output_file_name(output))
+
+    def file_size(self, file_name):
+        return os.path.getsize(os.path.join(self.results_dir, file_name))
+
+    def write(self, output, text):
+        """Write an output's commands and return its size in bytes."""
+        return self.write_file(output_file_name(output), text)
+
+    def write_file(self, file_name, text):
+        with self.open_file(file_name) as f:
+            f.write(text)
+        return self.file_size(file_name)
+
+    def write_log(self, log_name, text):
+        pass
+
+    def close(self, success=True):
+        pass
+
+class ZipSink:
+    """Streams each output straight into a member of a zip archive.
+
+    Members hold exactly the bytes DirectorySink would have written. The archive is built
+    under a temporary name and only replaces the empty file claimed at path once closed
+    successfully. source (the input's name) is added to the archive name.
+    """
+
+    def __init__(self, results_dir, compression='deflate', compresslevel=None, source=None):
+        if compression not in ZIP_COMPRESSION:
+            raise ValueError(f"Unknown compression '{compression}', use one of {', '.join(ZIP_COMPRESSION)}")
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        name = f"import_commands_{timestamp}.zip" if source is None else f"import_commands_{timestamp}_{source}.zip"
+        # Claimed up front (an empty file until closed) so concurrent imports never share it
+        self.path = reserve_path(results_dir, name)
+        self._temp_path = f"{self.path}.{os.getpid()}.tmp"
+        self._compresslevel = compresslevel
+        self._zip = zipfile.ZipFile(self._temp_path, 'w', ZIP_COMPRESSION[compression], compresslevel=compresslevel)
+
+    def _member(self, name):
+        """ZipInfo of a new member stamped with the current time (ZipFile.open uses 1980-01-01)."""
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = self._zip.compression
+        # The archive's level is only applied to members ZipFile names itself
+        if hasattr(info, 'compress_level'):
+            info.compress_level = self._compresslevel  # Python 3.13+
+        else:
+            info._compresslevel = self._compresslevel
+        return info
+
+    def open(self, output):
+        """Text handle streaming an output's commands into its zip member.
+
+        Only one member can be written at a time, so close it before opening the next.
+        """
+        return self.open_file(output_file_name(output))
+
+    def open_file(self, name):
+        # Same encoding and newline translation as open(path, 'w')
+        return io.TextIOWrapper(self._zip.open(self._member(name), 'w'))
+
+    def size(self, output):
+        """Uncompressed size of a finished output."""
+        return self.file_size(output_file_name(output))
+
+    def file_size(self, name):
+        return self._zip.getinfo(name).file_size
+
+    def write(self, output, text):
+        """Write an output's commands as a zip member and return its uncompressed size."""
+        return self.write_file(output_file_name(output), text)
+
+    def write_file(self, name, text):
+        with self.open_file(name) as f:
+            f.write(text)
+        return self.file_size(name)
+
+    def write_log(self, log_name, text):
+        """Add the import log from memory under logs/."""
+        self._zip.writestr(self._member(f"logs/{log_name}"), text.encode('utf-8'))
+
+    def close(self, success=True):
+        self._zip.close()
+        if success:
+            os.replace(self._temp_path, self.path)
+        else:
+            os.remove(self._temp_path)
+            os.remove(self.path)
+
+class MemoryOutput(io.StringIO):
+    """Text handle of a MemorySink output, kept in the sink's outputs once closed."""
+
+    def __init__(self, outputs, output):
+        super().__init__()
+        self._outputs = outputs
+        self._output = output
+
+    def close(self):
+        if not self.closed:
+            self._outputs.append((self._output, self.getvalue()))
+        super().close()
+
+class MemorySink:
+    """Keeps the outputs of a worker process so the parent can write them into its sink."""
+
+    def __init__(self):
+        self.outputs = []
+
+    def open(self, output):
+        return MemoryOutput(self.outputs, output)
+
+    def size(self, output):
+        # The size is recorded once the parent has written the output
+        return None
+
+    def write(self, output, text):
+        self.outputs.append((output, text))
+        return None
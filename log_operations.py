@@ -1,7 +1,9 @@
+import io
 import os
 import datetime
-import pandas as pd
-from tkinter import messagebox
+from import_context import ImportContext
+from workbook_session import open_workbook
+from utils import reserve_path
 
 def create_logs_directory():
     """Create Logs directory if it doesn't exist."""
@@ -10,170 +12,153 @@ def create_logs_directory():
         os.makedirs(logs_dir)
     return logs_dir
 
-def generate_log_filename():
-    """Generate timestamp-based log filename."""
+def generate_log_filename(file_path=None):
+    """Generate timestamp-based log filename, naming the imported file when given.
+
+    create_import_log claims the name with utils.reserve_path, so imports finishing in
+    the same second (cli import --jobs) each keep their own log.
+    """
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    return f"import_log_{timestamp}.txt"
+    if file_path is None:
+        return f"import_log_{timestamp}.txt"
+    return f"import_log_{timestamp}_{input_stem(file_path)}.txt"
 
-def count_commands_in_file(file_path, command_prefix, is_nfs=False, is_permission=False):
-    """Count how many times a command appears in a file."""
-    if not os.path.exists(file_path):
-        return 0
-    
-    count = 0
-    try:
-        encodings = ['utf-8', 'latin-1', 'cp1252']
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    for line in f:
-                        stripped = line.strip()
-                        if stripped.startswith(command_prefix):
-                            # For permissions, count all matching commands
-                            if is_permission:
-                                count += 1
-                            # For NFS shares, check for local_path
-                            elif is_nfs and 'local_path=' in stripped:
-                                count += 1
-                            # For non-NFS, check for name=
-                            elif not is_nfs and 'name=' in stripped:
-                                count += 1
-                break
-            except UnicodeDecodeError:
-                continue
-    except Exception as e:
-        print(f"Warning: Error counting commands in {file_path}: {str(e)}")
-        with open(file_path, 'r', errors='ignore') as f:
-            for line in f:
-                if line.strip().startswith(command_prefix):
-                    count += 1
-    return count
-
-def count_excel_lines(xls, sheet_name):
-    """Count non-empty lines in an Excel sheet with special handling."""
-    # Special case: For NFS Share Permissions, always count all rows from NFS_Share sheet
-    if sheet_name == 'NFS_Share_Permission':
-        actual_sheet = 'NFS_Share'
-    else:
-        actual_sheet = sheet_name
-    
-    # Try different variations of the sheet name
-    possible_names = {
-        'NFS_Share': ['NFS_Share', 'NFS Shares', 'NFS Share'],
-        'Filesystem': ['Filesystem', 'FileSystem', 'File Systems', 'Filesystems'],
-        'CIFS_Share': ['CIFS_Share', 'CIFS Shares', 'CIFS Share']
-    }
-    
-    # Get the actual sheet name from possible variations
-    if actual_sheet in possible_names:
-        for name in possible_names[actual_sheet]:
-            if name in xls.sheet_names:
-                actual_sheet = name
-                break
-    
-    if actual_sheet not in xls.sheet_names:
-        return 0
-    
-    df = xls.parse(actual_sheet)
-    
-    # For NFS Share sheet, count unique Local Paths (for shares) or all rows (for permissions)
-    if actual_sheet == 'NFS_Share':
-        if sheet_name == 'NFS_Share_Permission':
-            # For permissions, count all rows
-            return len(df.dropna(how='all'))
-        elif 'Local Path' in df.columns:
-            # For shares, count unique Local Paths
-            return df['Local Path'].dropna().nunique()
-    
-    # Regular counting for other sheets
-    return len(df.dropna(how='all'))
+def input_stem(file_path):
+    """Name of an import input without its extension (directories included)."""
+    return os.path.splitext(os.path.basename(os.path.normpath(file_path)))[0]
+
+# Sheet names InfoGrab has used for each imported sheet, preferred name first
+SHEET_NAME_VARIATIONS = {
+    'Vstore': ['Vstore'],
+    'Filesystem': ['Filesystem', 'FileSystem', 'File Systems', 'Filesystems'],
+    'CIFS_Share': ['CIFS_Share', 'CIFS Shares', 'CIFS Share'],
+    'NFS_Share': ['NFS_Share', 'NFS Shares', 'NFS Share'],
+    'CIFS_Share_Permission': ['CIFS_Share_Permission']
+}
+
+def sheet_line_counts(sheet_type, df):
+    """Source rows of one sheet behind each logged command type it feeds.
+
+    sheet_type is the sheet's key in SHEET_NAME_VARIATIONS. NFS shares count unique Local
+    Paths while NFS permissions count every row of the NFS_Share sheet.
+    """
+    rows = 0 if df is None else len(df.dropna(how='all'))
+    if sheet_type != 'NFS_Share':
+        return {sheet_type: rows}
+    shares = df['Local Path'].dropna().nunique() if df is not None and 'Local Path' in df.columns else 0
+    return {'NFS_Share': shares, 'NFS_Share_Permission': rows}
+
+def count_excel_lines(workbook, sheet_counts=None):
+    """Count the source rows behind each logged command type.
+
+    workbook is the import's session (see workbook_session.open_workbook), so sheets it already parsed are reused and
+    sheets neither the import nor the log needs are never read. sheet_counts holds the
+    sheet_line_counts of sheets counted elsewhere (e.g. in a worker process), by sheet
+    name; those sheets are not parsed here.
+    """
+    sheet_counts = dict(sheet_counts or {})
+
+    def lines(sheet_type, sheet_name):
+        if sheet_name not in sheet_counts:
+            sheet_counts[sheet_name] = sheet_line_counts(sheet_type, workbook.frame(sheet_name))
+        return sheet_counts[sheet_name]
+
+    counts = {}
+    for sheet_type, variations in SHEET_NAME_VARIATIONS.items():
+        if sheet_type == 'NFS_Share':
+            continue
+        preferred, alternatives = variations[0], variations[1:]
+        counts[sheet_type] = lines(sheet_type, preferred)[sheet_type] if workbook.has_sheet(preferred) else 0
+        if counts[sheet_type] == 0:
+            # Handle alternative sheet names
+            alternative = next((name for name in alternatives if workbook.has_sheet(name)), None)
+            if alternative is not None:
+                counts[sheet_type] = lines(sheet_type, alternative)[sheet_type]
+
+    counts['NFS_Share'] = 0
+    counts['NFS_Share_Permission'] = 0
+    nfs_sheet_name = next((name for name in SHEET_NAME_VARIATIONS['NFS_Share'] if workbook.has_sheet(name)), None)
+    if nfs_sheet_name:
+        counts.update(lines('NFS_Share', nfs_sheet_name))
+    return counts
+
+# Command types reported in the log, in order
+LOGGED_OUTPUTS = [
+    'Vstore',
+    'Filesystem',
+    'CIFS_Share',
+    'NFS_Share',
+    'CIFS_Share_Permission',
+    'NFS_Share_Permission'
+]
+
+def create_import_log(file_path, status, workbook=None, context=None, sink=None, sheet_counts=None):
+    """Create a detailed log of the import operation.
 
-def create_import_log(file_path, results_dir, status):
-    """Create a detailed log of the import operation."""
+    Command counts come from the ImportContext counters filled while the commands were
+    written (none when the import failed before it had one). Pass the session the
+    import used so its parsed sheets are reused; without one the file is opened here.
+    sheet_counts holds the line counts of sheets translated in worker processes (see
+    count_excel_lines). The log is also handed to the import's output sink, which adds it
+    to the results archive.
+    """
     try:
         logs_dir = create_logs_directory()
-        log_file = os.path.join(logs_dir, generate_log_filename())
+        log_file = reserve_path(logs_dir, generate_log_filename(file_path))
+        log_name = os.path.basename(log_file)
         
-        xls = pd.ExcelFile(file_path)
+        if workbook is None:
+            with open_workbook(file_path) as own_workbook:
+                excel_lines = count_excel_lines(own_workbook, sheet_counts)
+        else:
+            excel_lines = count_excel_lines(workbook, sheet_counts)
+        context = context or ImportContext()
         
-        arrow = '→'
+        content = _render_log(excel_lines, context, status, '→')
         try:
             with open(log_file, 'w', encoding='utf-8') as f:
-                _write_log_content(f, xls, results_dir, status, arrow)
+                f.write(content)
         except UnicodeEncodeError:
-            arrow = '->'
+            content = _render_log(excel_lines, context, status, '->')
             with open(log_file, 'w', encoding='utf-8', errors='replace') as f:
-                _write_log_content(f, xls, results_dir, status, arrow)
+                f.write(content)
+        if sink is not None:
+            sink.write_log(log_name, content)
         
         print(f"Log file created: {log_file}")
         return log_file
     except Exception as e:
-        messagebox.showerror("Logging Error", f"Failed to create log file: {str(e)}")
+        print(f"Warning: Failed to create log file: {str(e)}")
         return None
 
-def _write_log_content(file_obj, xls, results_dir, status, arrow):
+def _render_log(excel_lines, context, status, arrow):
+    """Return the log content as a string."""
+    buffer = io.StringIO()
+    _write_log_content(buffer, excel_lines, context, status, arrow)
+    return buffer.getvalue()
+
+def _write_log_content(file_obj, excel_lines, context, status, arrow):
     """Helper function to write log content."""
     file_obj.write(f"EXECUTION STATUS: {status}\n")
     file_obj.write("=" * 40 + "\n\n")
     
-    command_stats = [
-        ('Vstore', 'create vstore', 'Vstore_commands.txt', False, False),
-        ('Filesystem', 'create file_system general', 'Filesystem_commands.txt', False, False),
-        ('CIFS_Share', 'create share cifs', 'CIFS_Share_commands.txt', False, False),
-        ('NFS_Share', 'create share nfs', 'NFS_Share_commands.txt', True, False),  # is_nfs=True
-        ('CIFS_Share_Permission', 'create share_permission cifs', 'CIFS_Share_Permission_commands.txt', False, False),
-        ('NFS_Share_Permission', 'create share_permission nfs', 'NFS_Share_Permission_commands.txt', True, True)  # is_nfs=True, is_permission=True
-    ]
-    
-    # First parse the NFS_Share sheet to get both counts
-    nfs_sheet_name = None
-    nfs_sheet_variations = ['NFS_Share', 'NFS Shares', 'NFS Share']
-    for name in nfs_sheet_variations:
-        if name in xls.sheet_names:
-            nfs_sheet_name = name
-            break
-    
-    nfs_unique_count = 0
-    nfs_total_count = 0
-    if nfs_sheet_name:
-        df = xls.parse(nfs_sheet_name)
-        nfs_total_count = len(df.dropna(how='all'))
-        if 'Local Path' in df.columns:
-            nfs_unique_count = df['Local Path'].dropna().nunique()
-    
-    # Get counts for all other sheets
-    sheet_counts = {sheet: count_excel_lines(xls, sheet) for sheet in xls.sheet_names}
-    
-    for item in command_stats:
-        sheet_name, command_prefix, output_file, is_nfs, is_permission = item
-        
-        output_path = os.path.join(results_dir, output_file)
-        commands_created = count_commands_in_file(
-            output_path, command_prefix, is_nfs, is_permission
-        )
-        
-        # Special handling for NFS sheets
-        if sheet_name == 'NFS_Share':
-            excel_lines = nfs_unique_count
-        elif sheet_name == 'NFS_Share_Permission':
-            excel_lines = nfs_total_count
-        else:
-            excel_lines = sheet_counts.get(sheet_name, 0)
-            # Handle alternative sheet names
-            if excel_lines == 0:
-                alt_names = {
-                    'Filesystem': ['FileSystem', 'File Systems', 'Filesystems'],
-                    'CIFS_Share': ['CIFS Shares', 'CIFS Share']
-                }
-                if sheet_name in alt_names:
-                    for name in alt_names[sheet_name]:
-                        if name in sheet_counts:
-                            excel_lines = sheet_counts[name]
-                            break
-        
-        file_obj.write(f"{sheet_name}:\n")
-        file_obj.write(f"  {arrow} Created: {commands_created}\n")
-        file_obj.write(f"  {arrow} Excel Lines: {excel_lines}\n\n")
+    for output in LOGGED_OUTPUTS:
+        file_obj.write(f"{output}:\n")
+        file_obj.write(f"  {arrow} Created: {context.commands[output]}\n")
+        file_obj.write(f"  {arrow} Excel Lines: {excel_lines.get(output, 0)}\n")
+        reasons = context.skipped_reasons(output)
+        if reasons:
+            details = ', '.join(f"{reason}: {count}" for reason, count in sorted(reasons.items()))
+            file_obj.write(f"  {arrow} Skipped: {sum(reasons.values())} ({details})\n")
+        file_obj.write("\n")
     
+    file_obj.write(f"Vstore switches: {sum(context.vstore_switches.values())}\n")
+    if context.group_vstores:
+        file_obj.write(f"Vstore switches saved by grouping: {sum(context.vstore_switches_saved.values())}\n")
+    file_obj.write(f"Bytes written: {sum(context.bytes_written.values())}\n")
+    if context.baseline is not None:
+        file_obj.write(f"Removed objects: {sum(len(keys) for keys in context.removed.values())}\n")
+    if context.cache is not None:
+        file_obj.write(f"Reused from cache: {context.reused['sheets']} sheets, {context.reused['rows']} rows\n")
     file_obj.write("\n" + "=" * 40 + "\n")
     file_obj.write(f"Log generated at: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
\ No newline at end of file
@@ -1,11 +1,13 @@
 import os
 import sys
+import threading
 import tkinter as tk
 from tkinter import messagebox, ttk
 from excel_operations import open_excel, clear_excel, import_excel
 from gui_helpers import apply_style, darken_color, toggle_loading
 from command_generator import main as generate_commands
 from utils import load_config
+from file_operations import build_template_cache
 from tooltip_manager import ToolTipManager
 import webbrowser
 
@@ -43,6 +45,12 @@ def run_script(script_type, command_type, device_type):
         toggle_loading(root, False)
         messagebox.showerror("Error", f"An error occurred:\n{str(e)}")
 
+def prebuild_templates(device_types):
+    try:
+        build_template_cache(device_types)
+    except Exception as e:
+        print(f"Warning: could not prebuild the Excel templates: {e}")
+
 def main():
     global root
     root = tk.Tk()
@@ -367,6 +375,9 @@ def main():
 
     script_var.trace_add("write", on_script_change)
 
+    # Build any missing or outdated template in the background so 'Create Excel' only copies a file
+    threading.Thread(target=prebuild_templates, args=(list(device_menu['values']),), daemon=True).start()
+
     root.mainloop()
 
 if __name__ == "__main__":
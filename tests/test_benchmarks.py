@@ -0,0 +1,34 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_generator import run_benchmarks, compare_with_baseline
+
+class TestGeneratorBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_small_run_and_baseline_comparison(self):
+        with patch('sys.stdout', new_callable=StringIO), patch('sys.stderr', new_callable=StringIO):
+            results = run_benchmarks(['OceanStor Pacific'], ['Namespace'], [20], self.work_dir)
+
+        self.assertEqual([(r['resource'], r['operation'], r['rows']) for r in results], [('Namespace', 'Create', 20)])
+        self.assertEqual(results[0]['commands'], 20)
+        self.assertGreater(results[0]['generate_rows_per_sec'], 0)
+
+        faster = dict(results[0], generate_rows_per_sec=results[0]['generate_rows_per_sec'] * 10)
+        self.assertEqual(compare_with_baseline(results, {'results': results}, 0.2), [])
+        self.assertEqual(len(compare_with_baseline(results, {'results': [faster]}, 0.2)), 1)
+
+if __name__ == '__main__':
+    unittest.main()
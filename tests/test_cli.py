@@ -0,0 +1,90 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import subprocess
+import tempfile
+import pandas as pd
+from io import StringIO
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cli import main, infer_workbook_target
+from test_import_operations import write_infograb
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.workbook = os.path.join(self.work_dir, 'OceanStor Pacific_Namespace_commands.xlsx')
+        with pd.ExcelWriter(self.workbook) as writer:
+            pd.DataFrame({'name': ['ns1', 'ns2'], 'storage_pool_id': ['0', '0'], 'account_id': ['1', '1']}).to_excel(writer, sheet_name='Create', index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_infer_workbook_target(self):
+        self.assertEqual(infer_workbook_target(self.workbook), ('OceanStor Pacific', 'Namespace'))
+        self.assertEqual(infer_workbook_target('x/OceanStor Dorado_HyperMetro Pair_commands.xlsx'),
+                         ('OceanStor Dorado', 'HyperMetro Pair'))
+        self.assertEqual(infer_workbook_target('luns.xlsx', 'OceanStor Dorado', 'LUN'), ('OceanStor Dorado', 'LUN'))
+        with self.assertRaises(ValueError):
+            infer_workbook_target('luns.xlsx')
+
+    def test_generate_json_summary(self):
+        output_path = os.path.join(self.work_dir, 'out', 'namespace.txt')
+        stdout = StringIO()
+        with patch('sys.stdout', stdout):
+            exit_code = main(['generate', self.workbook, '-o', output_path, '--format', 'json', '--jobs', '1'])
+
+        self.assertEqual(exit_code, 0)
+        results = json.loads(stdout.getvalue())
+        self.assertEqual(results[0]['output'], output_path)
+        with open(output_path) as f:
+            self.assertIn('create namespace general name=ns1', f.read())
+
+    def test_validate_clean_workbook(self):
+        stdout = StringIO()
+        with patch('sys.stdout', stdout):
+            exit_code = main(['validate', self.workbook, '--format', 'json'])
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(json.loads(stdout.getvalue())[0]['violations'], [])
+
+    def test_missing_workbook_fails(self):
+        with patch('sys.stdout', StringIO()):
+            exit_code = main(['generate', os.path.join(self.work_dir, 'OceanStor Dorado_LUN_commands.xlsx'), '--jobs', '1'])
+        self.assertEqual(exit_code, 1)
+
+    def test_does_not_import_tkinter(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        code = "import sys, cli, import_operations; sys.exit('tkinter' in sys.modules)"
+        self.assertEqual(subprocess.call([sys.executable, '-c', code], cwd=root), 0)
+
+    def test_imports_keep_their_own_folders_and_logs(self):
+        # Two exports with the same name, imported within the same second
+        files = []
+        for folder in ('site_a', 'site_b'):
+            os.makedirs(os.path.join(self.work_dir, folder))
+            files.append(os.path.join(self.work_dir, folder, 'infograb.xlsx'))
+            write_infograb(files[-1])
+        output_dir = os.path.join(self.work_dir, 'imported')
+        logs_dir = os.path.join(self.work_dir, 'logs')
+        os.makedirs(logs_dir)
+
+        stdout = StringIO()
+        with patch('log_operations.create_logs_directory', return_value=logs_dir), patch('sys.stdout', stdout):
+            exit_code = main(['import', *files, '--output-dir', output_dir, '--jobs', '1', '--zip', 'deflate',
+                              '--format', 'json'])
+
+        self.assertEqual(exit_code, 0)
+        results = json.loads(stdout.getvalue())
+        self.assertEqual(sorted(os.listdir(output_dir)), ['infograb', 'infograb_2'])
+        self.assertEqual(len({result['output'] for result in results}), 2)
+        log_names = sorted(os.listdir(logs_dir))
+        self.assertEqual(len(log_names), 2)
+        self.assertTrue(all('_infograb' in name for name in log_names))
+
+if __name__ == '__main__':
+    unittest.main()
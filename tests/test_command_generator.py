@@ -2,13 +2,23 @@ import unittest
 import pandas as pd
 import os
 import sys
+import shutil
+import tempfile
+import zipfile
 from unittest.mock import patch, MagicMock
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import PatternFill
 from io import StringIO
 
 # Add the parent directory to the path so we can import the modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from command_generator import CommandGenerator
+from command_generator import CommandGenerator, generate_batch, get_workbook_path
+from file_operations import create_excel_for_resource, copy_template, get_template_path, set_active_sheet
+from utils import iter_sheet_chunks, read_file, DEFAULT_MAX_BLANK_ROWS
+from workbook_session import WorkbookSession, open_workbook
+from command_plans import compile_field, OperationPlan, get_operation_plan, clear_plan_cache
+from validation import validate_frame, get_operation_validator
 
 class TestCommandGenerator(unittest.TestCase):
     def setUp(self):
@@ -79,10 +89,10 @@ class TestCommandGenerator(unittest.TestCase):
         expected = "create name=test size=100 enabled=yes"
         self.assertEqual(self.generator.generate_command(row, operation_config), expected)
         
-    @patch('pandas.read_excel')
+    @patch('command_generator.open_workbook')
     @patch('os.path.exists')
     @patch('os.makedirs')
-    def test_main(self, mock_makedirs, mock_exists, mock_read_excel):
+    def test_main(self, mock_makedirs, mock_exists, mock_session):
         # Test the main function with mocked dependencies
         mock_exists.return_value = True
         
@@ -91,7 +101,9 @@ class TestCommandGenerator(unittest.TestCase):
             'name': ['test1', 'test2'],
             'size': ['100', '200']
         })
-        mock_read_excel.return_value = mock_df
+        mock_workbook = mock_session.return_value.__enter__.return_value
+        mock_workbook.has_sheet.return_value = True
+        mock_workbook.frame.return_value = mock_df
         
         # Mock config
         config = {
@@ -108,13 +120,557 @@ class TestCommandGenerator(unittest.TestCase):
             }
         }
         
-        with patch('command_generator.load_config', return_value=config):
+        with patch('command_generator.load_config', return_value=config), tempfile.TemporaryDirectory() as results_dir:
             generator = CommandGenerator()
-            output_path = generator.main('test_resource', 'test_device')
+            output_path = generator.main('test_resource', 'test_device',
+                                         output_path=os.path.join(results_dir, 'test_device_test_resource_commands.txt'))
             
             self.assertTrue(output_path.endswith('test_device_test_resource_commands.txt'))
-            mock_read_excel.assert_called_once()
+            with open(output_path) as f:
+                self.assertEqual(f.read().splitlines(), ["create name=test1 size=100", "create name=test2 size=200"])
+            mock_session.assert_called_once()
+            mock_workbook.frame.assert_called_once_with('create', ['name', 'size'], DEFAULT_MAX_BLANK_ROWS)
             mock_makedirs.assert_not_called()  # Because we mocked exists to return True
 
+class TestStreamingGeneration(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.previous_dir = os.getcwd()
+        os.chdir(self.work_dir)
+        os.makedirs('Documents')
+        self.config = {
+            'NFS': {
+                'operations': {
+                    'Create': {
+                        'cli_prefix': 'create share nfs',
+                        'mandatory': [{'name': 'local_path', 'field_type': 'text', 'transform': 'prefix_slash'}],
+                        'optional': [{'name': 'charset', 'field_type': 'select', 'allowed_values': ['UTF_8', 'GBK']}]
+                    },
+                    'Show': {
+                        'cli_prefix': 'show share nfs',
+                        'mandatory': [{'name': 'share_id', 'field_type': 'text'}]
+                    }
+                }
+            }
+        }
+        with pd.ExcelWriter(os.path.join('Documents', 'Dev_NFS_commands.xlsx')) as writer:
+            pd.DataFrame({
+                'local_path': [f'fs{i}' for i in range(25)] + [None, 'last'],
+                'charset': ['utf_8', None, 'bad'] * 9
+            }).to_excel(writer, sheet_name='Create', index=False)
+            pd.DataFrame({'share_id': ['1', '2']}).to_excel(writer, sheet_name='Show', index=False)
+
+    def tearDown(self):
+        os.chdir(self.previous_dir)
+        shutil.rmtree(self.work_dir)
+
+    def test_iter_sheet_chunks(self):
+        chunks = list(iter_sheet_chunks(os.path.join('Documents', 'Dev_NFS_commands.xlsx'), 'Create', chunk_size=10))
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 7])
+        self.assertEqual(list(chunks[-1].index), list(range(20, 27)))
+        self.assertIsNone(iter_sheet_chunks(os.path.join('Documents', 'Dev_NFS_commands.xlsx'), 'Missing'))
+
+    def test_stream_matches_full_read(self):
+        with patch('command_generator.load_config', return_value=self.config):
+            generator = CommandGenerator()
+            output_path = generator.main('NFS', 'Dev')
+            with open(output_path) as f:
+                expected = f.read()
+            generator.main('NFS', 'Dev', stream=True, chunk_size=4)
+            with open(output_path) as f:
+                self.assertEqual(f.read(), expected)
+
+        self.assertTrue(expected.startswith('create share nfs local_path=/fs0 charset=utf_8\ncreate share nfs local_path=/fs1\n'))
+        self.assertTrue(expected.endswith('\n\nshow share nfs share_id=1\nshow share nfs share_id=2\n'))
+
+    def test_each_sheet_is_released_once_written(self):
+        held = []
+        original_release = WorkbookSession.release
+
+        def release(session, sheet_name):
+            original_release(session, sheet_name)
+            held.append((sheet_name, list(session._frames)))
+
+        with patch('command_generator.load_config', return_value=self.config), \
+                patch.object(WorkbookSession, 'release', release), patch('sys.stdout', new_callable=StringIO):
+            CommandGenerator().main('NFS', 'Dev')
+        self.assertEqual(held, [('Create', []), ('Show', [])])
+
+    def test_workbook_session_parses_each_sheet_once(self):
+        with WorkbookSession(os.path.join('Documents', 'Dev_NFS_commands.xlsx')) as workbook:
+            self.assertEqual(workbook.sheet_names, ['Create', 'Show'])
+            with patch.object(workbook._excel_file, 'parse', wraps=workbook._excel_file.parse) as parse:
+                frame = workbook.frame('Show')
+                self.assertIs(workbook.frame('Show'), frame)
+                self.assertEqual([name for name, _ in workbook.frames(['Show', 'Change'])], ['Show'])
+                parse.assert_called_once_with('Show')
+            self.assertEqual(sum(len(chunk) for chunk in workbook.iter_chunks('Create', 10)), 27)
+
+    def test_trimmed_read_stops_at_template_rows(self):
+        path = os.path.join('Documents', 'styled.xlsx')
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.title = 'Create'
+        sheet.append(['share_path', 'charset', 'notes'])
+        for row_idx in range(2, 1002):
+            for col_idx in range(1, 4):
+                sheet.cell(row=row_idx, column=col_idx).fill = PatternFill(start_color="FFD3D3", fill_type="solid")
+        for row_idx, path_value in [(2, '/fs0'), (3, '/fs1'), (5, '/fs3')]:
+            sheet.cell(row=row_idx, column=1, value=path_value)
+            sheet.cell(row=row_idx, column=3, value='x')
+        sheet.cell(row=400, column=1, value='/after_gap')
+        workbook.save(path)
+
+        with WorkbookSession(path) as session:
+            with patch.object(session._excel_file, 'parse', side_effect=AssertionError("parsed twice")), \
+                    patch('sys.stdout', new_callable=StringIO) as output:
+                frame = session.frame('Create', ['share_path', 'charset'], max_blank_rows=10)
+            # The long gap ends the data: 4 rows, keeping the blank row inside them, read in one pass
+            self.assertEqual(len(frame), 4)
+            self.assertEqual(output.getvalue(), "Warning: sheet 'Create' read up to row 5; "
+                                                "rows 16-1001 after 10 blank rows are ignored\n")
+            self.assertEqual(list(frame.columns), ['share_path', 'charset'])
+            self.assertEqual(frame['share_path'].tolist()[:2] + frame['share_path'].tolist()[3:], ['/fs0', '/fs1', '/fs3'])
+            self.assertEqual(len(session.frame('Create')), 399)
+
+            chunks = list(session.iter_chunks('Create', 2, ['share_path'], max_blank_rows=10))
+            self.assertEqual(pd.concat(chunks)['share_path'].tolist()[3], '/fs3')
+            self.assertEqual([list(chunk.columns) for chunk in chunks], [['share_path'], ['share_path']])
+        self.assertEqual(len(read_file(path, 'Create', max_blank_rows=DEFAULT_MAX_BLANK_ROWS)), 4)
+
+    def test_stream_keeps_whole_sheet_dtypes(self):
+        config = {'Notes': {'operations': {'Create': {
+            'cli_prefix': 'create note',
+            'mandatory': [{'name': 'name', 'field_type': 'text'}],
+            'optional': [{'name': 'description', 'field_type': 'text'}]
+        }}}}
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.title = 'Create'
+        sheet.append(['name', 'description'])
+        # The first chunk only holds ints; the float further down makes the column float
+        for i, description in enumerate([103, 104, 105, 106, 107.5, 108]):
+            sheet.append([f'n{i}', description])
+        workbook.save(os.path.join('Documents', 'Dev_Notes_commands.xlsx'))
+
+        with patch('command_generator.load_config', return_value=config), patch('sys.stdout', new_callable=StringIO):
+            generator = CommandGenerator()
+            with open(generator.main('Notes', 'Dev')) as f:
+                expected = f.read()
+            with open(generator.main('Notes', 'Dev', stream=True, chunk_size=4)) as f:
+                self.assertEqual(f.read(), expected)
+        self.assertTrue(expected.startswith('create note name=n0 description=103.0\n'))
+
+        # The same sheet as a CSV export: its chunks differ in whether the column is whole numbers
+        csv_dir = os.path.join('Documents', 'notes_csv')
+        os.makedirs(csv_dir)
+        pd.read_excel(os.path.join('Documents', 'Dev_Notes_commands.xlsx')).to_csv(
+            os.path.join(csv_dir, 'Create.csv'), index=False)
+        with open_workbook(csv_dir) as session:
+            chunks = list(session.iter_chunks('Create', 4))
+            self.assertEqual(pd.concat(chunks)['description'].tolist(), session.frame('Create')['description'].tolist())
+            self.assertEqual([str(chunk['description'].dtype) for chunk in chunks], ['float64', 'float64'])
+        with patch('command_generator.load_config', return_value=config), patch('sys.stdout', new_callable=StringIO):
+            for stream in (False, True):
+                with open(generator.main('Notes', 'Dev', stream=stream, chunk_size=4, input_path=csv_dir)) as f:
+                    self.assertEqual(f.read(), expected, stream)
+
+    def test_table_inputs_match_workbook(self):
+        workbook_path = os.path.join('Documents', 'Dev_NFS_commands.xlsx')
+        sheets = pd.read_excel(workbook_path, sheet_name=None)
+        csv_dir = os.path.join('Documents', 'Dev_NFS_commands')
+        os.makedirs(csv_dir)
+        for sheet_name, df in sheets.items():
+            df.to_csv(os.path.join(csv_dir, f'{sheet_name}.csv'), index=False)
+        pd.concat([df.assign(sheet=sheet_name) for sheet_name, df in sheets.items()]).to_json(
+            'nfs.jsonl', orient='records', lines=True)
+        inputs = [csv_dir, 'nfs.jsonl']
+        try:
+            import pyarrow  # noqa: F401
+            pd.concat([df.assign(sheet=sheet_name) for sheet_name, df in sheets.items()]).to_parquet('nfs.parquet')
+            inputs.append('nfs.parquet')
+        except ImportError:
+            pass
+
+        with patch('command_generator.load_config', return_value=self.config), patch('sys.stdout', new_callable=StringIO):
+            generator = CommandGenerator()
+            with open(generator.main('NFS', 'Dev')) as f:
+                expected = f.read()
+            for input_path in inputs:
+                for stream in (False, True):
+                    with open(generator.main('NFS', 'Dev', stream=stream, chunk_size=4, input_path=input_path)) as f:
+                        self.assertEqual(f.read(), expected, (input_path, stream))
+
+        with open_workbook('nfs.jsonl') as session:
+            self.assertEqual(session.sheet_names, ['Create', 'Show'])
+            # Each sheet keeps only its own columns, with the types Excel would give them
+            self.assertEqual(list(session.frame('Show').columns), ['share_id'])
+            self.assertEqual(session.frame('Show')['share_id'].tolist(), [1, 2])
+
+        # Without a workbook the export in Documents is the resource's input
+        self.assertEqual(get_workbook_path('NFS', 'Dev'), os.path.join(os.getcwd(), workbook_path))
+        os.remove(workbook_path)
+        self.assertEqual(get_workbook_path('NFS', 'Dev'), os.path.join(os.getcwd(), csv_dir))
+
+    def test_generate_batch_inline(self):
+        with patch('command_generator.load_config', return_value=self.config):
+            results = generate_batch(['Dev'], max_workers=1)
+        self.assertEqual([(r['device'], r['resource'], r['error']) for r in results], [('Dev', 'NFS', None)])
+        self.assertTrue(os.path.exists(results[0]['output']))
+
+    def test_generate_batch_process_pool(self):
+        device = 'OceanStor Pacific'
+        for resource in ['NFS', 'CIFS']:
+            create_excel_for_resource(resource, os.path.join('Documents', f'{device}_{resource}_commands.xlsx'), device, num_rows=5)
+
+        results = generate_batch([device], max_workers=2)
+
+        # Config order, and only resources with a workbook
+        self.assertEqual([r['resource'] for r in results], ['CIFS', 'NFS'])
+        for result in results:
+            self.assertIsNone(result['error'])
+            self.assertTrue(os.path.exists(result['output']))
+            self.assertGreaterEqual(result['seconds'], 0)
+
+    def test_iter_commands_is_lazy(self):
+        def frames():
+            yield pd.DataFrame({'share_id': ['1']})
+            raise AssertionError("second chunk should not be read")
+
+        commands = CommandGenerator().iter_commands(frames(), 'NFS', 'Show', self.config)
+        self.assertEqual(next(commands), 'show share nfs share_id=1')
+
+class TestValidation(unittest.TestCase):
+    def setUp(self):
+        clear_plan_cache()
+        self.config = {
+            'LUN': {
+                'operations': {
+                    'Create': {
+                        'cli_prefix': 'create lun',
+                        'mandatory': [
+                            {'name': 'name', 'field_type': 'text', 'min_length': 1, 'max_length': 8, 'pattern': '[A-Za-z0-9._-]+'}
+                        ],
+                        'optional': [
+                            {'name': 'number', 'field_type': 'integer', 'min_value': 2, 'max_value': 500},
+                            {'name': 'prefetch_policy', 'field_type': 'select', 'allowed_values': ['none', 'constant', 'intelligent']},
+                            {'name': 'prefetch_value', 'field_type': 'integer', 'conditions': [
+                                {'when': {'prefetch_policy': 'constant'}, 'min_value': 0, 'max_value': 1024},
+                                {'when': {'prefetch_policy': 'intelligent'}, 'min_value': 1024, 'max_value': 16384}
+                            ]},
+                            {'name': 'snap_enable', 'field_type': 'select', 'allowed_values': ['true', 'false'],
+                             'applicable_when': {'prefetch_policy': 'none'}},
+                            {'name': 'lun_id', 'field_type': 'integer'}
+                        ],
+                        'mutually_exclusive_groups': [{'name': 'id_selection', 'fields': ['number', 'lun_id']}]
+                    }
+                }
+            }
+        }
+        self.data_frame = pd.DataFrame({
+            'name': ['lun1', 'bad name', 'much_too_long', 'lun4'],
+            'number': ['3', '1', 'x', None],
+            'prefetch_policy': ['constant', 'Intelligent', None, 'constant'],
+            'prefetch_value': ['2048', '2048', None, '512'],
+            'snap_enable': [None, 'true', None, None],
+            'lun_id': [None, None, None, '7']
+        })
+
+    def test_validate_frame_report(self):
+        report = validate_frame(self.data_frame, self.config, 'LUN', 'Create')
+        self.assertEqual(list(report.columns), ['row', 'field', 'value', 'rule', 'message'])
+        found = set(zip(report['row'], report['field'], report['rule']))
+        self.assertEqual(found, {
+            (1, 'prefetch_value', 'max_value'),
+            (2, 'name', 'pattern'),
+            (2, 'number', 'min_value'),
+            (2, 'snap_enable', 'applicable_when'),
+            (3, 'name', 'max_length'),
+            (3, 'number', 'type'),
+        })
+
+    def test_validator_is_compiled_once_per_plan(self):
+        plan = get_operation_plan(self.config, 'LUN', 'Create')
+        self.assertIs(get_operation_validator(plan), get_operation_validator(plan))
+
+    def test_generate_commands_with_validation(self):
+        generator = CommandGenerator()
+        with patch('sys.stdout', new_callable=StringIO):
+            self.assertEqual(len(generator.generate_commands(self.data_frame, 'LUN', 'Create', self.config)), 2)
+        with patch('sys.stdout', new_callable=StringIO) as stdout:
+            commands = generator.generate_commands(self.data_frame, 'LUN', 'Create', self.config, validate=True)
+        self.assertEqual(commands, ['create lun name=lun4 prefetch_policy=constant prefetch_value=512 lun_id=7'])
+        self.assertIn("Skipping row 1 - prefetch_value is above the maximum 1024", stdout.getvalue())
+
+    def test_size_bounds(self):
+        config = {'FileSystem': {'operations': {'Change': {
+            'cli_prefix': 'change file_system general',
+            'mandatory': [{'name': 'capacity', 'field_type': 'size', 'min_value': '1GB', 'max_value': '32768TB'}]
+        }}}}
+        data_frame = pd.DataFrame({'capacity': ['10 gb', '512MB', 'remain', '1 liter']})
+        report = validate_frame(data_frame, config, 'FileSystem', 'Change')
+        self.assertEqual(list(zip(report['row'], report['rule'])), [(2, 'min_value'), (4, 'type')])
+        self.assertEqual(report['message'][0], "capacity is below the minimum 1GB")
+
+    def test_required_exclusive_group_needs_exactly_one(self):
+        config = {'FileSystem': {'operations': {'Change': {
+            'cli_prefix': 'change file_system general',
+            'optional': [{'name': 'file_system_id', 'field_type': 'integer'},
+                         {'name': 'file_system_name', 'field_type': 'text'},
+                         {'name': 'description', 'field_type': 'text'},
+                         {'name': 'clear_description', 'field_type': 'select', 'allowed_values': ['true']}],
+            'mutually_exclusive': [
+                {'parameters': ['file_system_id', 'file_system_name'], 'required': True,
+                 'description': 'Either file_system_id or file_system_name must be specified, but not both'},
+                {'parameters': ['description', 'clear_description']}
+            ]
+        }}}}
+        data_frame = pd.DataFrame({
+            'file_system_id': ['1', None, '3', None],
+            'file_system_name': [None, 'fs2', 'fs3', None],
+            'description': [None, None, None, None],
+            'clear_description': [None, None, None, None]
+        })
+        report = validate_frame(data_frame, config, 'FileSystem', 'Change')
+        # Row 3 sets both, row 4 neither; the optional description group may be left empty
+        self.assertEqual(list(zip(report['row'], report['field'], report['rule'])), [
+            (3, 'file_system_id/file_system_name', 'mutually_exclusive'),
+            (4, 'file_system_id/file_system_name', 'required')
+        ])
+        self.assertEqual(report['message'][1], 'Either file_system_id or file_system_name must be specified, but not both')
+
+class TestTypedFields(unittest.TestCase):
+    def setUp(self):
+        self.generator = CommandGenerator()
+        self.size = {'name': 'capacity', 'field_type': 'size', 'min_value': '64MB', 'max_value': '100GB'}
+        self.integer = {'name': 'lun_id', 'field_type': 'integer', 'min_value': 0, 'max_value': 65535}
+        self.number = {'name': 'anonymous_user_id', 'field_type': 'number'}
+
+    def test_size_normalization(self):
+        process = self.generator.process_field_value
+        self.assertEqual(process(self.size, '10 gb'), '10GB')
+        self.assertEqual(process(self.size, '10.0GB'), '10GB')
+        self.assertEqual(process(self.size, '1.5GB'), '1536MB')
+        self.assertEqual(process(self.size, 'Remain'), 'remain')
+        self.assertEqual(process(self.size, '262144 Blocks'), '262144')
+        with self.assertRaisesRegex(ValueError, "below the minimum 64MB"):
+            process(self.size, '32MB')
+        with self.assertRaisesRegex(ValueError, "above the maximum 100GB"):
+            process(self.size, '1TB')
+        with self.assertRaisesRegex(ValueError, "Invalid size '10 apples'"):
+            process(self.size, '10 apples')
+
+    def test_scalar_fields_are_compiled_once(self):
+        with patch('command_plans.compile_field', wraps=compile_field) as compiled:
+            for value in ['1', '2', '3']:
+                self.generator.process_field_value(self.integer, value)
+            for value in ['1GB', '2GB']:
+                self.generator.process_field_value(self.size, value)
+        self.assertEqual([call.args[0] for call in compiled.call_args_list], [self.integer, self.size])
+
+    def test_numbers_drop_excel_float_suffix(self):
+        process = self.generator.process_field_value
+        self.assertEqual(process(self.integer, 12.0), '12')
+        self.assertEqual(process(self.number, 12.0), '12')
+        self.assertEqual(process(self.number, '2.5'), '2.5')
+        with self.assertRaisesRegex(ValueError, "Invalid integer '2.5'"):
+            process(self.integer, 2.5)
+        with self.assertRaisesRegex(ValueError, "above the maximum 65535"):
+            process(self.integer, '70000')
+
+    def test_column_matches_scalar(self):
+        cases = [
+            (self.size, ['10 gb', '1.5GB', 'remain', '32MB', '1TB', 'x', '0.1KB', '131072', '１２GB', '0.3GB', None]),
+            (self.integer, [12.0, '7', '2.5', '-1', 'abc', 'inf', '', '１２', '1_000', None]),
+            (self.number, [12.0, '2.5', '-3', 'nan', '0.3', '１２', 1e19, '12345678901234567890', None])
+        ]
+        for field_config, raw in cases:
+            field = compile_field(field_config)
+            values, errors = field.evaluate_column(pd.Series(raw, dtype=object))
+            for position, value in enumerate(raw):
+                try:
+                    expected = field.evaluate(value)
+                except ValueError as e:
+                    self.assertEqual(errors[position], str(e))
+                else:
+                    self.assertTrue(pd.isna(errors[position]))
+                    if expected is None:
+                        self.assertTrue(pd.isna(values[position]))
+                    else:
+                        self.assertEqual(values[position], expected)
+
+class TestOperationPlan(unittest.TestCase):
+    def setUp(self):
+        clear_plan_cache()
+        self.generator = CommandGenerator()
+        self.operation_config = {
+            'cli_prefix': 'create share nfs',
+            'mandatory': [
+                {'name': 'local_path', 'field_type': 'text', 'transform': 'prefix_slash'}
+            ],
+            'optional': [
+                {'name': 'enabled', 'field_type': 'select', 'allowed_values': ['Yes', 'No']},
+                {'name': 'members', 'field_type': 'list', 'separator': ';'}
+            ]
+        }
+        self.config = {'NFS': {'operations': {'Create': self.operation_config}}}
+
+    def test_build_command_matches_generate_command(self):
+        plan = OperationPlan(self.operation_config)
+        rows = [
+            pd.Series({'local_path': 'fs01', 'enabled': 'YES', 'members': 'a, b c'}),
+            pd.Series({'local_path': '/fs02', 'enabled': None, 'members': ''}),
+            {'local_path': 'fs03'}
+        ]
+        for row in rows:
+            self.assertEqual(plan.build_command(row), self.generator.generate_command(row, self.operation_config))
+
+    def test_build_command_errors(self):
+        plan = OperationPlan(self.operation_config)
+        with self.assertRaisesRegex(ValueError, "Missing mandatory field: local_path"):
+            plan.build_command({'enabled': 'yes'})
+        with self.assertRaisesRegex(ValueError, "Invalid value 'maybe'"):
+            plan.build_command({'local_path': 'fs', 'enabled': 'Maybe'})
+
+    def test_plan_is_cached_per_operation(self):
+        plan = get_operation_plan(self.config, 'NFS', 'Create', 'OceanStor Dorado')
+        self.assertIs(plan, get_operation_plan(self.config, 'NFS', 'Create', 'OceanStor Dorado'))
+        self.assertIsNot(plan, get_operation_plan(self.config, 'NFS', 'Create', 'OceanStor Pacific'))
+        self.assertEqual(plan.optional[0].allowed, frozenset(['yes', 'no']))
+
+        # A reloaded config recompiles the plan
+        reloaded = {'NFS': {'operations': {'Create': dict(self.operation_config)}}}
+        self.assertIsNot(plan, get_operation_plan(reloaded, 'NFS', 'Create', 'OceanStor Dorado'))
+
+    def test_generate_frame_matches_row_path(self):
+        plan = OperationPlan(self.operation_config)
+        data_frame = pd.DataFrame({
+            'local_path': ['fs01', '/fs02', None, ' fs04 ', '', 7],
+            'enabled': ['YES', None, 'no', 'Maybe', 'no', ''],
+            'members': ['a, b c', ' ,x,, y, ', 'z', None, '  ', 3.5]
+        })
+
+        expected_commands = []
+        expected_reasons = []
+        for index, row in data_frame.iterrows():
+            try:
+                expected_commands.append(self.generator.generate_command(row, self.operation_config))
+            except ValueError as e:
+                expected_reasons.append((index, str(e)))
+
+        commands, rejected, reasons = plan.generate_frame(data_frame)
+        self.assertEqual(commands[~rejected].tolist(), expected_commands)
+        self.assertEqual(list(reasons[rejected].items()), expected_reasons)
+        self.assertEqual(rejected.tolist(), [False, False, True, True, True, False])
+
+    def test_generate_frame_numeric_upcast(self):
+        # iterrows upcasts ints to float when every column is numeric
+        plan = OperationPlan({'cli_prefix': 'x', 'mandatory': [{'name': 'a'}], 'optional': [{'name': 'b'}]})
+        commands, rejected, _ = plan.generate_frame(pd.DataFrame({'a': [1, 2], 'b': [1.5, None]}))
+        self.assertEqual(commands.tolist(), ['x a=1.0 b=1.5', 'x a=2.0'])
+
+    def test_unsupported_operation(self):
+        with self.assertRaises(ValueError):
+            get_operation_plan(self.config, 'NFS', 'Delete')
+
+class TestTemplateBuilder(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.work_dir, 'template.xlsx')
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_template_styles_columns_not_cells(self):
+        config = {'NFS': {'operations': {'Create': {
+            'mandatory': [{'name': 'share_path', 'field_type': 'text'}],
+            'optional': [{'name': 'enabled', 'field_type': 'select', 'allowed_values': ['Yes', 'No']}]
+        }}}}
+        with patch('file_operations.load_config', return_value=config), patch('sys.stdout', new_callable=StringIO):
+            self.assertTrue(create_excel_for_resource('NFS', self.path, 'Dev', num_rows=50))
+
+        sheet = load_workbook(self.path)['Create']
+        # Only the header row is stored
+        self.assertEqual(sheet.max_row, 1)
+        self.assertEqual([cell.value for cell in sheet[1]], ['share_path', 'enabled'])
+        self.assertEqual(sheet['A1'].style, 'Template Header')
+        self.assertEqual(sheet.column_dimensions['A'].fill.start_color.rgb, '00FFD3D3')
+        self.assertEqual(sheet.column_dimensions['B'].fill.start_color.rgb, '00D3FFD3')
+        self.assertEqual(sheet.column_dimensions['A'].width, 15)
+        validation, = sheet.data_validations.dataValidation
+        self.assertEqual(str(validation.sqref), 'B2:B51')
+        self.assertEqual(validation.formula1, '"Yes,No"')
+
+    def test_template_cache_rebuilds_on_config_change(self):
+        cache_dir = os.path.join(self.work_dir, 'Templates')
+        config = {'NFS': {'operations': {'Create': {'mandatory': [{'name': 'share_path'}]}}}}
+        with patch('file_operations.load_config', return_value=config), patch('sys.stdout', new_callable=StringIO):
+            template_path = get_template_path('NFS', 'Dev', cache_dir=cache_dir)
+            self.assertEqual(get_template_path('NFS', 'Dev', cache_dir=cache_dir), template_path)
+            self.assertTrue(copy_template('NFS', self.path, 'Dev', cache_dir=cache_dir))
+            self.assertFalse(copy_template('NFS', self.path, 'Dev', cache_dir=cache_dir))
+            with open(self.path, 'rb') as copied, open(template_path, 'rb') as template:
+                self.assertEqual(copied.read(), template.read())
+
+            config['NFS']['operations']['Create']['optional'] = [{'name': 'description'}]
+            rebuilt_path = get_template_path('NFS', 'Dev', cache_dir=cache_dir)
+
+        self.assertNotEqual(rebuilt_path, template_path)
+        self.assertEqual(os.listdir(cache_dir), [os.path.basename(rebuilt_path)])
+        self.assertEqual([cell.value for cell in load_workbook(rebuilt_path)['Create'][1]], ['share_path', 'description'])
+
+class TestActiveSheet(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.work_dir, 'filled.xlsx')
+        workbook = Workbook()
+        workbook.active.title = 'Create'
+        for title in ('Change', 'Show & Tell'):
+            workbook.create_sheet(title).append(['name', 1])
+        workbook.save(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def members(self):
+        with zipfile.ZipFile(self.path) as archive:
+            return {info.filename: archive.read(info) for info in archive.infolist()}
+
+    def test_only_the_active_tab_changes(self):
+        before = self.members()
+        self.assertTrue(set_active_sheet(self.path, 'Show & Tell'))
+        after = self.members()
+
+        self.assertEqual(load_workbook(self.path).active.title, 'Show & Tell')
+        self.assertEqual(list(after), list(before))
+        self.assertIn(b'activeTab="2"', after['xl/workbook.xml'])
+        for name in before:
+            if name != 'xl/workbook.xml':
+                self.assertEqual(after[name], before[name])
+
+    def test_members_keep_their_codec_and_date(self):
+        with zipfile.ZipFile(self.path, 'a') as archive:
+            archive.writestr(zipfile.ZipInfo('extra/stored.bin', (2020, 5, 17, 8, 30, 0)), b'raw' * 100)
+            archive.writestr(zipfile.ZipInfo('extra/lzma.bin', (2021, 1, 2, 3, 4, 6)), b'packed' * 100,
+                             compress_type=zipfile.ZIP_LZMA)
+        with zipfile.ZipFile(self.path) as archive:
+            before = [(info.filename, info.compress_type, info.date_time) for info in archive.infolist()]
+        contents = self.members()
+
+        self.assertTrue(set_active_sheet(self.path, 'Change'))
+        with zipfile.ZipFile(self.path) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual([(info.filename, info.compress_type, info.date_time) for info in archive.infolist()],
+                             before)
+        after = self.members()
+        self.assertEqual(after['extra/stored.bin'], contents['extra/stored.bin'])
+        self.assertEqual(after['extra/lzma.bin'], contents['extra/lzma.bin'])
+
+    def test_active_or_missing_sheet_is_left_alone(self):
+        modified = os.path.getmtime(self.path)
+        self.assertFalse(set_active_sheet(self.path, 'Create'))
+        self.assertFalse(set_active_sheet(self.path, 'Delete'))
+        self.assertEqual(os.path.getmtime(self.path), modified)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,565 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+import zipfile
+import pandas as pd
+from datetime import datetime
+from io import StringIO
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import import_operations
+from import_commands import (
+    import_filesystem, import_cifs_share, import_cifs_permission, import_vstore, import_nfs_share, import_nfs_permission
+)
+from import_context import ImportContext, normalize_vstore_id, group_by_vstore, count_vstore_switches
+from import_output import MemorySink, DirectorySink
+
+def write_infograb(file_path):
+    """Write a small InfoGrab-style export with every imported sheet plus one unused sheet."""
+    sheets = {
+        'Controller': pd.DataFrame({'Controller': ['A', 'B']}),
+        'Vstore': pd.DataFrame({'Vstore': ['vs0', 'vs1'], 'Vstore ID': [0, 1]}),
+        'Filesystem': pd.DataFrame({
+            'Filesystem Name': ['fs0', 'fs1', 'fs2'],
+            'Capacity': ['1.000GB', '20.000GB', '5.000TB'],
+            'Vstore ID': [0, 0, 1]
+        }),
+        'CIFS_Share': pd.DataFrame({
+            'Share Name': ['sh0', 'sh1'],
+            'Local Path': ['/fs0/', '/fs1/'],
+            'Vstore': ['vs0', 'vs1'],
+            'Oplock Enabled': ['Enabled', 'Disabled']
+        }),
+        'NFS_Share': pd.DataFrame({
+            'Local Path': ['/fs0/', '/fs0/', '/fs2/'],
+            'Share ID': [1, 1, 2],
+            'Access Name': ['*', '10.0.0.1', '*'],
+            'Access Type': ['Read-only', 'Read-write', '1'],
+            'Vstore ID': [0, 0, 1]
+        }),
+        'CIFS_Share_Permission': pd.DataFrame({
+            'Access Name': ['Everyone', None],
+            'Share Name': ['sh0', 'sh1'],
+            'Permission Type': ['Full control', 'Read-only'],
+            'Vstore ID': [0, 1]
+        })
+    }
+    with pd.ExcelWriter(file_path) as writer:
+        for sheet_name, df in sheets.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+class TestProcessImportedData(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.work_dir, 'infograb.xlsx')
+        self.results_dir = os.path.join(self.work_dir, 'results')
+        self.logs_dir = os.path.join(self.work_dir, 'logs')
+        os.makedirs(self.logs_dir)
+        write_infograb(self.file_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def run_import(self, results_dir=None, sheet_jobs=1, compression=None):
+        with patch('log_operations.create_logs_directory', return_value=self.logs_dir), \
+                patch('sys.stdout', new_callable=StringIO):
+            return import_operations.process_imported_data(self.file_path, results_dir or self.results_dir,
+                                                           sheet_jobs, compression)
+
+    def read_log(self):
+        log_name, = os.listdir(self.logs_dir)
+        with open(os.path.join(self.logs_dir, log_name), encoding='utf-8') as f:
+            return f.read()
+
+    def test_each_needed_sheet_is_parsed_once(self):
+        parsed = []
+        original_parse = pd.ExcelFile.parse
+
+        def counting_parse(excel_file, sheet_name, *args, **kwargs):
+            parsed.append(sheet_name)
+            return original_parse(excel_file, sheet_name, *args, **kwargs)
+
+        with patch.object(pd.ExcelFile, 'parse', counting_parse):
+            self.run_import()
+
+        self.assertEqual(sorted(parsed), sorted(import_operations.TARGET_SHEETS))
+        log = self.read_log()
+        self.assertIn("EXECUTION STATUS: Success", log)
+        self.assertIn("NFS_Share:\n  → Created: 2\n  → Excel Lines: 2\n", log)
+        self.assertIn("NFS_Share_Permission:\n  → Created: 3\n  → Excel Lines: 3\n", log)
+        self.assertIn("CIFS_Share_Permission:\n  → Created: 1\n  → Excel Lines: 2\n", log)
+
+    def test_log_comes_from_counters(self):
+        with patch('log_operations.open', create=True, side_effect=open) as opened:
+            self.run_import()
+        # The command files are never read back for the log
+        self.assertEqual([call.args[1] for call in opened.call_args_list], ['w'])
+
+        log = self.read_log()
+        self.assertIn("NFS_Share:\n  → Created: 2\n  → Excel Lines: 2\n  → Skipped: 1 (duplicate: 1)\n", log)
+        self.assertIn("CIFS_Share_Permission:\n  → Created: 1\n  → Excel Lines: 2\n  → Skipped: 1 (incomplete: 1)\n", log)
+        self.assertIn("Vstore switches: 10\n", log)
+        written = sum(os.path.getsize(os.path.join(self.results_dir, name)) for name in os.listdir(self.results_dir))
+        self.assertIn(f"Bytes written: {written}\n", log)
+
+    def test_commands_are_written_per_vstore(self):
+        # Translated sheets are streamed into the sink, never built as one text first
+        with patch.object(DirectorySink, 'write', side_effect=AssertionError("not streamed")):
+            self.run_import()
+        with open(os.path.join(self.results_dir, 'Filesystem_commands.txt')) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], "change vstore view name=vs0")
+        self.assertEqual(lines[3], "")
+        self.assertEqual(lines[4], "change vstore view name=vs1")
+        self.assertTrue(lines[1].startswith("create file_system general name=fs0 pool_id=1 capacity=10.000GB"))
+
+    def test_reimport_emits_the_same_shares(self):
+        self.run_import()
+        with open(os.path.join(self.results_dir, 'NFS_Share_commands.txt')) as f:
+            first = f.read()
+        self.run_import()
+        with open(os.path.join(self.results_dir, 'NFS_Share_commands.txt')) as f:
+            self.assertEqual(f.read(), first)
+        self.assertEqual(first.count("create share nfs"), 2)
+
+    def test_parallel_sheets_match_serial(self):
+        self.run_import()
+        serial_log = self.read_log()
+        os.remove(os.path.join(self.logs_dir, os.listdir(self.logs_dir)[0]))
+
+        parallel_dir = os.path.join(self.work_dir, 'parallel')
+        self.run_import(parallel_dir, sheet_jobs=None)
+        self.assertEqual(sorted(os.listdir(parallel_dir)), sorted(os.listdir(self.results_dir)))
+        for name in os.listdir(self.results_dir):
+            with open(os.path.join(self.results_dir, name)) as serial, open(os.path.join(parallel_dir, name)) as parallel:
+                self.assertEqual(parallel.read(), serial.read(), name)
+        # Same counters, only the timestamp line differs
+        self.assertEqual(self.read_log().splitlines()[:-1], serial_log.splitlines()[:-1])
+
+    def test_parallel_sheets_stay_in_their_workers(self):
+        vstores = pd.read_excel(self.file_path, sheet_name='Vstore')
+        with patch('sys.stdout', new_callable=StringIO):
+            line_counts, context, outputs, ok = import_operations._process_sheet_job(self.file_path, 'NFS_Share', vstores)
+        # Only the line counts the log needs go back to the parent, not the parsed frame
+        self.assertEqual(line_counts, {'NFS_Share': 2, 'NFS_Share_Permission': 3})
+        self.assertTrue(ok)
+        self.assertEqual(context.commands['NFS_Share_Permission'], 3)
+
+        parsed = []
+        original_parse = pd.ExcelFile.parse
+
+        def counting_parse(excel_file, sheet_name, *args, **kwargs):
+            parsed.append(sheet_name)
+            return original_parse(excel_file, sheet_name, *args, **kwargs)
+
+        with patch.object(pd.ExcelFile, 'parse', counting_parse):
+            self.run_import(sheet_jobs=None)
+        self.assertEqual(parsed, ['Vstore'])
+        self.assertIn("NFS_Share_Permission:\n  → Created: 3\n  → Excel Lines: 3\n", self.read_log())
+
+    def test_table_exports_match_the_workbook(self):
+        self.run_import()
+        sheets = pd.read_excel(self.file_path, sheet_name=None)
+        csv_dir = os.path.join(self.work_dir, 'infograb_csv')
+        os.makedirs(csv_dir)
+        for sheet_name, df in sheets.items():
+            df.to_csv(os.path.join(csv_dir, f"{sheet_name}.csv"), index=False)
+        jsonl_path = os.path.join(self.work_dir, 'infograb.jsonl')
+        pd.concat([df.assign(sheet=sheet_name) for sheet_name, df in sheets.items()]).to_json(
+            jsonl_path, orient='records', lines=True)
+
+        for file_path, sheet_jobs in [(csv_dir, 1), (jsonl_path, 1), (jsonl_path, None)]:
+            self.file_path = file_path
+            results_dir = os.path.join(self.work_dir, f"{os.path.basename(file_path)}_{sheet_jobs}_results")
+            self.run_import(results_dir, sheet_jobs)
+            self.assertEqual(sorted(os.listdir(results_dir)), sorted(os.listdir(self.results_dir)))
+            for name in os.listdir(self.results_dir):
+                with open(os.path.join(self.results_dir, name)) as expected, open(os.path.join(results_dir, name)) as f:
+                    self.assertEqual(f.read(), expected.read(), f"{file_path}: {name}")
+
+    def test_table_file_workers_get_only_their_rows(self):
+        sheets = pd.read_excel(self.file_path, sheet_name=None)
+        jsonl_path = os.path.join(self.work_dir, 'infograb.jsonl')
+        pd.concat([df.assign(sheet=sheet_name) for sheet_name, df in sheets.items()]).to_json(
+            jsonl_path, orient='records', lines=True)
+        vstores = sheets['Vstore']
+
+        with import_operations.open_workbook(jsonl_path) as session:
+            sheet_input = session.sheet_input('NFS_Share')
+        self.assertEqual(sheet_input.sheet_names, ['NFS_Share'])
+        # The worker reads the rows it is given, never the table file again
+        with patch.dict('workbook_session.TABLE_READERS', {'.jsonl': None}), \
+                patch('sys.stdout', new_callable=StringIO):
+            line_counts, context, outputs, ok = import_operations._process_sheet_job(sheet_input, 'NFS_Share', vstores)
+        self.assertTrue(ok)
+        self.assertEqual(line_counts, {'NFS_Share': 2, 'NFS_Share_Permission': 3})
+        self.assertEqual([output for output, _ in outputs], ['NFS_Share', 'NFS_Share_Permission'])
+
+        # An Excel workbook is reopened by path in the worker, which parses only its sheet
+        with import_operations.open_workbook(self.file_path) as workbook:
+            self.assertEqual(workbook.sheet_input('NFS_Share'), self.file_path)
+
+    def test_zip_holds_the_command_files_and_log(self):
+        self.run_import()
+        log_name, = os.listdir(self.logs_dir)
+        os.remove(os.path.join(self.logs_dir, log_name))
+
+        for compression, sheet_jobs in [('lzma', 1), ('stored', None)]:
+            zip_dir = os.path.join(self.work_dir, compression)
+            zip_path = self.run_import(zip_dir, sheet_jobs, compression)
+            # Nothing but the archive is written to the results directory
+            self.assertEqual(os.listdir(zip_dir), [os.path.basename(zip_path)])
+            with zipfile.ZipFile(zip_path) as archive:
+                log_member, = [name for name in archive.namelist() if name.startswith('logs/')]
+                # Members carry the time they were written, not ZipFile.open's 1980-01-01
+                self.assertTrue(all(info.date_time[0] > 1980 for info in archive.infolist()))
+                self.assertEqual(archive.read(log_member).decode('utf-8'), self.read_log())
+                commands = sorted(name for name in archive.namelist() if name != log_member)
+                self.assertEqual(commands, sorted(os.listdir(self.results_dir)))
+                for name in commands:
+                    with open(os.path.join(self.results_dir, name), 'rb') as f:
+                        self.assertEqual(archive.read(name), f.read(), name)
+            os.remove(os.path.join(self.logs_dir, os.listdir(self.logs_dir)[0]))
+
+    def test_imports_in_the_same_second_keep_their_own_archive_and_log(self):
+        zip_dir = os.path.join(self.work_dir, 'zipped')
+        with patch('log_operations.datetime') as log_clock, patch('import_output.datetime') as zip_clock:
+            log_clock.datetime.now.return_value = zip_clock.now.return_value = datetime(2024, 1, 1)
+            zip_paths = [self.run_import(zip_dir, compression='deflate') for _ in range(2)]
+
+        self.assertEqual(sorted(os.listdir(zip_dir)), sorted(os.path.basename(path) for path in zip_paths))
+        self.assertEqual(os.path.basename(zip_paths[1]), 'import_commands_2024-01-01_00-00-00_infograb_2.zip')
+        self.assertEqual(sorted(os.listdir(self.logs_dir)), ['import_log_2024-01-01_00-00-00_infograb.txt',
+                                                             'import_log_2024-01-01_00-00-00_infograb_2.txt'])
+        for zip_path in zip_paths:
+            with zipfile.ZipFile(zip_path) as archive:
+                self.assertIsNone(archive.testzip())
+
+    def run_import_log(self, results_dir, **options):
+        for log_name in os.listdir(self.logs_dir):
+            os.remove(os.path.join(self.logs_dir, log_name))
+        with patch('log_operations.create_logs_directory', return_value=self.logs_dir), \
+                patch('sys.stdout', new_callable=StringIO):
+            import_operations.process_imported_data(self.file_path, results_dir, **options)
+        return self.read_log()
+
+    def change_capacity(self, row, capacity):
+        self.change_cell('Filesystem', row, 'Capacity', capacity)
+
+    def change_cell(self, sheet_name, row, column, value):
+        sheets = pd.read_excel(self.file_path, sheet_name=None)
+        sheets[sheet_name].loc[row, column] = value
+        with pd.ExcelWriter(self.file_path) as writer:
+            for sheet_name, df in sheets.items():
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+    def read_outputs(self, results_dir):
+        outputs = {}
+        for name in os.listdir(results_dir):
+            if name.endswith('.txt'):
+                with open(os.path.join(results_dir, name)) as f:
+                    outputs[name] = f.read()
+        return outputs
+
+    def test_incremental_import_reuses_unchanged_sheets_and_rows(self):
+        cached_dir = os.path.join(self.work_dir, 'cached')
+        self.assertIn("Reused from cache: 0 sheets, 0 rows\n", self.run_import_log(cached_dir, incremental=True))
+        self.assertIn("Reused from cache: 5 sheets, 12 rows\n", self.run_import_log(cached_dir, incremental=True))
+
+        self.change_capacity(1, '30.000GB')
+        log = self.run_import_log(cached_dir, incremental=True)
+        # Filesystem is translated again, but only its changed row
+        self.assertIn("Reused from cache: 4 sheets, 11 rows\n", log)
+        self.run_import_log(self.results_dir)
+        self.assertEqual(self.read_outputs(cached_dir), self.read_outputs(self.results_dir))
+        self.assertIn("capacity=30.000GB", self.read_outputs(cached_dir)['Filesystem_commands.txt'])
+
+    def test_replayed_sheets_are_rebuilt_from_cached_rows(self):
+        cached_dir = os.path.join(self.work_dir, 'cached')
+        self.run_import_log(cached_dir, incremental=True)
+        self.assertIn("Reused from cache: 5 sheets, 12 rows\n", self.run_import_log(cached_dir, incremental=True))
+        self.run_import_log(self.results_dir)
+        self.assertEqual(self.read_outputs(cached_dir), self.read_outputs(self.results_dir))
+
+        # Entries are JSON holding each row's commands once, not the command files
+        cache_dir = os.path.join(cached_dir, '.import_cache')
+        self.assertEqual(sorted(os.listdir(cache_dir)), sorted(f"{name}.json" for name in import_operations.TARGET_SHEETS))
+        with open(os.path.join(cache_dir, 'NFS_Share.json'), encoding='utf-8') as f:
+            entry = json.load(f)
+        self.assertNotIn('change vstore view', json.dumps(entry))
+        self.assertEqual(entry['output_names'], ['NFS_Share', 'NFS_Share_Permission'])
+        self.assertEqual([row[1:] for row in entry['rows']], [
+            ['vs0', ['create share nfs local_path=/fs0', 'create share_permission nfs access_name=* share_name=/fs0/ '
+                     'access_type=read_only all_squash_enabled=no root_squash_enabled=no']],
+            ['vs0', [None, 'create share_permission nfs access_name=10.0.0.1 share_name=/fs0/ '
+                           'access_type=read_write all_squash_enabled=no root_squash_enabled=no']],
+            ['vs1', ['create share nfs local_path=/fs2', 'create share_permission nfs access_name=* share_name=/fs2/ '
+                     'access_type=read_only all_squash_enabled=no root_squash_enabled=no']]
+        ])
+
+    def test_cached_rows_without_command_stay_empty(self):
+        cached_dir = os.path.join(self.work_dir, 'cached')
+        self.run_import_log(cached_dir, incremental=True)
+        # Row 1 (no Access Name) makes no command; it is reused while row 0 is translated again
+        self.change_cell('CIFS_Share_Permission', 0, 'Permission Type', 'Read-only')
+        log = self.run_import_log(cached_dir, incremental=True)
+        self.assertIn("CIFS_Share_Permission:\n  → Created: 1\n", log)
+        self.run_import_log(self.results_dir)
+        self.assertEqual(self.read_outputs(cached_dir), self.read_outputs(self.results_dir))
+        self.assertNotIn('nan', self.read_outputs(cached_dir)['CIFS_Share_Permission_commands.txt'])
+
+    def test_delta_import_writes_only_new_rows(self):
+        delta_dir = os.path.join(self.work_dir, 'delta')
+        self.run_import_log(delta_dir, delta=True)
+        self.run_import_log(self.results_dir)
+        self.assertEqual(self.read_outputs(delta_dir), self.read_outputs(self.results_dir))
+
+        self.change_capacity(2, '6.000TB')
+        self.run_import_log(delta_dir, delta=True)
+        outputs = self.read_outputs(delta_dir)
+        self.assertEqual(outputs['Filesystem_commands.txt'].splitlines(), [
+            "change vstore view name=vs1",
+            "create file_system general name=fs2 pool_id=1 capacity=6.000TB hyper_cdp_schedule_name=NONE"
+        ])
+        for name, text in outputs.items():
+            if name != 'Filesystem_commands.txt':
+                self.assertEqual(text, '', name)
+
+    def test_diff_against_baseline(self):
+        baseline_path = os.path.join(self.work_dir, 'baseline.xlsx')
+        shutil.copy(self.file_path, baseline_path)
+        sheets = pd.read_excel(self.file_path, sheet_name=None)
+        filesystems = sheets['Filesystem']
+        sheets['Filesystem'] = pd.concat([filesystems.drop(index=1), filesystems.iloc[[1]].assign(**{
+            'Filesystem Name': 'fs3'})], ignore_index=True)
+        sheets['NFS_Share'] = pd.concat([sheets['NFS_Share'], sheets['NFS_Share'].iloc[[2]].assign(**{
+            'Local Path': '/fs2', 'Access Name': '10.0.0.2'})], ignore_index=True)
+        with pd.ExcelWriter(self.file_path) as writer:
+            for sheet_name, df in sheets.items():
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+        for sheet_jobs in (1, None):
+            log = self.run_import_log(self.results_dir, sheet_jobs=sheet_jobs, baseline_path=baseline_path)
+            outputs = self.read_outputs(self.results_dir)
+            self.assertEqual(outputs['Filesystem_commands.txt'].splitlines(), [
+                "change vstore view name=vs0",
+                "create file_system general name=fs3 pool_id=1 capacity=20.000GB hyper_cdp_schedule_name=NONE"
+            ])
+            # The share of /fs2/ is in the baseline, only its new client is added
+            self.assertEqual(outputs['NFS_Share_commands.txt'].strip(), "change vstore view name=vs1")
+            self.assertIn("access_name=10.0.0.2", outputs['NFS_Share_Permission_commands.txt'])
+            self.assertEqual(outputs['Removed_objects.txt'], "Filesystem: Vstore=vs0, Filesystem Name=fs1\n")
+            self.assertIn("Removed objects: 1\n", log)
+            for name in ('Vstore_commands.txt', 'CIFS_Share_commands.txt', 'CIFS_Share_Permission_commands.txt'):
+                self.assertEqual(outputs[name], '', name)
+            shutil.rmtree(self.results_dir)
+
+    def test_workers_get_only_their_sheet_of_the_baseline(self):
+        with import_operations.open_workbook(self.file_path) as workbook:
+            baseline = import_operations.BaselineIndex.from_workbook(workbook, import_operations.TARGET_SHEETS)
+        nfs = baseline.sheet_index('NFS_Share')
+        self.assertEqual(list(nfs.keys), ['NFS_Share'])
+        self.assertEqual(list(nfs.hashes), ['NFS_Share'])
+        self.assertEqual(nfs.nfs_paths, {'/fs0', '/fs2'})
+        filesystem = baseline.sheet_index('Filesystem')
+        self.assertEqual(list(filesystem.hashes), ['Filesystem'])
+        self.assertEqual(filesystem.nfs_paths, set())
+
+        submitted = []
+        original_submit = import_operations.ProcessPoolExecutor.submit
+
+        def recording_submit(executor, fn, *args):
+            submitted.append((args[1], args[-1]))
+            return original_submit(executor, fn, *args)
+
+        with patch.object(import_operations.ProcessPoolExecutor, 'submit', recording_submit):
+            self.run_import_log(self.results_dir, sheet_jobs=None, baseline_path=self.file_path)
+        self.assertEqual(len(submitted), len(import_operations.TARGET_SHEETS) - 1)
+        for sheet_name, index in submitted:
+            self.assertEqual(list(index.hashes), [sheet_name])
+            self.assertEqual(bool(index.nfs_paths), sheet_name == 'NFS_Share')
+
+class TestSheetTranslators(unittest.TestCase):
+    """The whole-sheet translators against their expected commands, one per row."""
+
+    def test_filesystem(self):
+        df = pd.DataFrame({
+            'Filesystem Name': ['fs0', 'fs1', None, '', 'fs4', 'fs5'],
+            'pool_name': [None, 'pool', None, None, None, None],
+            'pool_id': [3, None, 1, None, None, 0],
+            'Capacity': ['1.000GB', '20.000GB', '5.000TB', '512MB', '1.2.3GB', 7],
+            'Type': ['Thin', 'THICK', 'Enabled', None, 'x', 1],
+            'Block Size': ['16.000KB', '64KB', '8.5MB', None, 'KB16', None],
+            'Application Scenario': ['Database', 'virtual machine', 'other', 'yes', None, 2],
+            'Capacity Threshold(%)': ['90%', 50, None, '80', None, None],
+            'Description': ['my fs', 'Déscription ñ', None, 3, None, 'x"'],
+            'unix_permissions': [None, None, None, None, '755"', None],
+            'hyper_cdp_schedule_name': [None, None, None, None, None, 'cdp']
+        })
+        self.assertEqual(import_filesystem.generate_filesystem_commands(df).tolist(), [
+            'create file_system general name=fs0 pool_id=3.0 pool_id=3.0 capacity=10.000GB alloc_type=thin '
+            'block_size=16KB application_scenario=database capacity_threshold=90 description=my_fs '
+            'hyper_cdp_schedule_name=NONE',
+            'create file_system general name=fs1 pool_name=pool pool_name=pool capacity=20.000GB alloc_type=thick '
+            'block_size=64KB application_scenario=virtual_machine capacity_threshold=50 description=Description_n '
+            'hyper_cdp_schedule_name=NONE',
+            None,
+            None,
+            'create file_system general name=fs4 pool_id=1 capacity=1.2.3GB alloc_type=x block_size=KB16 '
+            'unix_permissions=755 hyper_cdp_schedule_name=NONE"',
+            'create file_system general name=fs5 pool_id=0.0 pool_id=0.0 capacity=7 alloc_type=1 application_scenario=2 '
+            'description=x hyper_cdp_schedule_name=cdp'
+        ])
+
+    def test_numeric_sheet_upcasts_like_iterrows(self):
+        df = pd.DataFrame({'Filesystem Name': [1, 2], 'Capacity': [1.5, np.nan], 'pool_id': [0, 1]})
+        # Rows of a numeric sheet hold floats, as iterrows upcasts them
+        self.assertEqual(import_filesystem.generate_filesystem_commands(df).tolist(), [
+            'create file_system general name=1.0 pool_id=0.0 pool_id=0.0 capacity=1.5 hyper_cdp_schedule_name=NONE',
+            'create file_system general name=2.0 pool_id=1.0 pool_id=1.0 hyper_cdp_schedule_name=NONE'
+        ])
+
+    def test_cifs_share(self):
+        df = pd.DataFrame({
+            'Share Name': ['sh0', None, '', 'sh3'],
+            'Name': [None, 'named', 'x', None],
+            'Local Path': ['/fs0', '/fs1', '/fs2', None],
+            'Oplock Enabled': ['Enabled', 'maybe', 1, 0.0],
+            'Browse Enabled': ['Yes', 'no', None, 'yes'],
+            'Offline File Mode': ['no cache', 'Manual', None, None],
+            'Readdir Timeout(s)': [30, 2.5, None, None]
+        })
+        self.assertEqual(import_cifs_share.generate_cifs_share_commands(df).tolist(), [
+            'create share cifs name=sh0 local_path=/fs0 oplock_enabled=yes offline_file_mode=no_cache '
+            'browse_enabled=yes readdir_timeout=30.0\n y',
+            'create share cifs name=named local_path=/fs1 offline_file_mode=manual browse_enabled=no readdir_timeout=2.5',
+            None,
+            None
+        ])
+
+    def test_cifs_permission(self):
+        df = pd.DataFrame({
+            'Access Name': ['Everyone', 'user', None, 'x', 'y'],
+            'Share ID': [1, None, 2, 0, 3],
+            'Share Name': [None, 'sh1', 'sh2', None, ''],
+            'Permission Type': ['Full control', None, 'Read-only', '2', None],
+            'Access Type': [None, 'read write', None, None, None],
+            'Domain Type': ['AD', None, 'Local', None, 'LDAP'],
+            'Inherit Enabled': ['Enabled', 1, 'maybe', None, 'No']
+        })
+        self.assertEqual(import_cifs_permission.generate_cifs_permission_commands(df).tolist(), [
+            'create share_permission cifs access_name=Everyone share_id=1.0 permission_type=all_control '
+            'domain_type=ad inherit_enabled=yes',
+            'create share_permission cifs access_name=user share_name=sh1 permission_type=read_write inherit_enabled=yes',
+            None,
+            None,
+            None
+        ])
+
+    def test_vstore(self):
+        df = pd.DataFrame({'Vstore': ['vs0', None, 0], 'Name': [None, 'named', 'x'], 'description': ['d', None, 'e']})
+        self.assertEqual(import_vstore.generate_vstore_commands(df).tolist(),
+                         ['create vstore general name=vs0 description=d', 'create vstore general name=named', None])
+
+    def test_nfs_permission_keeps_nan_cells(self):
+        df = pd.DataFrame({
+            'Access Name': ['*', None, '', '10.0.0.1'],
+            'Share ID': [1, 2, 3, None],
+            'Local Path': ['/fs0/', '/fs1', '/fs2', None],
+            'Access Type': ['Read-only', '5', None, 'RW'],
+            'Sync Enabled': ['Enabled', 'maybe', None, 0],
+            'Share Permission Charset': ['UTF-8', 12, None, None],
+            'Anonymous User ID': [65534, None, 3.0, None],
+            'V4 Acl Preserve': ['yes', 'off', None, None]
+        })
+        # Empty cells are kept, so a NaN Access Name or Local Path still makes a command
+        self.assertEqual(import_nfs_permission.generate_nfs_permission_commands(df).tolist(), [
+            'create share_permission nfs access_name=* share_name=/fs0/ access_type=read_only sync_enabled=yes '
+            'charset=utf-8 anonymous_user_id=65534.0 v4_acl_preserve=true all_squash_enabled=no root_squash_enabled=no',
+            'create share_permission nfs access_name=nan share_name=/fs1 access_type=no_permission charset=12 '
+            'v4_acl_preserve=false all_squash_enabled=no root_squash_enabled=no',
+            None,
+            'create share_permission nfs access_name=10.0.0.1 share_name=nan access_type=rw sync_enabled=no '
+            'all_squash_enabled=no root_squash_enabled=no'
+        ])
+
+    def test_nfs_share_dedup_and_errors(self):
+        df = pd.DataFrame({
+            'Local Path': ['/fs0/', '/fs0', None, '/fs1', 7, '/seen/'],
+            'Filesystem ID': [1, 1, None, None, None, None],
+            'file_system_name': [None, None, None, 'fs1', None, None],
+            'Share Description': ['a b', None, None, 'é', None, None],
+            'show_snapshot_enabled': ['Enabled', None, None, 'maybe', None, None]
+        })
+        paths = {'/seen'}
+        commands, duplicate, errors = import_nfs_share.generate_nfs_share_commands(df, paths)
+
+        self.assertEqual(commands.tolist(), [
+            'create share nfs local_path=/fs0 file_system_id=1.0 show_snapshot_enabled=yes description=a_b',
+            None,
+            None,
+            'create share nfs local_path=/fs1 file_system_name=fs1 description=e',
+            None,
+            None
+        ])
+        self.assertEqual(errors.tolist(), [None, None, None, None, "'int' object has no attribute 'endswith'", None])
+        self.assertEqual(duplicate.tolist(), [False, True, False, False, False, True])
+        self.assertEqual(paths, {'/seen', '/fs0', '/fs1'})
+
+class TestImportContext(unittest.TestCase):
+    def setUp(self):
+        self.context = ImportContext(pd.DataFrame({'Vstore': ['vs0', 'vs1', 'vs2'], 'Vstore ID': ['0', 1.0, 2]}))
+
+    def test_normalize_vstore_id(self):
+        for value in (1, 1.0, '1', ' 1 ', '1.0'):
+            self.assertEqual(normalize_vstore_id(value), 1)
+        self.assertEqual(normalize_vstore_id('vs-a'), 'vs-a')
+        self.assertIsNone(normalize_vstore_id(float('nan')))
+        self.assertIsNone(normalize_vstore_id(''))
+
+    def test_indexes(self):
+        self.assertEqual(self.context.vstore_ids['vs1'], 1.0)
+        self.assertEqual(self.context.vstore_name('0'), 'vs0')
+        self.assertEqual(self.context.vstore_name(0.0), 'vs0')
+        self.assertEqual(self.context.vstore_name('2'), 'vs2')
+        self.assertIsNone(self.context.vstore_name(7))
+
+    def test_resolve_vstores(self):
+        df = pd.DataFrame({'Vstore': [None, 'named', None, None], 'Vstore ID': [1, 0, None, 9]})
+        self.assertEqual(self.context.resolve_vstores(df).tolist(), ['vs1', 'named', None, None])
+        self.assertEqual(self.context.resolve_vstores(pd.DataFrame({'Name': ['x']})).tolist(), [None])
+
+    def test_group_by_vstore(self):
+        vstores = pd.Series([None, 'vs1', 'vs0', None, 'vs1', 'vs0', 'vs2'], dtype=object)
+        order = group_by_vstore(vstores)
+        # Leading rows stay first, unnamed rows stay with the vstore they ran in
+        self.assertEqual(list(order), [0, 1, 4, 2, 3, 5, 6])
+        self.assertEqual(count_vstore_switches(vstores), 5)
+        self.assertEqual(count_vstore_switches(vstores.iloc[order]), 3)
+
+    def test_grouped_sheet_switches_once_per_vstore(self):
+        df = pd.DataFrame({'Filesystem Name': ['fs0', 'fs1', 'fs2', 'fs3'], 'Capacity': ['1GB'] * 4,
+                           'Vstore ID': [0, 1, 0, 1]})
+        sink = MemorySink()
+        context = ImportContext(self.context_frame(), group_vstores=True)
+        import_operations.process_sheet_rows('Filesystem', df, sink, context)
+        (output, text), = sink.outputs
+        self.assertEqual([line for line in text.splitlines() if line.startswith('change vstore')],
+                         ["change vstore view name=vs0", "change vstore view name=vs1"])
+        self.assertLess(text.index('name=fs2'), text.index('name=fs1'))
+        self.assertEqual(context.vstore_switches['Filesystem'], 2)
+        self.assertEqual(context.vstore_switches_saved['Filesystem'], 2)
+
+    @staticmethod
+    def context_frame():
+        return pd.DataFrame({'Vstore': ['vs0', 'vs1'], 'Vstore ID': [0, 1]})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import load_config, clear_config_cache, get_config_cache_path
+
+class TestLoadConfig(unittest.TestCase):
+    def setUp(self):
+        clear_config_cache()
+        self.work_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.work_dir, 'test_device_commands.json')
+        self.write_config({'LUN': {'operations': {}}})
+        # Resolve configs from the temporary folder, as the executable does with _MEIPASS
+        self.patches = [
+            patch.object(sys, 'frozen', True, create=True),
+            patch.object(sys, '_MEIPASS', self.work_dir, create=True)
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        clear_config_cache()
+        shutil.rmtree(self.work_dir)
+
+    def write_config(self, config):
+        with open(self.config_path, 'w', encoding='utf-8') as f:
+            json.dump(config, f)
+
+    def test_config_is_cached_in_process(self):
+        config = load_config('Test Device')
+        with patch('utils._read_config_file') as read_config:
+            self.assertIs(load_config('Test Device'), config)
+            read_config.assert_not_called()
+
+    def test_config_reloads_when_file_changes(self):
+        load_config('Test Device')
+        self.write_config({'LUN': {'operations': {}}, 'Host': {'operations': {}}})
+        stat = os.stat(self.config_path)
+        os.utime(self.config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+        self.assertEqual(list(load_config('Test Device')), ['LUN', 'Host'])
+
+    def test_pickled_cache_skips_json_parsing(self):
+        config = load_config('Test Device')
+        self.assertTrue(os.path.exists(get_config_cache_path(self.config_path)))
+
+        clear_config_cache()
+        with patch('utils.json.loads') as json_loads:
+            self.assertEqual(load_config('Test Device'), config)
+            json_loads.assert_not_called()
+
+    def test_missing_config(self):
+        with self.assertRaises(FileNotFoundError):
+            load_config('Unknown Device')
+
+if __name__ == '__main__':
+    unittest.main()
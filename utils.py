@@ -1,16 +1,24 @@
 import os
 import sys
 import json
-import zipfile
-from datetime import datetime
+import pickle
+import hashlib
+import numpy as np
 import pandas as pd
-from openpyxl import Workbook
+from pandas.io.parsers import TextParser
+from openpyxl import Workbook, load_workbook
 from openpyxl.worksheet.datavalidation import DataValidation
 from openpyxl.utils import get_column_letter
-from tkinter import messagebox
+
+_config_cache = {}
 
 def load_config(device_type):
-    """Load configuration from JSON file, works both in development and in executable."""
+    """Load configuration from JSON file, works both in development and in executable.
+
+    Configs are cached for the whole process and only re-read when the file's mtime or size
+    changes, so callers get the same (read-only) dict back on every call. The parsed form is
+    also pickled next to the JSON, which lets cold starts skip JSON parsing.
+    """
     config_file = f"{device_type.lower().replace(' ', '_')}_commands.json"
     
     # Determine the base path based on whether we're running as an executable
@@ -23,17 +31,56 @@ def load_config(device_type):
     
     # Construct the full path to the config file
     config_path = os.path.join(base_path, config_file)
+    if not os.path.exists(config_path):
+        # Try one more time in the current directory (for some edge cases)
+        config_path = os.path.abspath(config_file)
     
     try:
-        with open(config_path, 'r', encoding='utf-8') as file:
-            return json.load(file)
-    except FileNotFoundError:
-        # Try one more time in the current directory (for some edge cases)
-        try:
-            with open(config_file, 'r', encoding='utf-8') as file:
-                return json.load(file)
-        except Exception as e:
-            raise FileNotFoundError(f"Could not find configuration file {config_file} in either {base_path} or current directory")
+        stat = os.stat(config_path)
+    except OSError:
+        raise FileNotFoundError(f"Could not find configuration file {config_file} in either {base_path} or current directory")
+
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _config_cache.get(config_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    config = _read_config_file(config_path)
+    _config_cache[config_path] = (signature, config)
+    return config
+
+def get_config_cache_path(config_path):
+    """Path of the pickled, pre-parsed copy of a JSON config."""
+    return os.path.splitext(config_path)[0] + '.cache.pickle'
+
+def _read_config_file(config_path):
+    """Parse a JSON config, going through its pickled copy when that matches the JSON content."""
+    with open(config_path, 'rb') as file:
+        raw = file.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    cache_path = get_config_cache_path(config_path)
+
+    try:
+        with open(cache_path, 'rb') as file:
+            cached = pickle.load(file)
+        if cached.get('source_sha256') == digest:
+            return cached['config']
+    except Exception:
+        pass  # Missing, stale or unreadable cache - fall back to the JSON
+
+    config = json.loads(raw.decode('utf-8'))
+    try:
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as file:
+            pickle.dump({'source_sha256': digest, 'config': config}, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass  # Read-only install; the in-process cache still applies
+    return config
+
+def clear_config_cache():
+    """Forget every config loaded in this process."""
+    _config_cache.clear()
 
 def get_data_file_path(filename):
     """Get the correct path to a file, whether the app is running as a script or as an executable."""
@@ -45,68 +92,215 @@ def get_data_file_path(filename):
         base_path = os.path.dirname(os.path.abspath(__file__))
     return os.path.join(base_path, filename)
 
-def read_file(file_path, sheet_name):
-    """Read an Excel sheet into a DataFrame."""
+def read_file(file_path, sheet_name, columns=None, max_blank_rows=None):
+    """Read an Excel sheet into a DataFrame.
+
+    columns and max_blank_rows trim the read as in WorkbookSession.frame.
+    """
+    try:
+        if columns is None and max_blank_rows is None:
+            return pd.read_excel(file_path, sheet_name=sheet_name)
+        with pd.ExcelFile(file_path) as excel_file:
+            return parse_sheet(excel_file, sheet_name, columns, max_blank_rows)
+    except Exception as e:
+        print(f"Error reading sheet '{sheet_name}' from file '{file_path}': {e}")
+        return None
+
+DEFAULT_CHUNK_SIZE = 10000
+# Blank rows in a row after which a sheet is taken to have no more data
+DEFAULT_MAX_BLANK_ROWS = 100
+
+def parse_sheet(excel_file, sheet_name, columns=None, max_blank_rows=None):
+    """Parse a sheet of an open pd.ExcelFile, optionally trimmed.
+
+    Only the columns listed in columns are kept. With max_blank_rows the frame is built
+    from the streamed rows in a single pass (see read_worksheet), which stops after that
+    many blank rows in a row: the pre-styled empty rows of a template, or a stale sheet
+    dimension, then cost only that many rows instead of all of them.
+    """
+    if max_blank_rows is not None:
+        return read_worksheet(excel_file.book[sheet_name], columns, max_blank_rows)
+    options = {}
+    if columns is not None:
+        wanted = set(columns)
+        options['usecols'] = lambda name: name in wanted
+    return excel_file.parse(sheet_name, **options)
+
+def read_worksheet(worksheet, columns=None, max_blank_rows=None):
+    """Read an already opened openpyxl worksheet into one DataFrame, in a single pass.
+
+    The rows are the ones iter_worksheet_chunks streams, handed to the same TextParser
+    read_excel uses, so the values and dtypes are those read_file would give.
+    """
+    columns, rows = _worksheet_rows(worksheet, columns, max_blank_rows)
+    if not columns:
+        return pd.DataFrame()
+    return TextParser([columns, *rows], header=0, skip_blank_lines=False).read()
+
+def iter_sheet_chunks(file_path, sheet_name, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Read an Excel sheet as a sequence of DataFrames of at most chunk_size rows.
+
+    Rows are streamed with openpyxl in read-only mode, so memory stays flat however large
+    the sheet is. Columns get the dtypes read_file would give them (see
+    iter_worksheet_chunks). Returns None when the sheet cannot be read, like read_file.
+    """
     try:
-        return pd.read_excel(file_path, sheet_name=sheet_name)
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
     except Exception as e:
         print(f"Error reading sheet '{sheet_name}' from file '{file_path}': {e}")
         return None
+    if sheet_name not in workbook.sheetnames:
+        print(f"Error reading sheet '{sheet_name}' from file '{file_path}': Worksheet named '{sheet_name}' not found")
+        workbook.close()
+        return None
+    return _closing_chunks(workbook, iter_worksheet_chunks(workbook[sheet_name], chunk_size))
+
+def _convert_cell(value):
+    """Convert an openpyxl cell value the way pandas.read_excel does."""
+    if value is None:
+        return np.nan
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def _closing_chunks(workbook, chunks):
+    try:
+        yield from chunks
+    finally:
+        workbook.close()
+
+# Value kinds (pd.api.types.infer_dtype) that read into a numeric column
+NUMERIC_KINDS = {'integer', 'floating', 'mixed-integer-float'}
+
+def sheet_column_types(chunks):
+    """dtype of every column when the sheet is read in one go, worked out from its chunks.
+
+    As with read_excel, a column whose values all read as numbers (numeric text included)
+    is int64 when complete and whole, else float64, as are empty columns; complete boolean
+    columns are bool. Text and mixed columns map to None and keep their values as read.
+    """
+    kinds, missing, fractional = {}, set(), set()
+    for chunk in chunks:
+        for column in chunk.columns:
+            values = chunk[column]
+            present = values.dropna()
+            if len(present) < len(values):
+                missing.add(column)
+            kind = pd.api.types.infer_dtype(present, skipna=True)
+            if kind not in NUMERIC_KINDS and kind not in ('empty', 'boolean'):
+                numbers = pd.to_numeric(present, errors='coerce')
+                if numbers.notna().all():
+                    present = numbers
+                    kind = pd.api.types.infer_dtype(numbers, skipna=True)
+            kinds.setdefault(column, set()).add(kind)
+            if kind in ('floating', 'mixed-integer-float') and not (present.astype(float) % 1 == 0).all():
+                fractional.add(column)
+
+    column_types = {}
+    for column, column_kinds in kinds.items():
+        column_kinds = column_kinds - {'empty'}
+        if column_kinds <= NUMERIC_KINDS:
+            complete = column_kinds and column not in missing and column not in fractional
+            column_types[column] = 'int64' if complete else 'float64'
+        elif column_kinds == {'boolean'} and column not in missing:
+            column_types[column] = 'bool'
+        else:
+            column_types[column] = None
+    return column_types
+
+def apply_column_types(chunk, column_types):
+    """Cast a chunk's columns to the dtypes sheet_column_types settled on for the sheet."""
+    for column in chunk.columns:
+        column_type = column_types.get(column)
+        if column_type in ('int64', 'float64'):
+            chunk[column] = pd.to_numeric(chunk[column]).astype(column_type)
+        elif column_type is not None:
+            chunk[column] = chunk[column].astype(column_type)
+    return chunk
+
+def iter_worksheet_chunks(worksheet, chunk_size=DEFAULT_CHUNK_SIZE, columns=None, max_blank_rows=None):
+    """Yield DataFrame chunks from an already opened openpyxl worksheet.
+
+    Only the columns listed in columns are kept, and with max_blank_rows reading stops
+    after that many blank rows in a row. The rows are read twice: a first pass settles
+    each column's dtype (see sheet_column_types), so every chunk holds the values a full
+    read_excel of the sheet would, wherever the chunk boundaries fall.
+    """
+    column_types = sheet_column_types(_worksheet_chunks(worksheet, chunk_size, columns, max_blank_rows, warn=False))
+    for chunk in _worksheet_chunks(worksheet, chunk_size, columns, max_blank_rows):
+        yield apply_column_types(chunk, column_types)
+
+def _worksheet_chunks(worksheet, chunk_size, columns, max_blank_rows, warn=True):
+    """Chunks of the worksheet's cell values as read (object columns)."""
+    columns, rows = _worksheet_rows(worksheet, columns, max_blank_rows, warn)
+    chunk = []
+    start = 0
+    for values in rows:
+        chunk.append(values)
+        if len(chunk) >= chunk_size:
+            yield pd.DataFrame(chunk, columns=columns, index=range(start, start + len(chunk)), dtype=object)
+            start += len(chunk)
+            chunk = []
+    if chunk:
+        yield pd.DataFrame(chunk, columns=columns, index=range(start, start + len(chunk)), dtype=object)
+
+def _worksheet_rows(worksheet, columns, max_blank_rows, warn=True):
+    """The names of the kept columns, and an iterator of their converted values per row.
+
+    With max_blank_rows the rows end after that many blank rows in a row; when the sheet
+    goes on past them, the rows skipped are reported unless warn is False.
+    """
+    rows = worksheet.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return [], iter(())
+    header = list(header)
+    while header and header[-1] is None:
+        header.pop()
+    names = [name if name is not None else f"Unnamed: {idx}" for idx, name in enumerate(header)]
+    wanted = set(names if columns is None else columns)
+    positions = [idx for idx, name in enumerate(names) if name in wanted]
+    return [names[idx] for idx in positions], _row_values(worksheet, rows, positions, max_blank_rows, warn)
+
+def _row_values(worksheet, rows, positions, max_blank_rows, warn):
+    empty_row = [np.nan] * len(positions)
+    pending_empty = 0  # Empty rows are only kept when data follows them, like pandas does
+    for row_number, row in enumerate(rows, start=2):
+        values = [_convert_cell(row[idx]) if idx < len(row) else np.nan for idx in positions]
+        if all(value is np.nan for value in values):
+            pending_empty += 1
+            if max_blank_rows is not None and pending_empty >= max_blank_rows:
+                if warn and worksheet.max_row and worksheet.max_row > row_number:
+                    print(f"Warning: sheet '{worksheet.title}' read up to row {row_number - pending_empty}; "
+                          f"rows {row_number + 1}-{worksheet.max_row} after {max_blank_rows} blank rows are ignored")
+                break
+            continue
+        for _ in range(pending_empty):
+            yield empty_row
+        yield values
+        pending_empty = 0
     
+def reserve_path(directory, file_name):
+    """Create an empty directory/file_name and return its path, claiming the name for one run.
+
+    When the name is taken, _2, _3... is added before the extension. The file is created
+    exclusively, so runs started in the same second, even in other processes, never get
+    the same path.
+    """
+    stem, extension = os.path.splitext(file_name)
+    count = 1
+    while True:
+        path = os.path.join(directory, f"{stem}_{count}{extension}" if count > 1 else file_name)
+        try:
+            with open(path, 'x'):
+                return path
+        except FileExistsError:
+            count += 1
+
 def open_directory(directory):
-    import os
+    from tkinter import messagebox  # Imported here so headless callers never load tkinter
     path = os.path.join(os.path.dirname(os.path.abspath(__file__)), directory)
     if os.path.exists(path):
         os.startfile(path)
     else:
         messagebox.showinfo("Info", f"Directory not found: {path}")
-        
-def encapsulate_results(results_dir="Imported_Results"):
-    """Encapsulate all .txt files in the results directory into a zip file and clean up."""
-    try:
-        # Create timestamp for zip filename
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        zip_filename = f"import_commands_{timestamp}.zip"
-        zip_path = os.path.join(results_dir, zip_filename)
-        
-        # Get all .txt files in the results directory
-        txt_files = [f for f in os.listdir(results_dir) 
-                   if f.endswith('.txt') and os.path.isfile(os.path.join(results_dir, f))]
-        
-        # Find the latest log file
-        logs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Logs")
-        log_files = []
-        if os.path.exists(logs_dir):
-            log_files = [f for f in os.listdir(logs_dir) 
-                       if f.startswith('import_log_') and f.endswith('.txt')]
-        
-        # Sort log files by creation time (newest first)
-        if log_files:
-            log_files.sort(key=lambda x: os.path.getmtime(os.path.join(logs_dir, x)), reverse=True)
-            latest_log = log_files[0]
-        else:
-            latest_log = None
-        
-        # Create the zip file
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Add all command files
-            for txt_file in txt_files:
-                file_path = os.path.join(results_dir, txt_file)
-                zipf.write(file_path, os.path.basename(file_path))
-            
-            # Add the latest log file if found
-            if latest_log:
-                log_path = os.path.join(logs_dir, latest_log)
-                zipf.write(log_path, f"logs/{latest_log}")
-        
-        # Delete original .txt files (only if zip was created successfully)
-        for txt_file in txt_files:
-            try:
-                os.remove(os.path.join(results_dir, txt_file))
-            except Exception as e:
-                print(f"Warning: Could not delete {txt_file}: {str(e)}")
-        
-        return zip_path
-    except Exception as e:
-        print(f"Error creating zip file: {str(e)}")
-        return None
\ No newline at end of file
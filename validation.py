@@ -0,0 +1,225 @@
+import re
+import pandas as pd
+from command_plans import compile_field, get_operation_plan, row_aligned_frame
+
+REPORT_COLUMNS = ['row', 'field', 'value', 'rule', 'message']
+
+
+def _as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+def _bound(field, bound):
+    """(configured, numeric) form of a min/max bound, or None when the field cannot compare it."""
+    if bound is None:
+        return None
+    value = field.parse_bound(bound)
+    return None if value is None else (bound, value)
+
+
+class FieldRule:
+    """Per-field constraints from the commands JSON, compiled once."""
+
+    def __init__(self, field_config):
+        self.field = compile_field(field_config)
+        self.name = self.field.name
+        self.pattern = re.compile(field_config['pattern']) if 'pattern' in field_config else None
+        self.item_separator = field_config.get('separator', ',') if field_config.get('field_type') == 'list' else None
+        self.min_length = field_config.get('min_length')
+        self.max_length = field_config.get('max_length')
+        self.min_value = _bound(self.field, field_config.get('min_value'))
+        self.max_value = _bound(self.field, field_config.get('max_value'))
+        self.numeric = field_config.get('field_type') in ('integer', 'number', 'size') \
+            or self.min_value is not None or self.max_value is not None
+        self.conditions = [
+            (condition['when'], _bound(self.field, condition.get('min_value')), _bound(self.field, condition.get('max_value')))
+            for condition in field_config.get('conditions', [])
+        ]
+        self.applicable_when = field_config.get('applicable_when')
+
+    def check(self, values, context):
+        """Yield (mask, rule, message) for every violated constraint of this field's column."""
+        present = values.notna()
+        if not present.any():
+            return
+        strings = values[present]
+
+        if self.pattern is not None:
+            if self.item_separator is not None:
+                matches = strings.str.split(self.item_separator, regex=False).map(
+                    lambda items: all(self.pattern.fullmatch(item) for item in items))
+            else:
+                matches = strings.str.fullmatch(self.pattern)
+            yield ~matches, 'pattern', f"does not match pattern {self.pattern.pattern}"
+
+        if self.min_length is not None or self.max_length is not None:
+            lengths = strings.str.len()
+            if self.min_length is not None:
+                yield lengths < self.min_length, 'min_length', f"is shorter than {self.min_length} characters"
+            if self.max_length is not None:
+                yield lengths > self.max_length, 'max_length', f"is longer than {self.max_length} characters"
+
+        if self.numeric:
+            numbers = self.field.numeric_column(strings)
+            keywords = getattr(self.field, 'keywords', frozenset())
+            unparsed = numbers.isna() & ~strings.str.lower().isin(keywords)
+            yield unparsed, 'type', f"is not a valid {self.field.config.get('field_type', 'number')} value"
+            yield from self._check_range(numbers, self.min_value, self.max_value, None)
+            for when, min_value, max_value in self.conditions:
+                applies = context.matches(when)[present]
+                yield from self._check_range(numbers, min_value, max_value, applies)
+
+        if self.applicable_when is not None:
+            applies = context.matches(self.applicable_when)[present]
+            yield ~applies, 'applicable_when', f"only applies when {context.describe(self.applicable_when)}"
+
+    @staticmethod
+    def _check_range(numbers, min_value, max_value, applies):
+        if min_value is not None:
+            mask = numbers < min_value[1]
+            yield (mask if applies is None else mask & applies), 'min_value', f"is below the minimum {min_value[0]}"
+        if max_value is not None:
+            mask = numbers > max_value[1]
+            yield (mask if applies is None else mask & applies), 'max_value', f"is above the maximum {max_value[0]}"
+
+
+class ValidationContext:
+    """Processed column values of one sheet, shared by every rule."""
+
+    def __init__(self, frame, fields):
+        self.index = frame.index
+        self.values = {}
+        for field in fields:
+            if field.name in frame.columns:
+                self.values[field.name], _ = field.evaluate_column(frame[field.name])
+
+    def column(self, name):
+        values = self.values.get(name)
+        if values is None:
+            return pd.Series(None, index=self.index, dtype=object)
+        return values
+
+    def present(self, name):
+        return self.column(name).notna()
+
+    def matches(self, conditions):
+        """Mask of rows where every referenced field equals (one of) the required values."""
+        mask = pd.Series(True, index=self.index)
+        for name, expected in conditions.items():
+            values = self.column(name)
+            present = values.notna()
+            expected = [str(value).lower() for value in _as_list(expected)]
+            matched = pd.Series(False, index=self.index)
+            if present.any():
+                matched[present] = values[present].str.lower().isin(expected)
+            mask &= matched
+        return mask
+
+    @staticmethod
+    def describe(conditions):
+        return ' and '.join(f"{name}={'/'.join(str(v) for v in _as_list(value))}" for name, value in conditions.items())
+
+
+class OperationValidator:
+    """Every constraint of one operation compiled once and evaluated column by column."""
+
+    def __init__(self, operation_config):
+        all_fields = operation_config.get('mandatory', []) + operation_config.get('optional', [])
+        self.field_rules = [FieldRule(field) for field in all_fields]
+        self.fields = [rule.field for rule in self.field_rules]
+        self.dependencies = operation_config.get('dependencies', [])
+        # (names, description, required): required groups need exactly one of their fields
+        self.exclusive_groups = [
+            (group.get('fields') or group.get('parameters', []), group.get('description'), group.get('required', False))
+            for group in operation_config.get('mutually_exclusive_groups', []) + operation_config.get('mutually_exclusive', [])
+        ]
+        self.list_rules = [
+            (name, rule.get('max_items'), re.compile(rule['item_format']) if 'item_format' in rule else None)
+            for name, rule in operation_config.get('validation_rules', {}).items()
+        ]
+
+    def validate(self, frame):
+        """Return a DataFrame report with one line per failed (row, field, rule).
+
+        row follows the generator's 1-based row numbering in its warnings.
+        """
+        frame = row_aligned_frame(frame)
+        context = ValidationContext(frame, self.fields)
+        errors = []
+
+        def collect(mask, field, rule, message):
+            mask = mask.reindex(frame.index, fill_value=False).astype(bool)
+            if mask.any():
+                errors.append(pd.DataFrame({
+                    'row': mask.index[mask] + 1,
+                    'field': field,
+                    'value': context.column(field)[mask].to_numpy(),
+                    'rule': rule,
+                    'message': message
+                }))
+
+        for rule in self.field_rules:
+            values = context.values.get(rule.name)
+            if values is None:
+                continue
+            for mask, rule_name, message in rule.check(values, context):
+                collect(mask, rule.name, rule_name, f"{rule.name} {message}")
+
+        for dependency in self.dependencies:
+            name = dependency.get('field') or dependency.get('parameter')
+            present = context.present(name)
+            if 'requires' in dependency:
+                collect(present & ~context.matches(dependency['requires']), name, 'dependency',
+                        f"{name} requires {context.describe(dependency['requires'])}")
+            if 'requires_any' in dependency:
+                any_present = pd.Series(False, index=frame.index)
+                for other in dependency['requires_any']:
+                    any_present |= context.present(other)
+                collect(present & ~any_present, name, 'dependency',
+                        f"{name} requires one of {', '.join(dependency['requires_any'])}")
+
+        for names, description, required in self.exclusive_groups:
+            count = sum(context.present(name).astype(int) for name in names)
+            message = description or f"Only one of {', '.join(names)} can be specified"
+            collect(count > 1, '/'.join(names), 'mutually_exclusive', message)
+            if required:
+                collect(count == 0, '/'.join(names), 'required',
+                        description or f"One of {', '.join(names)} must be specified")
+
+        for name, max_items, item_format in self.list_rules:
+            values = context.column(name)
+            present = values.notna()
+            if not present.any():
+                continue
+            items = values[present].str.split(',', regex=False)
+            if max_items is not None:
+                collect(items.str.len() > max_items, name, 'max_items', f"{name} has more than {max_items} items")
+            if item_format is not None:
+                collect(~items.map(lambda parts: all(item_format.fullmatch(part.strip()) for part in parts)),
+                        name, 'item_format', f"{name} items do not match {item_format.pattern}")
+
+        if not errors:
+            return pd.DataFrame(columns=REPORT_COLUMNS)
+        report = pd.concat(errors, ignore_index=True)
+        return report.sort_values('row', kind='stable', ignore_index=True)
+
+
+def get_operation_validator(plan):
+    """Validator for a compiled OperationPlan, built once and kept on the plan."""
+    if plan.validator is None:
+        plan.validator = OperationValidator(plan.source)
+    return plan.validator
+
+
+def validate_frame(data_frame, config, resource_type, command_type, device_type=None):
+    """Validate a sheet against its operation config and return the error report."""
+    plan = get_operation_plan(config, resource_type, command_type, device_type)
+    return get_operation_validator(plan).validate(data_frame)
+
+
+def first_error_per_row(report, index):
+    """Series aligned to index with the first validation message of each row (NaN when valid)."""
+    if report.empty:
+        return pd.Series(None, index=index, dtype=object)
+    first = report.drop_duplicates('row').set_index('row')['message']
+    return pd.Series(index + 1, index=index).map(first)
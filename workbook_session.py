@@ -0,0 +1,245 @@
+import os
+import numpy as np
+import pandas as pd
+from utils import iter_worksheet_chunks, parse_sheet, sheet_column_types, apply_column_types, DEFAULT_CHUNK_SIZE
+
+# Column of a single-file table (CSV, Parquet or JSON Lines) naming the sheet of each row
+SHEET_COLUMN = 'sheet'
+
+class SheetSession:
+    """What every input format shares: sheets by name, each parsed at most once."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._frames = {}
+
+    def has_sheet(self, sheet_name):
+        return sheet_name in self.sheet_names
+
+    def frames(self, sheet_names):
+        """Lazily yield (sheet_name, frame) for the given sheets that exist in the workbook."""
+        for sheet_name in sheet_names:
+            if self.has_sheet(sheet_name):
+                data_frame = self.frame(sheet_name)
+                if data_frame is not None:
+                    yield sheet_name, data_frame
+
+    def sheet_input(self, sheet_name):
+        """What a worker process opens to read one sheet (see open_workbook).
+
+        The input's path by default: the worker parses only that sheet of it.
+        """
+        return self.file_path
+
+    def release(self, sheet_name):
+        """Drop every cached frame of a sheet once it is no longer needed."""
+        for key in [key for key in self._frames if key == sheet_name or (isinstance(key, tuple) and key[0] == sheet_name)]:
+            del self._frames[key]
+
+    def close(self):
+        self._frames.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class WorkbookSession(SheetSession):
+    """An Excel workbook opened once, whose sheets are parsed lazily and at most once.
+
+    The zip archive and its shared-strings table are read a single time when the session
+    opens; every sheet frame or chunk stream afterwards reuses that workbook.
+    """
+
+    def __init__(self, file_path):
+        super().__init__(file_path)
+        self._excel_file = pd.ExcelFile(file_path)
+
+    @property
+    def sheet_names(self):
+        return self._excel_file.sheet_names
+
+    def frame(self, sheet_name, columns=None, max_blank_rows=None):
+        """Return the sheet as a DataFrame, parsing it on first use. None if it cannot be read.
+
+        columns keeps only those columns, and max_blank_rows stops reading after that many
+        blank rows in a row (see utils.parse_sheet). Each trimmed variant is cached apart.
+        """
+        key = sheet_name
+        if columns is not None or max_blank_rows is not None:
+            key = (sheet_name, None if columns is None else tuple(columns), max_blank_rows)
+        if key not in self._frames:
+            try:
+                if key == sheet_name:
+                    self._frames[key] = self._excel_file.parse(sheet_name)
+                else:
+                    self._frames[key] = parse_sheet(self._excel_file, sheet_name, columns, max_blank_rows)
+            except Exception as e:
+                print(f"Error reading sheet '{sheet_name}' from file '{self.file_path}': {e}")
+                self._frames[key] = None
+        return self._frames[key]
+
+    def iter_chunks(self, sheet_name, chunk_size=DEFAULT_CHUNK_SIZE, columns=None, max_blank_rows=None):
+        """Stream the sheet as DataFrame chunks without building the whole frame."""
+        return iter_worksheet_chunks(self._excel_file.book[sheet_name], chunk_size, columns, max_blank_rows)
+
+    def close(self):
+        super().close()
+        self._excel_file.close()
+
+def read_csv_table(file_path):
+    # Types are inferred over the whole column, not per block of rows
+    return pd.read_csv(file_path, low_memory=False)
+
+def read_parquet_table(file_path):
+    try:
+        return pd.read_parquet(file_path)
+    except ImportError as e:
+        raise ImportError(f"Reading Parquet files needs pyarrow (pip install pyarrow): {e}") from e
+
+def read_jsonl_table(file_path):
+    # Values keep the types JSON gives them; dates and numbers in strings are not guessed
+    return pd.read_json(file_path, lines=True, dtype=False, convert_dates=False)
+
+# Readers of the plain table formats, by file extension
+TABLE_READERS = {
+    '.csv': read_csv_table,
+    '.parquet': read_parquet_table,
+    '.jsonl': read_jsonl_table
+}
+
+def excel_like(data_frame, columns=None):
+    """Give a frame read from a table file the values read_excel gives the same sheet.
+
+    Empty strings are missing values, like empty cells, and float columns holding only
+    whole numbers become integers, as Excel does not tell 2 from 2.0. columns keeps
+    only those columns.
+    """
+    if columns is not None:
+        wanted = set(columns)
+        data_frame = data_frame[[column for column in data_frame.columns if column in wanted]]
+    data_frame = data_frame.copy()
+    for column in data_frame.columns:
+        values = data_frame[column]
+        if pd.api.types.is_float_dtype(values):
+            if values.notna().all() and np.all(np.mod(values.to_numpy(), 1) == 0):
+                data_frame[column] = values.astype('int64')
+        elif not pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            empty = values.eq('').fillna(False).astype(bool)
+            if empty.any():
+                data_frame[column] = values.astype(object).where(~empty, np.nan)
+    return data_frame
+
+class TableSession(SheetSession):
+    """Sheets held as plain tables, read with pandas' native CSV, Parquet and JSON readers.
+
+    Frames come out as read_excel would give them (see excel_like), so they feed the same
+    generators. There are no pre-styled template rows, so max_blank_rows is not needed.
+    """
+
+    def frame(self, sheet_name, columns=None, max_blank_rows=None):
+        """Return the sheet as a DataFrame, reading it on first use. None if it cannot be read."""
+        key = sheet_name if columns is None else (sheet_name, tuple(columns))
+        if key not in self._frames:
+            try:
+                self._frames[key] = excel_like(self.read_sheet(sheet_name), columns)
+            except Exception as e:
+                print(f"Error reading sheet '{sheet_name}' from '{self.file_path}': {e}")
+                self._frames[key] = None
+        return self._frames[key]
+
+    def iter_chunks(self, sheet_name, chunk_size=DEFAULT_CHUNK_SIZE, columns=None, max_blank_rows=None):
+        """Yield the sheet as DataFrame chunks of at most chunk_size rows."""
+        data_frame = self.frame(sheet_name, columns)
+        if data_frame is None:
+            return
+        for start in range(0, len(data_frame), chunk_size):
+            yield data_frame.iloc[start:start + chunk_size]
+
+class TableDirectorySession(TableSession):
+    """A directory holding one <sheet>.csv, <sheet>.parquet or <sheet>.jsonl file per sheet."""
+
+    def __init__(self, directory):
+        super().__init__(directory)
+        self._paths = {}
+        for file_name in sorted(os.listdir(directory)):
+            sheet_name, extension = os.path.splitext(file_name)
+            if extension.lower() in TABLE_READERS:
+                self._paths.setdefault(sheet_name, os.path.join(directory, file_name))
+
+    @property
+    def sheet_names(self):
+        return list(self._paths)
+
+    def read_sheet(self, sheet_name):
+        path = self._paths[sheet_name]
+        return TABLE_READERS[os.path.splitext(path)[1].lower()](path)
+
+    def iter_chunks(self, sheet_name, chunk_size=DEFAULT_CHUNK_SIZE, columns=None, max_blank_rows=None):
+        """CSV sheets are streamed with the chunked CSV reader; other formats are read whole.
+
+        A first pass over the CSV settles every column's dtype (see utils.sheet_column_types),
+        so the chunks hold the values frame() would, wherever their boundaries fall.
+        """
+        path = self._paths[sheet_name]
+        if os.path.splitext(path)[1].lower() != '.csv':
+            yield from super().iter_chunks(sheet_name, chunk_size, columns, max_blank_rows)
+            return
+        usecols = None
+        if columns is not None:
+            wanted = set(columns)
+            usecols = lambda name: name in wanted
+        with pd.read_csv(path, usecols=usecols, chunksize=chunk_size) as chunks:
+            column_types = sheet_column_types(chunks)
+        # Text and mixed columns are read as the text a whole-file read keeps for them
+        text_columns = {column: str for column, column_type in column_types.items() if column_type is None}
+        with pd.read_csv(path, usecols=usecols, chunksize=chunk_size, dtype=text_columns) as chunks:
+            for chunk in chunks:
+                yield apply_column_types(chunk, column_types)
+
+class TableFileSession(TableSession):
+    """One CSV, Parquet or JSON Lines table whose 'sheet' column names each row's sheet.
+
+    The file is read once when the session opens, unless the sheets' tables are given. A
+    sheet's frame has its own rows, numbered from 0, and only the columns they fill.
+    """
+
+    def __init__(self, file_path, tables=None):
+        super().__init__(file_path)
+        if tables is not None:
+            self._tables = tables
+            return
+        table = TABLE_READERS[os.path.splitext(file_path)[1].lower()](file_path)
+        if SHEET_COLUMN not in table.columns:
+            raise ValueError(f"'{file_path}' has no '{SHEET_COLUMN}' column naming the sheet of each row")
+        self._tables = {}
+        for sheet_name, rows in table.groupby(SHEET_COLUMN, sort=False):
+            rows = rows.drop(columns=SHEET_COLUMN).dropna(axis=1, how='all')
+            self._tables[str(sheet_name)] = rows.reset_index(drop=True)
+
+    @property
+    def sheet_names(self):
+        return list(self._tables)
+
+    def read_sheet(self, sheet_name):
+        return self._tables[sheet_name]
+
+    def sheet_input(self, sheet_name):
+        """A session holding only that sheet's rows, so the worker does not read the whole file again."""
+        return TableFileSession(self.file_path, {sheet_name: self._tables[sheet_name]})
+
+def open_workbook(file_path):
+    """Open an input for reading its sheets, by its format.
+
+    A directory is read as one table file per sheet, a .csv, .parquet or .jsonl file as a
+    single table with a 'sheet' column, and anything else as an Excel workbook. An already
+    opened session (see SheetSession.sheet_input) is returned as it is.
+    """
+    if isinstance(file_path, SheetSession):
+        return file_path
+    if os.path.isdir(file_path):
+        return TableDirectorySession(file_path)
+    if os.path.splitext(file_path)[1].lower() in TABLE_READERS:
+        return TableFileSession(file_path)
+    return WorkbookSession(file_path)